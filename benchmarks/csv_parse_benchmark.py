@@ -0,0 +1,114 @@
+"""CSV parse throughput across 1..N cores.
+
+Writes a --mb sized CSV (ints, floats, short strings) to a temp file, maps
+it the way LocalStorage.get_file does, and times csv_service.read_csv with
+each engine at 1, 2, 4, ... --max-workers workers against the
+single-threaded pandas C engine.
+
+Usage:
+    python benchmarks/csv_parse_benchmark.py --mb 512 --max-workers 32
+"""
+import argparse
+import mmap
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from services import csv_service
+
+def write_csv(path, target_bytes, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = 200_000
+
+    with open(path, "wb") as f:
+        f.write(b"id,count,price,ratio,label\n")
+
+        while f.tell() < target_bytes:
+            df = pd.DataFrame({
+                "id": rng.integers(0, 10**9, size=rows),
+                "count": rng.integers(0, 1000, size=rows),
+                "price": rng.normal(100, 25, size=rows).round(2),
+                "ratio": rng.random(size=rows).round(6),
+                "label": rng.choice(["alpha", "beta", "gamma", "delta"], size=rows),
+            })
+            f.write(df.to_csv(index=False, header=False).encode())
+
+def time_parse(path, repeat):
+    timings = []
+
+    for _ in range(repeat):
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        started = time.perf_counter()
+        csv_service.read_csv(mapped)
+        timings.append(time.perf_counter() - started)
+
+        mapped.close()
+
+    return statistics.median(timings)
+
+def use_workers(engine, workers):
+    if csv_service._pool is not None:
+        csv_service._pool.shutdown()
+        csv_service._pool = None
+
+    csv_service.CSV_PARSE_ENGINE = engine
+    csv_service.CSV_PARSE_WORKERS = workers
+    csv_service.CSV_PARALLEL_MIN_BYTES = 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=256)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+
+    engines = ["chunks"]
+    try:
+        import pyarrow  # noqa: F401
+        engines.insert(0, "pyarrow")
+    except ImportError:
+        print("pyarrow not installed; skipping the Arrow engine")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.csv")
+        write_csv(path, args.mb * 2**20)
+        size_mb = os.path.getsize(path) / 2**20
+
+        print(f"file={size_mb:.0f} MiB cpus={os.cpu_count()}")
+
+        use_workers("pandas", 1)
+        # Warm the page cache before the baseline
+        time_parse(path, 1)
+        baseline = time_parse(path, args.repeat)
+
+        print(f"{'engine':<8} {'workers':>7} {'seconds':>8} {'MiB/s':>8} {'speedup':>8}")
+        print(f"{'pandas':<8} {1:>7} {baseline:8.2f} {size_mb / baseline:8.1f} {1:8.2f}")
+
+        for engine in engines:
+            for count in workers:
+                use_workers(engine, count)
+                # The first call starts the pool; keep it out of the timings
+                time_parse(path, 1)
+                elapsed = time_parse(path, args.repeat)
+
+                print(f"{engine:<8} {count:>7} {elapsed:8.2f} {size_mb / elapsed:8.1f} {baseline / elapsed:8.2f}")
+
+        use_workers("pandas", 1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
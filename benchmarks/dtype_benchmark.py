@@ -0,0 +1,119 @@
+"""Memory report and training parity for the read-time dtype plan.
+
+Generates a --rows CSV with int, float, low-cardinality and high-cardinality
+text columns, computes column_schema and column_stats the way create_dataset
+does, then:
+
+  1. prints the per-column memory of the default parse vs the planned dtypes;
+  2. trains every numeric feature against a small and a large-magnitude
+     target through prepare_data/train_linear_regression, with the plan
+     (float downcasting on) and with the float64 path (DTYPE_OPTIMIZE off),
+     and checks the metrics and coefficients agree within --tolerance.
+
+Exits non-zero if parity fails.
+
+Usage:
+    python benchmarks/dtype_benchmark.py --rows 1000000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import numpy as np
+import pandas as pd
+
+from services import dtype_service
+from services.dataset_stats_service import compute_column_stats
+from services.storage_service import upload_file
+from services.training_service import prepare_data, train_linear_regression
+
+def make_csv(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.integers(18, 90, size=rows),
+        "visits": rng.integers(0, 30_000, size=rows),
+        "income": rng.normal(50_000, 12_000, size=rows).round(2),
+        "score": rng.random(size=rows).round(4),
+        "region": rng.choice(["north", "south", "east", "west"], size=rows),
+        "session": [f"s{value:x}" for value in rng.integers(0, 2**40, size=rows)],
+    })
+    df["target"] = (df["income"] * 0.001 + df["age"] * 0.5 + rng.normal(size=rows)).round(3)
+    # Beyond float32's exact range: any narrowing shows up in the fit
+    df["revenue"] = (1.2e8 + df["income"] * 100 + rng.normal(size=rows)).round(2)
+
+    return df.to_csv(index=False).encode()
+
+def train(flow_columns, dataset, optimize):
+    dtype_service.DTYPE_OPTIMIZE = optimize
+    dtype_service.DTYPE_DOWNCAST_FLOATS = optimize
+    flow = SimpleNamespace(config_json={
+        "algorithm": "Linear Regression",
+        "data_range_X": flow_columns[0],
+        "data_range_y": flow_columns[1],
+        "test_size": 0.2
+    })
+
+    X, y, _, _ = prepare_data(flow, dataset)
+    model, _, _, metrics = train_linear_regression(X, y, flow)
+
+    return np.ravel(model.coef_), metrics
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="max relative difference")
+    args = parser.parse_args()
+
+    data = make_csv(args.rows)
+    default_frame = pd.read_csv(io.BytesIO(data))
+    schema = {column: str(dtype) for column, dtype in default_frame.dtypes.items()}
+    stats = compute_column_stats(default_frame)
+    plan = dtype_service.plan_dtypes(schema, stats)
+
+    # 1. Memory report
+    report = dtype_service.memory_report(default_frame, plan)
+
+    print(f"rows={args.rows}")
+    print(f"{'column':<10} {'dtype':<10} {'planned':<22} {'MiB':>9} {'planned MiB':>12}")
+    for column, entry in report["columns"].items():
+        print(
+            f"{column:<10} {entry['dtype']:<10} {entry['optimized_dtype']:<22} "
+            f"{entry['bytes'] / 2**20:9.1f} {entry['optimized_bytes'] / 2**20:12.1f}"
+        )
+    print(f"total      {report['bytes'] / 2**20:.1f} MiB -> {report['optimized_bytes'] / 2**20:.1f} MiB "
+          f"({report['reduction']:.1%} smaller)")
+
+    for label, dtypes in (("default read", None), ("planned read", plan)):
+        started = time.perf_counter()
+        pd.read_csv(io.BytesIO(data), dtype=dtypes)
+        print(f"{label}: {time.perf_counter() - started:.2f}s")
+
+    # 2. Training parity against the float64 path
+    upload_file(io.BytesIO(data), "benchmark/dtype.csv")
+    dataset = SimpleNamespace(storage_path="benchmark/dtype.csv", column_schema=schema, column_stats=stats, row_count=args.rows)
+
+    failures = 0
+
+    for feature, target in [(feature, target) for target in ("target", "revenue") for feature in ("age", "visits", "income", "score")]:
+        coef_plan, metrics_plan = train((feature, target), dataset, optimize=True)
+        coef_base, metrics_base = train((feature, target), dataset, optimize=False)
+
+        worst = max(
+            float(np.max(np.abs(coef_plan - coef_base) / np.maximum(np.abs(coef_base), 1e-12))),
+            *(abs(metrics_plan[k] - metrics_base[k]) / max(abs(metrics_base[k]), 1e-12) for k in metrics_base)
+        )
+        ok = worst <= args.tolerance
+        failures += not ok
+
+        print(f"parity {feature:<7} -> {target:<8} max relative diff {worst:.2e} {'ok' if ok else 'FAIL'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
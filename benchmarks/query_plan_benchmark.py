@@ -0,0 +1,166 @@
+"""Query-plan benchmark for the hot metadata lookups.
+
+Seeds trained_models, user_flows and datasets with --rows rows each, then
+runs the per-request lookups before and after migration 0002 and prints
+the query plan and median latency of each.
+
+Usage:
+    python benchmarks/query_plan_benchmark.py --rows 1000000
+    python benchmarks/query_plan_benchmark.py --url mysql+pymysql://user:pw@host/db
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+import models.user_flow
+import models.datasets
+import models.trained_models
+import models.batch_jobs
+from database import Base
+from migrations.versions import m0002_hot_path_indexes
+
+QUERIES = {
+    "model by (user_id, id)": (
+        "SELECT id, model_path FROM trained_models WHERE user_id = :user_id AND id = :model_id"
+    ),
+    "models by (user_id, flow_id)": (
+        "SELECT id, metrics_json FROM trained_models WHERE user_id = :user_id AND flow_id = :flow_id"
+    ),
+    "flow by (user_id, flow_name)": (
+        "SELECT id, config_json FROM user_flows WHERE user_id = :user_id AND flow_name = :flow_name"
+    ),
+    "flows by (user_id, dataset_name)": (
+        "SELECT flow_name FROM user_flows WHERE user_id = :user_id AND dataset_name = :dataset_name"
+    ),
+    "dataset by (user_id, dataset_name)": (
+        "SELECT id, storage_path FROM datasets WHERE user_id = :user_id AND dataset_name = :dataset_name"
+    ),
+}
+
+NEW_INDEXES = {
+    "ix_trained_models_user_id_id": "trained_models",
+    "ix_trained_models_user_id_flow_id": "trained_models",
+    "ix_user_flows_user_id_dataset_name": "user_flows",
+    "ix_batch_jobs_user_id_id": "batch_jobs",
+}
+
+def seed(connection, rows, users, batch=50_000):
+    flows = [str(uuid.uuid4()) for _ in range(max(rows // 10, 1))]
+    sample = {}
+
+    for start in range(0, rows, batch):
+        models_batch, flows_batch, datasets_batch = [], [], []
+
+        for i in range(start, min(start + batch, rows)):
+            user_id = str(i % users)
+            model_id = str(uuid.uuid4())
+            flow_id = flows[i % len(flows)]
+
+            models_batch.append({
+                "id": model_id, "flow_id": flow_id, "user_id": user_id,
+                "model_type": "Linear Regression", "model_path": f"/{user_id}/trained_models/model_{model_id}.pkl",
+                "metrics_json": '{"mae": 1.0, "rmse": 1.0, "r2": 0.5}'
+            })
+            flows_batch.append({
+                "id": str(uuid.uuid4()), "user_id": user_id, "flow_name": f"flow_{i}",
+                "dataset_name": f"dataset_{i // 3}", "config_json": "{}"
+            })
+            datasets_batch.append({
+                "id": str(uuid.uuid4()), "user_id": user_id, "dataset_name": f"dataset_{i}",
+                "format": "csv", "storage_path": f"{user_id}/csv/dataset_{i}.csv", "row_count": 100
+            })
+
+            if i == rows // 2:
+                sample = {
+                    "user_id": user_id, "model_id": model_id, "flow_id": flow_id,
+                    "flow_name": f"flow_{i}", "dataset_name": f"dataset_{i}"
+                }
+
+        connection.execute(text(
+            "INSERT INTO trained_models (id, flow_id, user_id, model_type, model_path, metrics_json) "
+            "VALUES (:id, :flow_id, :user_id, :model_type, :model_path, :metrics_json)"
+        ), models_batch)
+        connection.execute(text(
+            "INSERT INTO user_flows (id, user_id, flow_name, dataset_name, config_json) "
+            "VALUES (:id, :user_id, :flow_name, :dataset_name, :config_json)"
+        ), flows_batch)
+        connection.execute(text(
+            "INSERT INTO datasets (id, user_id, dataset_name, format, storage_path, row_count) "
+            "VALUES (:id, :user_id, :dataset_name, :format, :storage_path, :row_count)"
+        ), datasets_batch)
+
+    return sample
+
+def explain(connection, sql, params):
+    if connection.dialect.name == "sqlite":
+        plan = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+        return "; ".join(row[-1] for row in plan)
+
+    plan = connection.execute(text(f"EXPLAIN {sql}"), params).mappings().all()
+    return "; ".join(f"{row.get('table')}: key={row.get('key')} rows={row.get('rows')}" for row in plan)
+
+def measure(connection, params, repeats):
+    results = {}
+
+    for name, sql in QUERIES.items():
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            connection.execute(text(sql), params).all()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        results[name] = (statistics.median(timings), explain(connection, sql, params))
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--url", help="database URL (defaults to a temporary SQLite file)")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plan_benchmark.db')}"
+    engine = create_engine(url)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        # Start from the pre-migration schema
+        for index, table in NEW_INDEXES.items():
+            if connection.dialect.name == "mysql":
+                connection.execute(text(f"DROP INDEX {index} ON {table}"))
+            else:
+                connection.execute(text(f"DROP INDEX {index}"))
+
+        start = time.perf_counter()
+        params = seed(connection, args.rows, args.users)
+        print(f"seeded {args.rows:,} rows per table in {time.perf_counter() - start:.1f}s")
+
+    with engine.connect() as connection:
+        before = measure(connection, params, args.repeats)
+
+    with engine.begin() as connection:
+        m0002_hot_path_indexes.upgrade(connection)
+
+    with engine.connect() as connection:
+        after = measure(connection, params, args.repeats)
+
+    for name in QUERIES:
+        print(f"\n{name}")
+        print(f"  before  {before[name][0]:9.3f} ms  {before[name][1]}")
+        print(f"  after   {after[name][0]:9.3f} ms  {after[name][1]}")
+
+if __name__ == "__main__":
+    main()
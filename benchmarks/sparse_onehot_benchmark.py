@@ -0,0 +1,92 @@
+"""Dense vs sparse one-hot training on a high-cardinality categorical column.
+
+Builds --rows rows whose single feature has --categories distinct values,
+then runs encode -> scale -> LinearRegression both ways: the old dense path
+(one-hot, .toarray(), centered StandardScaler) and the CSR path that
+prepare_data now takes above SPARSE_CARDINALITY_THRESHOLD. Prints the
+encoded matrix size, peak traced memory and wall time of each.
+
+Usage:
+    python benchmarks/sparse_onehot_benchmark.py --rows 20000 --categories 10000
+    python benchmarks/sparse_onehot_benchmark.py --rows 200000 --categories 50000 --skip-dense
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from services.training_service import encode_categorical
+
+def make_data(rows, categories, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, categories, size=rows)
+    effects = rng.normal(size=categories)
+
+    X = np.array([f"cat_{code}" for code in codes], dtype=object).reshape(-1, 1)
+    y = (effects[codes] + rng.normal(scale=0.1, size=rows)).reshape(-1, 1)
+
+    return X, y
+
+def matrix_bytes(X):
+    if hasattr(X, "data"):
+        if hasattr(X, "indices"):
+            return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+        return X.nbytes
+
+    return X.nbytes
+
+def dense_path(X, y):
+    encoded = OneHotEncoder().fit_transform(X).toarray()
+    scaled = StandardScaler().fit_transform(encoded)
+    LinearRegression().fit(scaled, y)
+
+    return encoded
+
+def sparse_path(X, y):
+    encoded, _ = encode_categorical(X, {"cardinality": len(np.unique(X))})
+    scaled = StandardScaler(with_mean=False).fit_transform(encoded)
+    LinearRegression().fit(scaled, y)
+
+    return encoded
+
+def measure(name, path, X, y):
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    encoded = path(X, y)
+
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<7} shape={encoded.shape} matrix={matrix_bytes(encoded) / 2**20:9.1f} MiB "
+        f"peak={peak / 2**20:9.1f} MiB time={elapsed:7.2f}s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--categories", type=int, default=10_000)
+    parser.add_argument("--skip-dense", action="store_true", help="only run the sparse path")
+    args = parser.parse_args()
+
+    X, y = make_data(args.rows, args.categories)
+
+    print(f"rows={args.rows} categories={args.categories}")
+    print(f"dense one-hot would need {args.rows * args.categories * 8 / 2**20:.1f} MiB")
+
+    measure("sparse", sparse_path, X, y)
+
+    if not args.skip_dense:
+        measure("dense", dense_path, X, y)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""Cold-start benchmark for the model server.
+
+Measures, in fresh interpreters:
+  * the time to `import main` and which heavy libraries that pulls in
+  * time-to-first-request: from launching uvicorn until /openapi.json answers
+    (this includes the lifespan hook, so the configured database must be reachable)
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "sklearn", "joblib", "boto3", "numpy", "scipy"]
+
+IMPORT_SNIPPET = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def measure_import():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure_first_request(port, timeout=60.0):
+    start = time.perf_counter()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT
+    )
+
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving a request")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/openapi.json", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+
+        raise TimeoutError("server did not answer in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skip-server", action="store_true", help="only measure import time")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_times = [run["seconds"] * 1000 for run in imports]
+
+    print(f"import main          median {statistics.median(import_times):8.1f} ms   min {min(import_times):8.1f} ms")
+    print(f"heavy modules loaded {imports[-1]['loaded'] or 'none'}")
+
+    if not args.skip_server:
+        first_request = [measure_first_request(args.port) * 1000 for _ in range(args.runs)]
+        print(f"time to first request median {statistics.median(first_request):8.1f} ms   min {min(first_request):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+
+import os
+
+# Load .env once for the whole process; modules read settings with os.getenv
+load_dotenv()
+
+# "server" runs against MySQL + S3. "embedded" is a single-node install with
+# SQLite (WAL) and the local filesystem, no external services required.
+DEPLOYMENT_MODE = os.getenv("DEPLOYMENT_MODE", "server").lower()
+EMBEDDED = DEPLOYMENT_MODE == "embedded"
\ No newline at end of file
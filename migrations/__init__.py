@@ -0,0 +1,74 @@
+import importlib
+import pkgutil
+
+from sqlalchemy import inspect, text
+
+from migrations import versions
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+def _discover():
+    names = sorted(
+        module.name for module in pkgutil.iter_modules(versions.__path__)
+        if module.name.startswith("m")
+    )
+
+    return [importlib.import_module(f"{versions.__name__}.{name}") for name in names]
+
+def create_index_if_missing(connection, name: str, table: str, columns):
+    existing = {index["name"] for index in inspect(connection).get_indexes(table)}
+
+    if name not in existing:
+        connection.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+def add_column_if_missing(connection, table: str, column: str, ddl: str):
+    existing = {c["name"] for c in inspect(connection).get_columns(table)}
+
+    if column not in existing:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+def run_migrations(engine):
+    """Apply every migration in migrations/versions that is not yet recorded.
+
+    Migrations are plain modules named mNNNN_<description>.py exposing
+    VERSION and upgrade(connection); they run in name order, each in its
+    own transaction.
+    """
+    applied_now = []
+
+    with engine.connect() as connection:
+        is_mysql = connection.dialect.name == "mysql"
+
+        # Several workers may start at once; only one should migrate
+        if is_mysql:
+            connection.execute(text("SELECT GET_LOCK('schema_migrations', 60)"))
+
+        try:
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+                "version VARCHAR(64) PRIMARY KEY, "
+                "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            ))
+            connection.commit()
+
+            applied = set(connection.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}")).scalars())
+            connection.commit()
+
+            for migration in _discover():
+                if migration.VERSION in applied:
+                    continue
+
+                with connection.begin():
+                    migration.upgrade(connection)
+                    connection.execute(
+                        text(f"INSERT INTO {MIGRATIONS_TABLE} (version) VALUES (:version)"),
+                        {"version": migration.VERSION}
+                    )
+
+                applied_now.append(migration.VERSION)
+
+        finally:
+            if is_mysql:
+                connection.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+
+    return applied_now
@@ -0,0 +1,68 @@
+"""Baseline schema: the tables previously created by create_all in main.py.
+
+The tables are spelled out as they were at that point instead of taken
+from the ORM models, so later model changes cannot leak into the baseline
+(they belong in their own migrations).
+"""
+from sqlalchemy import JSON, Column, DateTime, Enum, Integer, MetaData, String, Table, Text, UniqueConstraint, func
+
+VERSION = "0001_initial"
+
+metadata = MetaData()
+
+Table(
+    "user_flows", metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("user_id", String(36), nullable=False),
+    Column("flow_name", String(128)),
+    Column("dataset_name", String(128)),
+    Column("dataset_id", String(36)),
+    Column("config_json", JSON),
+    Column("created_at", DateTime, default=func.now()),
+    UniqueConstraint("user_id", "flow_name"),
+)
+
+Table(
+    "datasets", metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("user_id", String(36), nullable=False),
+    Column("dataset_name", String(128), nullable=False),
+    Column("description", Text),
+    Column("format", Enum("csv", name="dataformat"), nullable=False),
+    Column("storage_path", String(255), nullable=False),
+    Column("row_count", Integer),
+    Column("column_schema", JSON),
+    Column("created_at", DateTime, default=func.now()),
+    UniqueConstraint("user_id", "dataset_name", name="uq_user_dataset_name"),
+)
+
+Table(
+    "trained_models", metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("flow_id", String(36)),
+    Column("user_id", String(36), nullable=False),
+    Column("model_type", String(128)),
+    Column("model_path", String(255)),
+    Column("metrics_json", JSON),
+    Column("trained_at", DateTime, default=func.now()),
+    UniqueConstraint("model_path", name="uq_trainedmodels_model_path"),
+)
+
+Table(
+    "batch_jobs", metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("user_id", String(36), nullable=False),
+    Column("model_id", String(36), nullable=False),
+    Column("dataset_name", String(128), nullable=False),
+    Column("status", Enum("pending", "running", "completed", "failed", name="batchjobstatus"), nullable=False),
+    Column("rows_processed", Integer),
+    Column("total_rows", Integer),
+    Column("output_path", String(255)),
+    Column("error", Text),
+    Column("created_at", DateTime, default=func.now()),
+    Column("finished_at", DateTime),
+)
+
+def upgrade(connection):
+    # checkfirst keeps this a no-op on databases created before migrations existed
+    metadata.create_all(bind=connection, checkfirst=True)
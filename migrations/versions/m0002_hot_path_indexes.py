@@ -0,0 +1,18 @@
+"""Composite indexes for the per-user lookups every request runs.
+
+(user_id, flow_name) on user_flows and (user_id, dataset_name) on datasets
+are already covered by their unique constraints.
+"""
+from migrations import create_index_if_missing
+
+VERSION = "0002_hot_path_indexes"
+
+def upgrade(connection):
+    # predict / delete / metrics: WHERE user_id = ? AND id = ?
+    create_index_if_missing(connection, "ix_trained_models_user_id_id", "trained_models", ["user_id", "id"])
+    # leaderboard per flow: WHERE user_id = ? AND flow_id = ?
+    create_index_if_missing(connection, "ix_trained_models_user_id_flow_id", "trained_models", ["user_id", "flow_id"])
+    # delete_dataset: is the dataset still bound to a flow?
+    create_index_if_missing(connection, "ix_user_flows_user_id_dataset_name", "user_flows", ["user_id", "dataset_name"])
+    # batch job status polling
+    create_index_if_missing(connection, "ix_batch_jobs_user_id_id", "batch_jobs", ["user_id", "id"])
@@ -0,0 +1,9 @@
+"""Indexes backing the newest-first keyset pagination of the list endpoints."""
+from migrations import create_index_if_missing
+
+VERSION = "0003_listing_indexes"
+
+def upgrade(connection):
+    create_index_if_missing(connection, "ix_trained_models_user_id_trained_at_id", "trained_models", ["user_id", "trained_at", "id"])
+    create_index_if_missing(connection, "ix_datasets_user_id_created_at_id", "datasets", ["user_id", "created_at", "id"])
+    create_index_if_missing(connection, "ix_user_flows_user_id_created_at_id", "user_flows", ["user_id", "created_at", "id"])
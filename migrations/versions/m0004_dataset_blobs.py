@@ -0,0 +1,27 @@
+"""Content-addressed dataset storage: shared blobs with reference counts."""
+from sqlalchemy import BIGINT, Column, DateTime, Integer, MetaData, String, Table, UniqueConstraint, func
+
+from migrations import add_column_if_missing
+
+VERSION = "0004_dataset_blobs"
+
+# The table as this migration introduced it, independent of later model changes
+metadata = MetaData()
+
+dataset_blobs = Table(
+    "dataset_blobs", metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("user_id", String(36), nullable=False),
+    Column("content_hash", String(64), nullable=False),
+    Column("storage_path", String(255), nullable=False),
+    Column("size_bytes", BIGINT),
+    Column("ref_count", Integer, nullable=False),
+    Column("created_at", DateTime, default=func.now()),
+    UniqueConstraint("user_id", "content_hash", name="uq_dataset_blobs_user_id_content_hash"),
+)
+
+def upgrade(connection):
+    dataset_blobs.create(bind=connection, checkfirst=True)
+
+    # Existing datasets keep their per-dataset copy and a NULL hash
+    add_column_if_missing(connection, "datasets", "content_hash", "VARCHAR(64)")
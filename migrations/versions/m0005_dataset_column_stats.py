@@ -0,0 +1,8 @@
+"""Per-column statistics computed at upload time."""
+from migrations import add_column_if_missing
+
+VERSION = "0005_dataset_column_stats"
+
+def upgrade(connection):
+    # Datasets uploaded earlier keep NULL stats; training then falls back to fitting
+    add_column_if_missing(connection, "datasets", "column_stats", "JSON")
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""Flag models trained on a sample (preview mode)."""
+from migrations import add_column_if_missing
+
+VERSION = "0006_trained_models_is_preview"
+
+def upgrade(connection):
+    # Every model trained before previews existed was a full run
+    add_column_if_missing(connection, "trained_models", "is_preview", "BOOLEAN NOT NULL DEFAULT FALSE")
\ No newline at end of file
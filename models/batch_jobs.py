@@ -0,0 +1,30 @@
+import uuid
+from sqlalchemy import Column, Integer, String, DateTime, func, Text, Index, Enum as SQLEnum
+from database import Base
+from enum import Enum
+
+
+class BatchJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class BatchJobs(Base):
+    __tablename__ = 'batch_jobs'
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    user_id = Column(String(36), nullable=False)
+    model_id = Column(String(36), nullable=False)
+    dataset_name = Column(String(128), nullable=False)
+    status = Column(SQLEnum(BatchJobStatus), nullable=False, default=BatchJobStatus.pending)
+    rows_processed = Column(Integer, default=0)
+    total_rows = Column(Integer)
+    output_path = Column(String(255))
+    error = Column(Text)
+    created_at = Column(DateTime, default=func.now())
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_batch_jobs_user_id_id", "user_id", "id"),
+    )
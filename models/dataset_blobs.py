@@ -0,0 +1,20 @@
+import uuid
+from sqlalchemy import BIGINT, Column, Integer, String, DateTime, func, UniqueConstraint
+from database import Base
+
+
+class DatasetBlobs(Base):
+    """One stored CSV per (user, content hash), shared by every dataset with those bytes."""
+    __tablename__ = 'dataset_blobs'
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    user_id = Column(String(36), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    storage_path = Column(String(255), nullable=False)
+    size_bytes = Column(BIGINT)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'content_hash', name='uq_dataset_blobs_user_id_content_hash'),
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Boolean, Column, Integer, String, BIGINT, JSON, DateTime, func, UniqueConstraint, Text, false, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, Integer, String, BIGINT, JSON, DateTime, func, UniqueConstraint, Text, false, Index, Enum as SQLEnum
 from database import Base
 from enum import Enum
 from sqlalchemy.ext.mutable import MutableDict
@@ -19,10 +19,15 @@ class DataSets(Base):
     storage_path = Column(String(255), nullable=False)
     row_count = Column(Integer)
     column_schema = Column(MutableDict.as_mutable(JSON))
+    # sha256 of the uploaded bytes; storage_path then points at the shared blob
+    content_hash = Column(String(64))
+    # count/nulls/min/max/mean/var/quantiles/cardinality per column, see dataset_stats_service
+    column_stats = Column(JSON)
     #has_header = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     #deleted_at = Column(DateTime, default=func.now())
 
     __table_args__ = (
         UniqueConstraint('user_id', 'dataset_name', name='uq_user_dataset_name'),
+        Index('ix_datasets_user_id_created_at_id', 'user_id', 'created_at', 'id'),
     )
\ No newline at end of file
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Boolean, Column, Integer, String, BIGINT, JSON, DateTime, func, UniqueConstraint
+from sqlalchemy import Boolean, Column, Integer, String, BIGINT, JSON, DateTime, func, UniqueConstraint, Index, false
 from database import Base
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.dialects.postgresql import JSON
@@ -14,6 +14,13 @@ class TrainedModels(Base):
     model_type = Column(String(128))
     model_path =  Column(String(255))
     metrics_json = Column(MutableDict.as_mutable(JSON))
+    # Trained on a sample of the flow's rows; see POST /train/{model_id}/promote
+    is_preview = Column(Boolean, nullable=False, default=False, server_default=false())
     trained_at = Column(DateTime, default=func.now())
 
-    __table_args__ = (UniqueConstraint("model_path", name="uq_trainedmodels_model_path"),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("model_path", name="uq_trainedmodels_model_path"),
+        Index("ix_trained_models_user_id_id", "user_id", "id"),
+        Index("ix_trained_models_user_id_flow_id", "user_id", "flow_id"),
+        Index("ix_trained_models_user_id_trained_at_id", "user_id", "trained_at", "id"),
+    )
\ No newline at end of file
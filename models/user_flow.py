@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Boolean, Column, Integer, String, BIGINT, JSON, DateTime, func, UniqueConstraint, false
+from sqlalchemy import Boolean, Column, Integer, String, BIGINT, JSON, DateTime, func, UniqueConstraint, false, Index
 from database import Base
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.dialects.postgresql import JSON
@@ -16,4 +16,8 @@ class UserFlows(Base):
     config_json = Column(MutableDict.as_mutable(JSON))
     created_at = Column(DateTime, default=func.now())
 
-    __table_args__ = (UniqueConstraint("user_id", "flow_name"),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("user_id", "flow_name"),
+        Index("ix_user_flows_user_id_dataset_name", "user_id", "dataset_name"),
+        Index("ix_user_flows_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
\ No newline at end of file
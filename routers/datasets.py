@@ -1,29 +1,21 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, status, HTTPException, Header, Form, File, UploadFile
-from database import SessionLocal
+from datetime import datetime
+from typing import Annotated, Any
+from fastapi import APIRouter, Depends, status, HTTPException, Header, Form, File, UploadFile, Query
+from fastapi.concurrency import run_in_threadpool
+from database import get_db, get_async_db
 from sqlalchemy.orm import Session
 #from services.auth_service import get_current_user
 
 from services.datasets_service import get_all_datasets, get_dataset_by_name, create_dataset, delete_dataset
+from services.pagination_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/datasets",
     tags=["DataSets"]
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except:
-        db.rollback()
-        raise
-    finally:
-        db.close()
-
-
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[Any, Depends(get_async_db)]
 
 USER_KEYS = {
     "KEY123": 1,
@@ -37,27 +29,32 @@ def get_current_user_id(x_api_key: str = Header(None)):
     return USER_KEYS[x_api_key]
 
 @router.get("/{dataset_name}", status_code=status.HTTP_200_OK)
-async def get_datasets(dataset_name: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+async def get_datasets(dataset_name: str, adb: async_db_dependency, user_id: str = Depends(get_current_user_id)):
 
-    result = get_dataset_by_name(dataset_name, user_id, db)
+    result = await get_dataset_by_name(dataset_name, user_id, adb)
 
     return result
 
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def list_datasets(db: db_dependency, user_id: str = Depends(get_current_user_id)):
+async def list_datasets(
+        adb: async_db_dependency,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str = Query(None),
+        created_after: datetime = Query(None),
+        created_before: datetime = Query(None),
+        user_id: str = Depends(get_current_user_id)
+):
 
-    result = get_all_datasets(user_id, db)
+    result = await get_all_datasets(user_id, adb, limit, cursor, created_after, created_before)
 
     return result
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_datasets(db: db_dependency, dataset_name: str = Form(...), description: str = Form(None), file: UploadFile = File(...), user_id: str = Depends(get_current_user_id)):
 
-    print(user_id)
-
-    result = create_dataset(user_id, db, dataset_name, description, file)
+    result = await run_in_threadpool(create_dataset, user_id, db, dataset_name, description, file)
 
     return result
 
@@ -65,6 +62,6 @@ async def create_datasets(db: db_dependency, dataset_name: str = Form(...), desc
 @router.delete("/{dataset_name}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_datasets(dataset_name: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
 
-    result = delete_dataset(dataset_name, user_id, db)
+    result = await run_in_threadpool(delete_dataset, dataset_name, user_id, db)
 
     return result
\ No newline at end of file
@@ -1,11 +1,12 @@
-from typing import Annotated, List
+from typing import Annotated, Any, List
 from fastapi import APIRouter, Depends, status, HTTPException, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 #from services.auth_service import get_current_user
-from database import SessionLocal
+from database import get_db, get_async_db, pool_status
 from sqlalchemy.orm import Session
 
-from services.metrics_service import metrics_with_saved_models
+from services.metrics_service import metrics_with_saved_models, metrics_leaderboard, evaluate_models_on_dataset
 
 router = APIRouter(
     prefix="/metrics",
@@ -16,19 +17,12 @@ class MetricsCompareRequest(BaseModel):
     model_ida: str
     model_idb: str
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except:
-        db.rollback()
-        raise
-    finally:
-        db.close()
-
+class MetricsEvaluateRequest(BaseModel):
+    dataset_name: str
+    model_ids: List[str]
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[Any, Depends(get_async_db)]
 
 USER_KEYS = {
     "KEY123": 1,
@@ -42,8 +36,39 @@ def get_current_user_id(x_api_key: str = Header(None)):
     return USER_KEYS[x_api_key]
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def compare_metrics_with_saved_models(model_id: MetricsCompareRequest, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+async def compare_metrics_with_saved_models(model_id: MetricsCompareRequest, adb: async_db_dependency, user_id: str = Depends(get_current_user_id)):
+
+    result = await metrics_with_saved_models(user_id, model_id.model_ida, model_id.model_idb, adb)
+
+    return result
+
+@router.get("/leaderboard", status_code=status.HTTP_200_OK)
+async def get_metrics_leaderboard(
+        adb: async_db_dependency,
+        flow_name: str = Query(None),
+        model_ids: List[str] = Query(None),
+        rank_by: List[str] = Query(["r2"]),
+        limit: int = Query(50, ge=1, le=500),
+        offset: int = Query(0, ge=0),
+        user_id: str = Depends(get_current_user_id)
+):
+
+    result = await metrics_leaderboard(user_id, adb, flow_name, model_ids, rank_by, limit, offset)
+
+    return result
+
+@router.post("/evaluate", status_code=status.HTTP_200_OK)
+async def evaluate_models(evaluation: MetricsEvaluateRequest, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+
+    # Downloading, parsing and scoring the dataset is blocking work; keep it
+    # off the event loop
+    result = await run_in_threadpool(evaluate_models_on_dataset, user_id, evaluation.dataset_name, evaluation.model_ids, db)
+
+    return result
+
+@router.get("/db_pool", status_code=status.HTTP_200_OK)
+async def get_db_pool_status(user_id: str = Depends(get_current_user_id)):
 
-    result = metrics_with_saved_models(user_id, model_id.model_ida, model_id.model_idb, db)
+    result = pool_status()
 
     return result
\ No newline at end of file
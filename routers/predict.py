@@ -1,25 +1,29 @@
-from fastapi import APIRouter, Depends, status, Header, HTTPException, Body, UploadFile, File
+from fastapi import APIRouter, Depends, status, Header, HTTPException, Body, UploadFile, File, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from services.auth_service import get_current_user
-from database import SessionLocal
-from typing import Annotated, Union, Dict, List
+from database import get_db, get_async_db
+from typing import Annotated, Any, Union, Dict, List
 
-from services.predict_service import predict_model, predict_using_csv
+from services.predict_service import predict_model, predict_using_csv, predict_multi_model
+from services.batch_service import create_batch_job, get_batch_job, open_batch_output, run_batch_job
 
 router = APIRouter(
     prefix="/predict",
     tags=["Predict"]
 )
 
-# DB dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[Any, Depends(get_async_db)]
+
+class BatchScoreRequest(BaseModel):
+    dataset_name: str
+    model_id: str
+
+class MultiModelPredictRequest(BaseModel):
+    model_ids: List[str]
+    input_data: Union[Dict, List[Dict]]
 
 USER_KEYS = {
     "KEY123": 1,
@@ -32,14 +36,41 @@ def get_current_user_id(x_api_key: str = Header(None)):
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
     return USER_KEYS[x_api_key]
 
+# Declared before /{model_id} so "batch" and "multi" are not captured as model ids
+@router.post("/multi", status_code=status.HTTP_200_OK)
+async def predict_multi(request: MultiModelPredictRequest, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+    result = await run_in_threadpool(predict_multi_model, request.model_ids, request.input_data, user_id, db)
+
+    return result
+
+@router.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def start_batch_scoring(batch: BatchScoreRequest, background_tasks: BackgroundTasks, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+    result = await run_in_threadpool(create_batch_job, batch.dataset_name, batch.model_id, user_id, db)
+
+    background_tasks.add_task(run_batch_job, result["job_id"])
+
+    return result
+
+@router.get("/batch/{job_id}", status_code=status.HTTP_200_OK)
+async def get_batch_scoring_job(job_id: str, adb: async_db_dependency, user_id: str = Depends(get_current_user_id)):
+    result = await get_batch_job(job_id, user_id, adb)
+
+    return result
+
+@router.get("/batch/{job_id}/download", status_code=status.HTTP_200_OK)
+async def download_batch_scoring_output(job_id: str, adb: async_db_dependency, user_id: str = Depends(get_current_user_id)):
+    chunks = await open_batch_output(job_id, user_id, adb)
+
+    return StreamingResponse(chunks, media_type="text/csv", headers={"Content-Disposition": f'attachment; filename="batch_{job_id}.csv"'})
+
 @router.post("/{model_id}", status_code=status.HTTP_200_OK)
 async def predict(model_id: str, db: db_dependency, input_data: Union[Dict, List[Dict]] = Body(...), user_id: str = Depends(get_current_user_id)):
-    result = predict_model(model_id, input_data, user_id, db)
+    result = await run_in_threadpool(predict_model, model_id, input_data, user_id, db)
 
     return result
 
 @router.post("/{model_id}/csv", status_code=status.HTTP_200_OK)
 async def predict_csv(model_id: str, db: db_dependency, file: UploadFile = File(...), user_id: str = Depends(get_current_user_id)):
-    result = predict_using_csv(model_id, file, user_id, db)
+    result = await run_in_threadpool(predict_using_csv, model_id, file, user_id, db)
 
     return result
\ No newline at end of file
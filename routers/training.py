@@ -1,25 +1,21 @@
-from fastapi import APIRouter, Depends, status, Header, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, status, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
-from typing import Annotated
-from services.auth_service import get_current_user
-from services.training_service import train_model, get_all_models, delete_model
+from database import get_db, get_async_db
+from typing import Annotated, Any, Literal
+from services.training_service import train_model, get_all_models, delete_model, promote_preview
+from services.sampling_service import PREVIEW_SAMPLE_SIZE
+from services.pagination_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/train",
     tags=["Training"]
 )
 
-# DB dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[Any, Depends(get_async_db)]
 
 USER_KEYS = {
     "KEY123": 1,
@@ -35,21 +31,49 @@ def get_current_user_id(x_api_key: str = Header(None)):
 @router.delete("/{model_id}", status_code=status.HTTP_200_OK)
 async def delete_trained_model(model_id: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
 
-    result = delete_model(model_id, user_id, db)
+    result = await run_in_threadpool(delete_model, model_id, user_id, db)
 
     return result
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def get_all_trained_models(db: db_dependency, user_id: str = Depends(get_current_user_id)):
-
-    result = get_all_models(user_id, db)
+async def get_all_trained_models(
+        adb: async_db_dependency,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str = Query(None),
+        flow_name: str = Query(None),
+        model_type: str = Query(None),
+        trained_after: datetime = Query(None),
+        trained_before: datetime = Query(None),
+        user_id: str = Depends(get_current_user_id)
+):
+
+    result = await get_all_models(user_id, adb, limit, cursor, flow_name, model_type, trained_after, trained_before)
 
     return result
 
 @router.post("/{flow_name}", status_code=status.HTTP_200_OK)
-async def train_the_model(flow_name: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+async def train_the_model(
+        flow_name: str,
+        db: db_dependency,
+        preview: bool = Query(False),
+        sample_size: int = Query(PREVIEW_SAMPLE_SIZE, ge=100),
+        sampling: Literal["reservoir", "stratified"] = Query("reservoir"),
+        user_id: str = Depends(get_current_user_id)
+):
+
+    # A preview fits on a sample of the rows and returns approximate metrics
+    sample = {"size": sample_size, "method": sampling, "seed": 0} if preview else None
+
+    # Fitting is CPU-bound; keep it off the event loop so predictions are
+    # served while jobs train (the thread budget limits how many run at once)
+    result = await run_in_threadpool(train_model, flow_name, user_id, db, sample)
+
+    return result
+
+@router.post("/{model_id}/promote", status_code=status.HTTP_200_OK)
+async def promote_preview_model(model_id: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
 
-    result = train_model(flow_name, user_id, db)
+    result = await run_in_threadpool(promote_preview, model_id, user_id, db)
 
     return result
 
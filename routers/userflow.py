@@ -1,12 +1,15 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, status, HTTPException, Header
+from datetime import datetime
+from typing import Annotated, Any, Dict, Optional
+from fastapi import APIRouter, Depends, status, HTTPException, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from models.user_flow_update import UserFlowUpdate
 from schemas.config_schema import ConfigSchema
-from pydantic import BaseModel
-from database import SessionLocal
+from pydantic import BaseModel, Field
+from database import get_db, get_async_db
 from sqlalchemy.orm import Session
 #from services.auth_service import get_current_user
-from services.userflow_service import get_by_flowname, get_userflows, create_userflow, delete_userflow_by_name, update_userflow
+from services.userflow_service import get_by_flowname, get_userflows, create_userflow, delete_userflow_by_name, update_userflow, validate_flows
+from services.pagination_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/user_flows",
@@ -18,19 +21,16 @@ class UserFlowBase(BaseModel):
     dataset_name: str
     config_json: ConfigSchema
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+class FlowValidationItem(BaseModel):
+    flow_name: Optional[str] = None
+    dataset_name: Optional[str] = None
+    config_json: Optional[Dict[str, Any]] = None
 
+class FlowValidationRequest(BaseModel):
+    flows: list[FlowValidationItem] = Field(..., min_length=1, max_length=1000)
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[Any, Depends(get_async_db)]
 
 USER_KEYS = {
     "KEY123": 1,
@@ -44,34 +44,49 @@ def get_current_user_id(x_api_key: str = Header(None)):
     return USER_KEYS[x_api_key]
 
 @router.get("/{flow_name}", status_code=status.HTTP_200_OK)
-async def get_flow_by_name(flow_name: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
-    result = get_by_flowname(flow_name, db, user_id)
+async def get_flow_by_name(flow_name: str, adb: async_db_dependency, user_id: str = Depends(get_current_user_id)):
+    result = await get_by_flowname(flow_name, adb, user_id)
 
     return result
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def get_user_flows(db: db_dependency, user_id: str = Depends(get_current_user_id)):
-
-    result = get_userflows(db, user_id, )
+async def get_user_flows(
+        adb: async_db_dependency,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str = Query(None),
+        dataset_name: str = Query(None),
+        created_after: datetime = Query(None),
+        created_before: datetime = Query(None),
+        user_id: str = Depends(get_current_user_id)
+):
+
+    result = await get_userflows(adb, user_id, limit, cursor, dataset_name, created_after, created_before)
 
     return result
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_user_flow(user_flow: UserFlowBase, db: db_dependency, user_id: str = Depends(get_current_user_id)):
 
-    result = create_userflow(user_flow, db, user_id)
+    result = await run_in_threadpool(create_userflow, user_flow, db, user_id)
+
+    return result
+
+@router.post("/validate", status_code=status.HTTP_200_OK)
+async def validate_user_flows(request: FlowValidationRequest, db: db_dependency, user_id: str = Depends(get_current_user_id)):
+
+    result = await run_in_threadpool(validate_flows, request.flows, db, user_id)
 
     return result
 
 @router.delete("/{flow_name}", status_code=status.HTTP_410_GONE)
 async def delete_user_flow_by_name(flow_name: str, db: db_dependency, user_id: str = Depends(get_current_user_id)):
 
-    result = delete_userflow_by_name(flow_name, db, user_id)
+    result = await run_in_threadpool(delete_userflow_by_name, flow_name, db, user_id)
 
     return result
 
 @router.patch("/{flow_name}", status_code=status.HTTP_200_OK)
 async def update_user_flow(flow_name: str, updates: UserFlowUpdate, db: db_dependency, user_id: str = Depends(get_current_user_id)):
-    result = update_userflow(flow_name, updates, db, user_id)
+    result = await run_in_threadpool(update_userflow, flow_name, updates, db, user_id)
 
     return result
\ No newline at end of file
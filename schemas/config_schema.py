@@ -1,5 +1,18 @@
-from typing import Optional, Literal
-from pydantic import BaseModel
+from typing import Annotated, Optional, Literal, Union
+from pydantic import BaseModel, Field
+
+# Algorithms train_model can fit; flows naming anything else are rejected up front
+SUPPORTED_ALGORITHMS = ("Linear Regression", "Ridge Regression", "Random Forest", "Histogram Gradient Boosting")
+
+# One column name, or a non-empty list of them
+Columns = Union[str, Annotated[list[str], Field(min_length=1)]]
+
+def as_columns(value):
+    """data_range_X / data_range_y as a list of column names."""
+    if value is None:
+        return []
+
+    return [value] if isinstance(value, str) else list(value)
 
 
 class ConfigSchema(BaseModel):
@@ -8,8 +21,8 @@ class ConfigSchema(BaseModel):
     }
 
     algorithm: str
-    data_range_X: str
-    data_range_y: str
+    data_range_X: Columns
+    data_range_y: Columns
 
     row_range: Optional[tuple[int, int]] = None
 
@@ -17,4 +30,4 @@ class ConfigSchema(BaseModel):
         Literal["mean", "constant", "most_frequent", "median"]
     ] = None
 
-    test_size: Optional[float] = None
\ No newline at end of file
+    test_size: Optional[float] = Field(None, gt=0, lt=1)
\ No newline at end of file
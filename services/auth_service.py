@@ -1,17 +1,16 @@
 import base64
-from dotenv import load_dotenv
+import config
 import os
 
-loaded = load_dotenv()
-
 import jwt
 from fastapi import Header, HTTPException
 SECRET_KEY = os.getenv("SECRET_KEY")
 
-if SECRET_KEY is None:
-    raise RuntimeError("SECRET_KEY environment variable is missing")
-
 def verify_token(token: str):
+    # Checked on first use so importing the app does not require the key
+    if SECRET_KEY is None:
+        raise RuntimeError("SECRET_KEY environment variable is missing")
+
     try:
         payload = jwt.decode(
             token,
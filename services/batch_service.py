@@ -0,0 +1,236 @@
+import io
+import os
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.batch_jobs import BatchJobs, BatchJobStatus
+from models.datasets import DataSets
+from models.trained_models import TrainedModels
+from services.model_cache_service import load_model_bundle
+from services.inference_pipeline_service import InvalidRow, bundle_pipeline
+from services.storage_service import (
+    open_file_stream,
+    create_multipart_upload,
+    upload_part,
+    complete_multipart_upload,
+    abort_multipart_upload,
+    get_download_url
+)
+
+BATCH_CHUNK_ROWS = int(os.getenv("BATCH_CHUNK_ROWS", "50000"))
+# S3 requires every part except the last one to be at least 5 MiB
+BATCH_PART_SIZE = max(int(os.getenv("BATCH_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+def _job_response(job: BatchJobs):
+    response = {
+        "job_id": job.id,
+        "model_id": job.model_id,
+        "dataset_name": job.dataset_name,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "total_rows": job.total_rows,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at
+    }
+
+    if job.status == BatchJobStatus.completed:
+        # Local and in-memory storage have no URL of their own; the API serves those
+        response["download_url"] = get_download_url(job.output_path) or f"/predict/batch/{job.id}/download"
+
+    return response
+
+def create_batch_job(dataset_name: str, model_id: str, user_id: str, db: Session):
+    trained_model = db.query(TrainedModels.id).filter(
+        TrainedModels.user_id == user_id,
+        TrainedModels.id == model_id
+    ).first()
+
+    if not trained_model:
+        raise HTTPException(
+            status_code=404,
+            detail=f"model '{model_id}' for user {user_id} not found."
+        )
+
+    dataset = db.query(DataSets.row_count).filter(
+        DataSets.user_id == user_id,
+        DataSets.dataset_name == dataset_name
+    ).first()
+
+    if not dataset:
+        raise HTTPException(
+            status_code=404,
+            detail=f"the dataset '{dataset_name}' not found"
+        )
+
+    job_id = str(uuid.uuid4())
+
+    job = BatchJobs(
+        id=job_id,
+        user_id=user_id,
+        model_id=model_id,
+        dataset_name=dataset_name,
+        total_rows=dataset.row_count,
+        output_path=f"{user_id}/predictions/batch_{job_id}.csv"
+    )
+
+    try:
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+    except Exception:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to create batch job."
+        )
+
+    return _job_response(job)
+
+async def _find_batch_job(job_id: str, user_id: str, adb):
+    result = await adb.execute(
+        select(BatchJobs).where(
+            BatchJobs.user_id == user_id,
+            BatchJobs.id == job_id
+        )
+    )
+    job = result.scalars().first()
+
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Batch job '{job_id}' not found."
+        )
+
+    return job
+
+async def get_batch_job(job_id: str, user_id: str, adb):
+    job = await _find_batch_job(job_id, user_id, adb)
+
+    return _job_response(job)
+
+def _iter_stream(stream, chunk_size=1024 * 1024):
+    try:
+        while chunk := stream.read(chunk_size):
+            yield chunk
+    finally:
+        stream.close()
+
+async def open_batch_output(job_id: str, user_id: str, adb):
+    """Chunks of a completed job's scored CSV, read from storage as they are sent."""
+    job = await _find_batch_job(job_id, user_id, adb)
+
+    if job.status != BatchJobStatus.completed:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Batch job '{job_id}' is {job.status.value}, not completed."
+        )
+
+    return _iter_stream(open_file_stream(job.output_path))
+
+def _score_chunk(chunk, feature_order_columns, pipeline, first_row, targets=None):
+    missing = [f for f in feature_order_columns if f not in chunk.columns]
+
+    if missing:
+        raise ValueError(f"Missing feature(s) {missing} in dataset")
+
+    try:
+        prediction = pipeline.predict_frame(chunk)
+    except InvalidRow as e:
+        raise InvalidRow(first_row + e.row, e.reason)
+
+    if prediction.ndim == 2 and prediction.shape[1] == 1:
+        prediction = prediction.ravel()
+
+    scored = chunk.copy()
+
+    if prediction.ndim == 1:
+        scored["prediction"] = prediction
+    elif targets and len(targets) == prediction.shape[1]:
+        for i, target in enumerate(targets):
+            scored[f"prediction_{target}"] = prediction[:, i]
+    else:
+        for i in range(prediction.shape[1]):
+            scored[f"prediction_{i}"] = prediction[:, i]
+
+    return scored
+
+def run_batch_job(job_id: str):
+    import pandas as pd
+
+    # Runs after the response is sent, so it needs its own session
+    db = SessionLocal()
+
+    job = db.query(BatchJobs).filter(BatchJobs.id == job_id).first()
+
+    if not job:
+        db.close()
+        return
+
+    upload_id = None
+
+    try:
+        job.status = BatchJobStatus.running
+        db.commit()
+
+        dataset = db.query(DataSets.storage_path).filter(
+            DataSets.user_id == job.user_id,
+            DataSets.dataset_name == job.dataset_name
+        ).first()
+
+        if not dataset:
+            raise ValueError(f"the dataset '{job.dataset_name}' not found")
+
+        bundle = load_model_bundle(job.user_id, job.model_id)
+        feature_order_columns = bundle.get("feature_order")
+        pipeline = bundle_pipeline(bundle)
+
+        upload_id = create_multipart_upload(job.output_path)
+
+        parts = []
+        buffer = io.BytesIO()
+        rows_processed = 0
+
+        for chunk in pd.read_csv(open_file_stream(dataset.storage_path), chunksize=BATCH_CHUNK_ROWS):
+            scored = _score_chunk(chunk, feature_order_columns, pipeline, rows_processed, bundle.get("target_order"))
+            scored.to_csv(buffer, index=False, header=rows_processed == 0)
+
+            rows_processed += len(chunk)
+
+            if buffer.tell() >= BATCH_PART_SIZE:
+                parts.append(upload_part(job.output_path, upload_id, len(parts) + 1, buffer.getvalue()))
+                buffer = io.BytesIO()
+
+            job.rows_processed = rows_processed
+            db.commit()
+
+        if buffer.tell() or not parts:
+            parts.append(upload_part(job.output_path, upload_id, len(parts) + 1, buffer.getvalue()))
+
+        complete_multipart_upload(job.output_path, upload_id, parts)
+
+        job.status = BatchJobStatus.completed
+        job.total_rows = rows_processed
+        job.finished_at = func.now()
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+
+        if upload_id is not None:
+            try:
+                abort_multipart_upload(job.output_path, upload_id)
+            except Exception:
+                pass
+
+        job.status = BatchJobStatus.failed
+        job.error = str(e)
+        job.finished_at = func.now()
+        db.commit()
+
+    finally:
+        db.close()
@@ -0,0 +1,234 @@
+import io
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Parallel CSV parsing. "auto" tries pyarrow's multithreaded reader, then
+# splitting the bytes on newline boundaries across a process pool, then the
+# single-threaded pandas C engine; "pyarrow", "chunks" and "pandas" pin one.
+CSV_PARSE_ENGINE = os.getenv("CSV_PARSE_ENGINE", "auto").lower()
+CSV_PARSE_WORKERS = max(1, int(os.getenv("CSV_PARSE_WORKERS", str(os.cpu_count() or 1))))
+# Below this size the pool round trips cost more than parsing on one core
+CSV_PARALLEL_MIN_BYTES = int(os.getenv("CSV_PARALLEL_MIN_BYTES", str(32 * 1024 * 1024)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def parallel_enabled():
+    return CSV_PARSE_ENGINE != "pandas" and CSV_PARSE_WORKERS > 1
+
+def _get_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # forkserver/spawn: forking a threaded server process is unsafe
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=CSV_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context(method)
+            )
+
+        return _pool
+
+def _as_buffer(source):
+    """Zero-copy view of the whole source, or None if it is a one-way stream.
+
+    Returns (view, mapping); mapping is the mmap opened here, which the
+    caller closes once done with the view, or None.
+    """
+    if isinstance(source, mmap.mmap):
+        return memoryview(source), None
+
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer(), None
+
+    try:
+        fd = source.fileno()
+        if os.fstat(fd).st_size == 0:
+            return None, None
+
+        mapping = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None, None
+
+    return memoryview(mapping), mapping
+
+def _find(buffer, needle, start=0, window=16 * 1024 * 1024):
+    # mmap has a native find; other buffers are scanned a window at a time
+    if isinstance(buffer.obj, mmap.mmap):
+        return buffer.obj.find(needle, start)
+
+    for offset in range(start, len(buffer), window):
+        found = bytes(buffer[offset:offset + window]).find(needle)
+
+        if found != -1:
+            return offset + found
+
+    return -1
+
+def _split_points(buffer, start, parts):
+    """Offsets that cut buffer[start:] into ~equal ranges, each ending on a newline."""
+    size = len(buffer)
+    points = [start]
+
+    for part in range(1, parts):
+        target = start + (size - start) * part // parts
+        newline = _find(buffer, b"\n", max(target, points[-1]))
+
+        if newline == -1 or newline + 1 >= size:
+            break
+
+        points.append(newline + 1)
+
+    points.append(size)
+
+    return sorted(set(points))
+
+def _parse_range(data, names, usecols, dtype):
+    import pandas as pd
+
+    return pd.read_csv(io.BytesIO(data), header=None, names=names, usecols=usecols, dtype=dtype)
+
+def _read_pandas(source, usecols, dtype):
+    import pandas as pd
+
+    return pd.read_csv(source, usecols=usecols, dtype=dtype)
+
+def _read_pyarrow(buffer, usecols, dtype):
+    import pyarrow as pa
+    from pyarrow import csv
+
+    def read(column_types):
+        # Empty cells are missing in text columns too, as in pandas
+        return csv.read_csv(
+            pa.py_buffer(buffer),
+            read_options=csv.ReadOptions(use_threads=True),
+            convert_options=csv.ConvertOptions(
+                include_columns=usecols,
+                column_types=column_types,
+                strings_can_be_null=True,
+                timestamp_parsers=[]
+            )
+        )
+
+    table = read({})
+
+    # pandas leaves dates and times as text; pyarrow infers them whatever the
+    # timestamp parsers, so those columns are read again as strings
+    temporal = {
+        field.name: pa.string() for field in table.schema
+        if pa.types.is_temporal(field.type)
+    }
+
+    if temporal:
+        table = read(temporal)
+
+    df = table.to_pandas()
+
+    return df.astype(dtype) if dtype else df
+
+def _read_chunks(buffer, usecols, dtype):
+    import pandas as pd
+
+    # Quoted fields may contain newlines, which makes byte splitting unsafe
+    if _find(buffer, b'"') != -1:
+        return None
+
+    header_end = _find(buffer, b"\n")
+
+    if header_end == -1:
+        return None
+
+    names = list(pd.read_csv(io.BytesIO(bytes(buffer[:header_end + 1])), nrows=0).columns)
+    points = _split_points(buffer, header_end + 1, CSV_PARSE_WORKERS)
+
+    # Categories are applied after the concat: per-chunk categoricals with
+    # different category sets would concatenate to object
+    dtype = dtype or {}
+    chunk_dtype = {column: value for column, value in dtype.items() if value != "category"} or None
+
+    pool = _get_pool()
+    futures = [
+        pool.submit(_parse_range, bytes(buffer[start:end]), names, usecols, chunk_dtype)
+        for start, end in zip(points, points[1:]) if end > start
+    ]
+
+    if not futures:
+        return None
+
+    chunks = [future.result() for future in futures]
+
+    # Columns outside the plan were inferred per chunk. Integer chunks next
+    # to float ones (a later chunk with an empty cell) are what a single
+    # parse gives as float64; any other disagreement, e.g. text in only some
+    # chunks, has no safe merge and the input is parsed on one core instead.
+    widen = {}
+
+    for column in chunks[0].columns:
+        kinds = {chunk[column].dtype.kind for chunk in chunks}
+        dtypes = {str(chunk[column].dtype) for chunk in chunks}
+
+        if len(dtypes) == 1:
+            continue
+
+        if kinds <= {"i", "u", "f"}:
+            widen[column] = "float64"
+        else:
+            return None
+
+    df = pd.concat([chunk.astype(widen) if widen else chunk for chunk in chunks], ignore_index=True)
+
+    categories = {column: "category" for column, value in dtype.items() if value == "category" and column in df}
+
+    return df.astype(categories) if categories else df
+
+def _read_parallel(buffer, usecols, dtype):
+    if CSV_PARSE_ENGINE in ("auto", "pyarrow"):
+        try:
+            return _read_pyarrow(buffer, usecols, dtype)
+        except ImportError:
+            pass
+        except Exception:
+            # Inputs pyarrow rejects (ragged rows, odd encodings) go to pandas,
+            # which raises the error callers already handle
+            return _read_pandas(io.BytesIO(buffer), usecols, dtype)
+
+    if CSV_PARSE_ENGINE in ("auto", "chunks"):
+        df = _read_chunks(buffer, usecols, dtype)
+
+        if df is not None:
+            return df
+
+    return _read_pandas(io.BytesIO(buffer), usecols, dtype)
+
+def read_csv(source, usecols=None, dtype=None):
+    """pd.read_csv(source, usecols=..., dtype=...) that uses every core on large inputs."""
+    if not parallel_enabled():
+        return _read_pandas(source, usecols, dtype)
+
+    buffer, mapping = _as_buffer(source)
+
+    if buffer is None:
+        return _read_pandas(source, usecols, dtype)
+
+    try:
+        if len(buffer) < CSV_PARALLEL_MIN_BYTES:
+            return _read_pandas(source, usecols, dtype)
+
+        return _read_parallel(buffer, usecols, dtype)
+    finally:
+        # Release the export so the caller can close its mmap/BytesIO
+        try:
+            buffer.release()
+        except BufferError:
+            pass
+
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                # A view still escaped; the mapping closes when it is collected
+                pass
\ No newline at end of file
@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# column_schema dtype names that prepare_data one-hot encodes. pandas 2
+# reports text columns as "object", pandas 3 as "str".
+CATEGORICAL_DTYPES = ("object", "str", "string", "category")
+
+def is_categorical(dtype):
+    return dtype in CATEGORICAL_DTYPES
+
+def _json_value(value):
+    # numpy scalars -> plain Python; NaN (e.g. an all-null column) -> None
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    return value
+
+def compute_column_stats(df):
+    """Per-column summary computed once at upload from the parsed frame.
+
+    Every column gets count, null_count, cardinality and most_frequent;
+    numeric columns also get min, max, mean, var (ddof=0) and quantiles,
+    and float columns whether every value is a whole number.
+    """
+    counts = df.count()
+    nulls = df.isna().sum()
+    cardinality = df.nunique(dropna=True)
+
+    numeric = df.select_dtypes(include="number").columns
+    numeric_frame = df[numeric]
+
+    minimum = numeric_frame.min()
+    maximum = numeric_frame.max()
+    mean = numeric_frame.mean()
+    var = numeric_frame.var(ddof=0)
+    quantiles = numeric_frame.quantile(list(QUANTILES))
+
+    floats = numeric_frame.select_dtypes(include="floating")
+    integer_valued = ((floats % 1 == 0) | floats.isna()).all()
+
+    stats = {}
+
+    for column in df.columns:
+        # Smallest of the tied modes, the same pick SimpleImputer makes
+        modes = df[column].mode(dropna=True)
+
+        column_stats = {
+            "count": int(counts[column]),
+            "null_count": int(nulls[column]),
+            "cardinality": int(cardinality[column]),
+            "most_frequent": _json_value(modes.iloc[0]) if len(modes) else None
+        }
+
+        if column in numeric:
+            column_stats.update({
+                "min": _json_value(minimum[column]),
+                "max": _json_value(maximum[column]),
+                "mean": _json_value(mean[column]),
+                "var": _json_value(var[column]),
+                "quantiles": {
+                    str(q): _json_value(quantiles.at[q, column]) for q in QUANTILES
+                }
+            })
+
+        if column in floats:
+            column_stats["integer_valued"] = bool(integer_valued[column])
+
+        stats[str(column)] = column_stats
+
+    return stats
+
+def fill_value(column_stats, strategy):
+    """Precomputed imputation value for `strategy`, or None if not available."""
+    if not column_stats:
+        return None
+
+    if strategy == "mean":
+        return column_stats.get("mean")
+
+    if strategy == "median":
+        return (column_stats.get("quantiles") or {}).get("0.5")
+
+    if strategy == "most_frequent":
+        return column_stats.get("most_frequent")
+
+    return None
\ No newline at end of file
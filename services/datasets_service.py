@@ -1,22 +1,38 @@
 import os
+import uuid
 
-import pandas as pd
 from fastapi import HTTPException
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from models.datasets import DataSets
+from models.dataset_blobs import DatasetBlobs
 from models.user_flow import UserFlows
-from services.storage_service import upload_file, delete_file
-
-def get_dataset_by_name(dataset_name: str,user_id: str, db: Session):
-    dataset = (
-        db.query(DataSets)
-        .filter(
+from services import csv_service, metadata_cache_service
+from services.dataset_stats_service import compute_column_stats
+from services.dtype_service import memory_report, plan_dtypes
+from services.pagination_service import DEFAULT_PAGE_SIZE, keyset_page, page_response, timestamp_bound
+from services.row_index_service import ROW_INDEX_EVERY, build_row_index, delete_row_index, store_row_index
+from services.storage_service import HashingReader, upload_file, delete_file
+
+async def get_dataset_by_name(dataset_name: str,user_id: str, adb):
+    result = await adb.execute(
+        select(
+            DataSets.id,
+            DataSets.user_id,
+            DataSets.dataset_name,
+            DataSets.description,
+            DataSets.row_count,
+            DataSets.content_hash,
+            DataSets.column_schema,
+            DataSets.column_stats,
+            DataSets.created_at
+        ).where(
             DataSets.user_id == user_id,
             DataSets.dataset_name == dataset_name
         )
-        .first()
     )
+    dataset = result.first()
 
     if not dataset:
         raise HTTPException(
@@ -30,26 +46,36 @@ def get_dataset_by_name(dataset_name: str,user_id: str, db: Session):
         "dataset_name": dataset.dataset_name,
         "description": dataset.description,
         "row_count": dataset.row_count,
+        "content_hash": dataset.content_hash,
+        "column_schema": dataset.column_schema,
+        "column_stats": dataset.column_stats,
         "created_at": dataset.created_at
     }
 
-def get_all_datasets(user_id: str, db: Session):
-    datasets = (
-        db.query(DataSets)
-        .filter(
-            DataSets.user_id == user_id
-        ).all()
+async def get_all_datasets(user_id: str, adb, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, created_after=None, created_before=None):
+    # Only the listed columns are selected; column_schema stays in the database
+    query = select(DataSets.id, DataSets.dataset_name, DataSets.row_count, DataSets.content_hash, DataSets.created_at).where(
+        DataSets.user_id == user_id
     )
 
-    if not datasets:
-        return []
+    if created_after:
+        query = query.where(DataSets.created_at >= timestamp_bound(created_after))
 
-    dataset_list = []
+    if created_before:
+        query = query.where(DataSets.created_at < timestamp_bound(created_before))
 
-    for dataset in datasets:
-        dataset_list.append([dataset.dataset_name, dataset.created_at])
+    result = await adb.execute(keyset_page(query, DataSets.created_at, DataSets.id, cursor, limit))
 
-    return dataset_list
+    return page_response(
+        result.all(), limit,
+        lambda dataset: {
+            "dataset_name": dataset.dataset_name,
+            "row_count": dataset.row_count,
+            "content_hash": dataset.content_hash,
+            "created_at": dataset.created_at
+        },
+        "created_at", "id"
+    )
 
 def create_dataset(user_id: str, db: Session, dataset_name: str, description: str, file):
 
@@ -76,9 +102,20 @@ def create_dataset(user_id: str, db: Session, dataset_name: str, description: st
             detail=f"Dataset '{dataset_name}' already exists for this user."
         )
 
-    # 3. Validate CSV BEFORE writing to disk
+    import pandas as pd
+
+    # 3. Validate CSV BEFORE writing to disk, hashing it in the same pass
+    reader = HashingReader(file.file)
+
     try:
-        dataset = pd.read_csv(file.file)
+        if csv_service.parallel_enabled() and (file.size or 0) >= csv_service.CSV_PARALLEL_MIN_BYTES:
+            # Large upload: hash in one sequential pass, then parse on every core
+            reader.drain()
+            file.file.seek(0)
+            dataset = csv_service.read_csv(file.file)
+        else:
+            dataset = pd.read_csv(reader)
+            reader.drain()
     except Exception:
         raise HTTPException(
             status_code=400,
@@ -88,19 +125,67 @@ def create_dataset(user_id: str, db: Session, dataset_name: str, description: st
     # 4. Extract metadata
     row_count = len(dataset)
     schema = {col: str(dtype) for col, dtype in dataset.dtypes.items()}
+    column_stats = compute_column_stats(dataset)
+    content_hash = reader.hexdigest()
 
-    # 5. Reset file pointer (IMPORTANT)
-    file.file.seek(0)
+    # What training will hold in memory once it reads with the dtype plan
+    report = memory_report(dataset, plan_dtypes(schema, column_stats))
 
-    s3_key = f"{user_id}/csv/{dataset_name}.csv"
+    # 5. Identical bytes are stored once per user and shared by reference
+    s3_key = _reference_blob(db, user_id, content_hash)
 
-    try:
-        upload_file(file.file, s3_key)
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to upload dataset."
-        )
+    uploaded = s3_key is None
+
+    if uploaded:
+        # Keyed by a fresh id rather than the hash alone, so deleting an old
+        # blob's file can never remove one uploaded after it
+        s3_key = f"{user_id}/blobs/{content_hash}/{uuid.uuid4().hex}.csv"
+
+        # 6. Reset file pointer (IMPORTANT)
+        file.file.seek(0)
+
+        try:
+            upload_file(file.file, s3_key)
+        except Exception:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to upload dataset."
+            )
+
+        # Row-offset index so flows over a slice fetch only that slice;
+        # training falls back to a full read without it
+        if row_count > ROW_INDEX_EVERY:
+            try:
+                row_index = build_row_index(file.file, row_count)
+
+                if row_index is not None:
+                    store_row_index(s3_key, row_index)
+            except Exception:
+                pass
+
+        try:
+            db.add(DatasetBlobs(
+                user_id=user_id,
+                content_hash=content_hash,
+                storage_path=s3_key,
+                size_bytes=reader.bytes_read,
+                ref_count=1
+            ))
+            db.flush()
+        except IntegrityError:
+            # A concurrent upload of the same bytes registered its blob first.
+            # Nothing else is written yet, so roll back and share that blob.
+            db.rollback()
+            _discard_blob_file(s3_key)
+
+            s3_key = _reference_blob(db, user_id, content_hash)
+            uploaded = False
+
+            if s3_key is None:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Failed to create dataset."
+                )
 
     new_dataset = DataSets(
         user_id=user_id,
@@ -108,7 +193,9 @@ def create_dataset(user_id: str, db: Session, dataset_name: str, description: st
         description=description,
         storage_path=s3_key,#relative_file_loc
         row_count=row_count,
-        column_schema=schema
+        column_schema=schema,
+        column_stats=column_stats,
+        content_hash=content_hash
     )
 
     try:
@@ -118,10 +205,8 @@ def create_dataset(user_id: str, db: Session, dataset_name: str, description: st
     except IntegrityError:
         db.rollback()
 
-        try:
-            delete_file(s3_key)
-        except Exception:
-            pass
+        if uploaded:
+            _discard_blob_file(s3_key)
 
         raise HTTPException(
             status_code=400,
@@ -131,21 +216,65 @@ def create_dataset(user_id: str, db: Session, dataset_name: str, description: st
     except Exception:
         db.rollback()
 
-        try:
-            delete_file(s3_key)
-        except Exception:
-            pass
+        if uploaded:
+            _discard_blob_file(s3_key)
 
         raise HTTPException(
             status_code=500,
             detail="Failed to create dataset."
         )
 
+    metadata_cache_service.invalidate_dataset(user_id, dataset_name)
+
     return {
         "dataset_name": dataset_name,
-        "row_count": row_count
+        "row_count": row_count,
+        "content_hash": content_hash,
+        "memory_report": {
+            "bytes": report["bytes"],
+            "optimized_bytes": report["optimized_bytes"],
+            "reduction": report["reduction"]
+        }
     }
 
+def _reference_blob(db: Session, user_id: str, content_hash: str):
+    """Add a reference to the user's stored blob with these bytes and return
+    its storage path; None when there is no such blob."""
+    # Increment before reading: the update locks the row (the whole database
+    # on SQLite) until the commit, so a concurrent delete_dataset cannot drop
+    # the blob between the two statements.
+    result = db.execute(
+        update(DatasetBlobs)
+        .where(
+            DatasetBlobs.user_id == user_id,
+            DatasetBlobs.content_hash == content_hash
+        )
+        .values(ref_count=DatasetBlobs.ref_count + 1)
+    )
+
+    if result.rowcount == 0:
+        # Release the write lock; the caller uploads before writing again
+        db.rollback()
+        return None
+
+    return (
+        db.query(DatasetBlobs.storage_path)
+        .filter(
+            DatasetBlobs.user_id == user_id,
+            DatasetBlobs.content_hash == content_hash
+        )
+        .scalar()
+    )
+
+def _discard_blob_file(s3_key: str):
+    # Only this upload ever wrote to s3_key, so nothing else can refer to it
+    try:
+        delete_file(s3_key)
+    except Exception:
+        pass
+
+    delete_row_index(s3_key)
+
 def delete_dataset(dataset_name: str, user_id: str, db: Session):
     dataset = (
         db.query(DataSets)
@@ -171,29 +300,41 @@ def delete_dataset(dataset_name: str, user_id: str, db: Session):
         .first()
     )
 
-    if not flow:
+    if flow:
         raise HTTPException(
-            status_code=404,
-            detail=f"User flow with dataset '{dataset_name}' was not found"
+            status_code=400,
+            detail=f"Dataset '{dataset_name}' is bound to user_flow configuration '{flow.flow_name}'"
         )
 
-    if flow.dataset_name == dataset_name:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{dataset_name} ' is bound to user_flow configuration {flow.flow_name}"
+    storage_path = dataset.storage_path
+    drop_file = True
+
+    # Shared blobs lose one reference; the file goes with the last one.
+    # Datasets stored before deduplication (no hash) own their file outright.
+    if dataset.content_hash:
+        db.execute(
+            update(DatasetBlobs)
+            .where(
+                DatasetBlobs.user_id == user_id,
+                DatasetBlobs.content_hash == dataset.content_hash
+            )
+            .values(ref_count=DatasetBlobs.ref_count - 1)
         )
 
-    s3_key = f"{user_id}/csv/{dataset_name}.csv"
-
-    # Delete the file from S3
-    try:
-        delete_file(s3_key)
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to delete dataset file from storage."
+        blob = (
+            db.query(DatasetBlobs)
+            .filter(
+                DatasetBlobs.user_id == user_id,
+                DatasetBlobs.content_hash == dataset.content_hash
+            )
+            .first()
         )
 
+        drop_file = blob is None or blob.ref_count <= 0
+
+        if blob is not None and drop_file:
+            db.delete(blob)
+
     # Delete the database record
     try:
         db.delete(dataset)
@@ -205,4 +346,20 @@ def delete_dataset(dataset_name: str, user_id: str, db: Session):
             detail="Failed to delete dataset from database."
         )
 
+    metadata_cache_service.invalidate_dataset(user_id, dataset_name)
+
+    # The file goes only after the commit: an orphaned file is harmless,
+    # a record pointing at a missing file is not. A re-upload of the same
+    # bytes in the meantime gets a new blob under its own key.
+    if drop_file:
+        delete_row_index(storage_path)
+
+        try:
+            delete_file(storage_path)
+        except Exception:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to delete dataset file from storage."
+            )
+
     return {"detail": "DELETED"}
\ No newline at end of file
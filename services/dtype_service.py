@@ -0,0 +1,132 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from services import csv_service
+from services.dataset_stats_service import is_categorical
+
+# Read-time dtype plan built from a dataset's column_schema and column_stats.
+# Integers shrink to the narrowest type holding [min, max], floats to float32
+# when every value survives the round trip (opt-in), low-cardinality text to
+# category and the remaining text to Arrow strings.
+DTYPE_OPTIMIZE = os.getenv("DTYPE_OPTIMIZE", "true").lower() == "true"
+DTYPE_DOWNCAST_FLOATS = os.getenv("DTYPE_DOWNCAST_FLOATS", "false").lower() == "true"
+# Text columns with at most this share of distinct values become category
+CATEGORY_MAX_RATIO = float(os.getenv("CATEGORY_MAX_RATIO", "0.5"))
+
+INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+# float32 holds every integer of magnitude below this exactly
+FLOAT32_EXACT_INT = 2 ** 24
+
+@lru_cache(maxsize=None)
+def arrow_string_dtype():
+    """NaN-semantics Arrow string dtype name, or None without pyarrow."""
+    try:
+        import pyarrow  # noqa: F401
+        import pandas as pd
+    except ImportError:
+        return None
+
+    # pandas 3's "str" is Arrow-backed when pyarrow is installed
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return "str"
+
+    return "string[pyarrow_numpy]"
+
+def _int_dtype(low, high):
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype).name
+
+    return "int64"
+
+def _float32_exact(stats):
+    """Whether the stats show every value converts to float32 and back unchanged."""
+    low, high = stats.get("min"), stats.get("max")
+
+    if low is None or high is None or not stats.get("integer_valued"):
+        return False
+
+    return max(abs(low), abs(high)) < FLOAT32_EXACT_INT
+
+def plan_dtypes(column_schema, column_stats=None, columns=None, targets=()):
+    """Map column -> compact dtype for pd.read_csv(dtype=...).
+
+    Columns without enough information to narrow safely are left out, so
+    pandas infers them as before. `targets` are never narrowed: the model
+    is scored against them.
+    """
+    if not DTYPE_OPTIMIZE or not column_schema:
+        return {}
+
+    column_stats = column_stats or {}
+    plan = {}
+
+    for column in columns or column_schema:
+        dtype = column_schema.get(column)
+        stats = column_stats.get(column) or {}
+
+        if dtype is None or column in targets:
+            continue
+
+        if dtype.startswith("int"):
+            # An int column never has nulls; pandas would have made it float
+            if stats.get("min") is not None and stats.get("max") is not None:
+                plan[column] = _int_dtype(stats["min"], stats["max"])
+
+        elif dtype.startswith("float"):
+            if DTYPE_DOWNCAST_FLOATS and _float32_exact(stats):
+                plan[column] = "float32"
+
+        elif is_categorical(dtype):
+            count = stats.get("count")
+            cardinality = stats.get("cardinality")
+
+            if count and cardinality is not None and cardinality <= CATEGORY_MAX_RATIO * count:
+                plan[column] = "category"
+            elif arrow_string_dtype():
+                plan[column] = arrow_string_dtype()
+
+    return plan
+
+def read_csv_optimized(source, column_schema, column_stats=None, usecols=None, targets=()):
+    dtypes = plan_dtypes(column_schema, column_stats, usecols, targets)
+
+    return csv_service.read_csv(source, usecols=usecols, dtype=dtypes or None)
+
+def memory_report(df, plan):
+    """Per-column and total bytes for `df` as parsed vs converted to `plan`."""
+    columns = {}
+    bytes_before = 0
+    bytes_after = 0
+
+    for column in df.columns:
+        series = df[column]
+        before = int(series.memory_usage(index=False, deep=True))
+        after = before
+        dtype_after = str(series.dtype)
+
+        if column in plan:
+            converted = series.astype(plan[column])
+            after = int(converted.memory_usage(index=False, deep=True))
+            dtype_after = str(converted.dtype)
+
+        columns[str(column)] = {
+            "dtype": str(series.dtype),
+            "optimized_dtype": dtype_after,
+            "bytes": before,
+            "optimized_bytes": after
+        }
+
+        bytes_before += before
+        bytes_after += after
+
+    return {
+        "bytes": bytes_before,
+        "optimized_bytes": bytes_after,
+        "reduction": round(1 - bytes_after / bytes_before, 4) if bytes_before else 0.0,
+        "columns": columns
+    }
\ No newline at end of file
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+# When set, outputs of the cached training stages (see StageGraph in
+# services/stage_graph_service.py) are saved here: arrays as .npy files that
+# later trainings memory-map read-only, everything else (fitted scalers,
+# models, metrics) with joblib.
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR")
+FEATURE_STORE_MAX_BYTES = int(os.getenv("FEATURE_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+FEATURE_STORE_MAX_AGE = float(os.getenv("FEATURE_STORE_MAX_AGE", str(7 * 24 * 3600)))
+
+logger = logging.getLogger(__name__)
+
+def enabled():
+    return bool(FEATURE_STORE_DIR)
+
+def _entry_path(key: str):
+    return os.path.join(FEATURE_STORE_DIR, key)
+
+def load_entry(key: str):
+    """The stored dict of values, or None on a miss."""
+    import joblib
+
+    path = _entry_path(key)
+
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+
+        values = joblib.load(os.path.join(path, "values.joblib"))
+
+        for name in meta["arrays"]:
+            values[name] = load(name)
+
+        for name, shape in meta["sparse"].items():
+            from scipy.sparse import csr_matrix
+
+            values[name] = csr_matrix((load(f"{name}.data"), load(f"{name}.indices"), load(f"{name}.indptr")), shape=tuple(shape), copy=False)
+    except (OSError, ValueError, KeyError, EOFError):
+        # Missing, half-evicted or unreadable: treat it as a miss
+        return None
+
+    # The modification time doubles as last use for age-based eviction
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return values
+
+def store_entry(key: str, values: dict):
+    """Write an entry atomically, then evict. Never fails the caller: errors
+    are logged and the entry is simply not stored."""
+    import joblib
+    from scipy.sparse import issparse
+
+    tmp_path = None
+    meta = {"arrays": [], "sparse": {}}
+    rest = {}
+
+    try:
+        os.makedirs(FEATURE_STORE_DIR, exist_ok=True)
+
+        tmp_path = tempfile.mkdtemp(dir=FEATURE_STORE_DIR, prefix=".tmp-")
+
+        for name, value in values.items():
+            if issparse(value):
+                value = value.tocsr()
+                for part in ("data", "indices", "indptr"):
+                    np.save(os.path.join(tmp_path, f"{name}.{part}.npy"), getattr(value, part), allow_pickle=False)
+                meta["sparse"][name] = list(value.shape)
+            elif isinstance(value, np.ndarray) and value.dtype != object:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), value, allow_pickle=False)
+                meta["arrays"].append(name)
+            else:
+                rest[name] = value
+
+        joblib.dump(rest, os.path.join(tmp_path, "values.joblib"))
+
+        # Written last: an entry without it is incomplete and reads as a miss
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(tmp_path, _entry_path(key))
+            tmp_path = None
+        except OSError:
+            # Another trainer may have stored the same key meanwhile; either copy is valid
+            if not os.path.isdir(_entry_path(key)):
+                raise
+    except Exception:
+        # Anything from a full disk to an unpicklable value only costs the
+        # next training a recompute
+        logger.warning("Could not store feature store entry %s", key, exc_info=True)
+        return
+    finally:
+        if tmp_path is not None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    evict()
+
+def evict(max_bytes: int = None, max_age: float = None):
+    """Drop entries unused for longer than max_age, then least recently used
+    ones until the store fits in max_bytes."""
+    max_bytes = FEATURE_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = FEATURE_STORE_MAX_AGE if max_age is None else max_age
+
+    entries = []
+
+    try:
+        names = os.listdir(FEATURE_STORE_DIR)
+    except OSError:
+        return
+
+    for name in names:
+        path = os.path.join(FEATURE_STORE_DIR, name)
+
+        try:
+            last_used = os.stat(path).st_mtime
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+        except OSError:
+            continue
+
+        entries.append((last_used, size, path))
+
+    # Oldest first; in-progress temp dirs only go once they are stale
+    entries.sort()
+
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+
+    for last_used, size, path in entries:
+        stale = now - last_used > max_age
+
+        if not stale and (total <= max_bytes or os.path.basename(path).startswith(".tmp-")):
+            continue
+
+        # Readers that already mapped the files keep their pages until they close
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
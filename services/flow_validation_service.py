@@ -0,0 +1,120 @@
+import math
+
+from pydantic import ValidationError
+
+from schemas.config_schema import ConfigSchema, SUPPORTED_ALGORITHMS, as_columns
+from services.dataset_stats_service import is_categorical
+
+NUMERIC_DTYPE_PREFIXES = ("int", "uint", "float", "bool")
+
+# Everything here reads DataSets.column_schema / column_stats / row_count
+# only, so a flow can be rejected without downloading the dataset.
+
+def _is_numeric(dtype: str):
+    return dtype.lower().startswith(NUMERIC_DTYPE_PREFIXES)
+
+def validation_error(field: str, message: str):
+    return {"field": field, "message": message}
+
+def validate_flow_config(config: dict, dataset):
+    """Return a list of {"field", "message"} problems; empty means the flow can train."""
+    try:
+        config = ConfigSchema.model_validate(config).model_dump()
+    except ValidationError as e:
+        return [
+            validation_error(".".join(str(part) for part in error["loc"]), error["msg"])
+            for error in e.errors()
+        ]
+
+    errors = []
+    schema = dataset.column_schema or {}
+    stats = dataset.column_stats or {}
+    row_count = dataset.row_count or 0
+
+    # 1. Algorithm
+    if config["algorithm"] not in SUPPORTED_ALGORITHMS:
+        errors.append(validation_error(
+            "algorithm",
+            f"Unsupported algorithm '{config['algorithm']}'. Supported: {list(SUPPORTED_ALGORITHMS)}"
+        ))
+
+    # 2. Columns exist, each is used once, and targets are numeric for regression
+    columns = {field: as_columns(config[field]) for field in ("data_range_X", "data_range_y")}
+
+    for field, names in columns.items():
+        for column in names:
+            if column not in schema:
+                errors.append(validation_error(
+                    field,
+                    f"Column '{column}' not in dataset. Available columns: {list(schema)}"
+                ))
+
+        duplicates = sorted({column for column in names if names.count(column) > 1})
+
+        if duplicates:
+            errors.append(validation_error(field, f"Column(s) {duplicates} listed more than once"))
+
+    overlap = [column for column in dict.fromkeys(columns["data_range_y"]) if column in columns["data_range_X"]]
+
+    if overlap:
+        errors.append(validation_error(
+            "data_range_y",
+            f"Column(s) {overlap} are both features and targets"
+        ))
+
+    for column_y in columns["data_range_y"]:
+        if column_y in schema and not _is_numeric(schema[column_y]):
+            errors.append(validation_error(
+                "data_range_y",
+                f"Target column '{column_y}' has dtype '{schema[column_y]}'; regression needs a numeric target"
+            ))
+
+    # 3. Row range within the dataset
+    row_range = config["row_range"] or (0, row_count)
+    start, end = row_range
+
+    if start < 0 or end <= start or end > row_count:
+        errors.append(validation_error(
+            "row_range",
+            f"Row range {list(row_range)} is outside the dataset's {row_count} rows"
+        ))
+
+    # 4. The split leaves at least one row on each side
+    test_size = config["test_size"]
+
+    if test_size is None:
+        errors.append(validation_error("test_size", "test_size is required for training"))
+    elif end > start:
+        n_rows = min(end, row_count) - max(start, 0)
+        n_test = math.ceil(test_size * n_rows)
+
+        if n_test < 1 or n_rows - n_test < 1:
+            errors.append(validation_error(
+                "test_size",
+                f"test_size {test_size} on {n_rows} rows leaves an empty train or test split"
+            ))
+
+    # 5. Imputation strategy fits the columns it touches
+    strategy = config["missing_data"]
+    full_range = start <= 0 and end >= row_count
+
+    for field, column in ((field, column) for field, names in columns.items() for column in names):
+        if column not in schema:
+            continue
+
+        # Categorical features are one-hot encoded before imputation runs
+        if strategy in ("mean", "median") and not is_categorical(schema[column]) and not _is_numeric(schema[column]):
+            errors.append(validation_error(
+                "missing_data",
+                f"Strategy '{strategy}' needs a numeric column; '{column}' is '{schema[column]}'"
+            ))
+
+        null_count = (stats.get(column) or {}).get("null_count")
+
+        if strategy is None and full_range and null_count:
+            errors.append(validation_error(
+                "missing_data",
+                f"Column '{column}' has {null_count} missing values; set missing_data"
+            ))
+
+    return errors
\ No newline at end of file
@@ -0,0 +1,212 @@
+import numpy as np
+
+# pandas is imported inside the methods so that loading a bundle (and
+# importing the app) does not pay for it.
+
+
+class InvalidRow(ValueError):
+    def __init__(self, row: int, reason: str):
+        super().__init__(f"Row {row}: {reason}")
+        self.row = row
+        self.reason = reason
+
+
+class InferencePipeline:
+    """Fitted preprocessing and model of one training run, folded for inference.
+
+    Training persists this in the model bundle so that raw feature values go
+    in and target values come out: imputation -> one-hot encoding -> feature
+    scaling -> model -> inverse target scaling.
+
+    Every step before the model is an affine map per design column, so at
+    construction they are folded into one scale/offset per numeric feature
+    and one lookup table per categorical feature (last row = unknown
+    category). For linear models the coefficients and the target scaling are
+    folded in as well, and prediction is a single matrix product plus table
+    lookups.
+    """
+
+    def __init__(self, features, model, x_mean=None, x_scale=None, y_mean=None, y_scale=None):
+        # features: one spec per input column, in feature order -
+        #   {"column": name, "fill": float or None} for numeric columns
+        #   {"column": name, "categories": [...], "missing_category": bool} for one-hot ones
+        self.features = features
+        self.model = model
+
+        widths = [len(f["categories"]) + f.get("missing_category", False) if "categories" in f else 1 for f in features]
+        n_design = sum(widths)
+
+        x_mean = np.zeros(n_design) if x_mean is None else np.asarray(x_mean, dtype=np.float64)
+        x_scale = np.ones(n_design) if x_scale is None else np.asarray(x_scale, dtype=np.float64)
+
+        n_outputs = 1 if y_mean is None else len(np.atleast_1d(y_mean))
+        self.y_mean = np.zeros(n_outputs) if y_mean is None else np.atleast_1d(np.asarray(y_mean, dtype=np.float64))
+        self.y_scale = np.ones(n_outputs) if y_scale is None else np.atleast_1d(np.asarray(y_scale, dtype=np.float64))
+
+        # Per feature: (start, width) in the design matrix, plus either the
+        # numeric (scale, offset) or the categorical design lookup table
+        self._layout = []
+        start = 0
+        for spec, width in zip(features, widths):
+            columns = slice(start, start + width)
+
+            if "categories" in spec:
+                table = np.vstack([np.eye(width), np.zeros((1, width))])
+                self._layout.append((columns, (table - x_mean[columns]) / x_scale[columns]))
+            else:
+                self._layout.append((columns, (1 / x_scale[start], -x_mean[start] / x_scale[start])))
+
+            start += width
+
+        self._fold_linear()
+
+    @classmethod
+    def from_fitted(cls, features, model, x_scaler=None, y_scaler=None):
+        """Build from the StandardScalers fitted during training."""
+        def parameters(scaler):
+            if scaler is None:
+                return None, None
+
+            mean = scaler.mean_ if scaler.with_mean else np.zeros_like(scaler.scale_)
+            return mean, scaler.scale_
+
+        return cls(features, model, *parameters(x_scaler), *parameters(y_scaler))
+
+    @classmethod
+    def for_legacy_bundle(cls, bundle):
+        """Bundles saved before pipelines existed fed raw float features straight to the model."""
+        return cls([{"column": column, "fill": None} for column in bundle.get("feature_order")], bundle.get("model"))
+
+    def _fold_linear(self):
+        self._weights = None
+
+        coef = getattr(self.model, "coef_", None)
+        intercept = getattr(self.model, "intercept_", None)
+
+        if coef is None or intercept is None:
+            return
+
+        coef = np.atleast_2d(np.asarray(coef, dtype=np.float64))
+        intercept = np.broadcast_to(np.asarray(intercept, dtype=np.float64), coef.shape[:1]).copy()
+
+        if coef.shape[0] != len(self.y_scale):
+            return
+
+        numeric_weights = []
+        tables = []
+
+        for spec, (columns, transform) in zip(self.features, self._layout):
+            weights = coef[:, columns].T
+
+            if "categories" in spec:
+                tables.append((transform @ weights) * self.y_scale)
+            else:
+                scale, offset = transform
+                numeric_weights.append(weights[0] * scale * self.y_scale)
+                intercept += weights[0] * offset
+
+        n_outputs = len(self.y_scale)
+
+        self._weights = np.array(numeric_weights).reshape(-1, n_outputs)
+        self._tables = tables
+        self._intercept = intercept * self.y_scale + self.y_mean
+
+    def linear_parameters(self):
+        """(coef, intercept) over the raw features, when the whole pipeline is
+        one single-output linear function of numeric inputs without imputation."""
+        if self._weights is None or len(self.y_scale) != 1:
+            return None
+
+        if any("categories" in spec or spec.get("fill") is not None for spec in self.features):
+            return None
+
+        return self._weights[:, 0].copy(), float(self._intercept[0])
+
+    def _numeric(self, spec, values):
+        import pandas as pd
+
+        if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+            numbers = values.astype(np.float64)
+        else:
+            raw = pd.Series(values, dtype=object)
+            numbers = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64, copy=True)
+
+            invalid = np.isnan(numbers) & raw.notna().to_numpy()
+            if invalid.any():
+                raise InvalidRow(int(np.argmax(invalid)), f"Invalid value for '{spec['column']}'")
+
+        missing = np.isnan(numbers)
+        if missing.any():
+            if spec.get("fill") is None:
+                raise InvalidRow(int(np.argmax(missing)), f"Missing value for '{spec['column']}'")
+
+            numbers[missing] = spec["fill"]
+
+        return numbers
+
+    def _codes(self, spec, values):
+        import pandas as pd
+
+        raw = pd.Series(values, dtype=object)
+        missing = raw.isna().to_numpy()
+
+        codes = pd.Index(spec["categories"]).get_indexer(raw.astype(str)).astype(np.intp)
+
+        # Missing values map to their own category when training saw one,
+        # unknown categories to the all-zero last table row
+        codes[missing] = len(spec["categories"]) if spec.get("missing_category") else -1
+
+        return codes
+
+    def predict(self, columns):
+        """Predict from raw values: `columns` maps every feature name to a
+        sequence of values. Returns an (n_rows, n_outputs) array.
+
+        Raises InvalidRow for the first non-numeric or missing (and not
+        imputed) value.
+        """
+        n_rows = len(columns[self.features[0]["column"]])
+
+        if self._weights is not None:
+            prediction = np.broadcast_to(self._intercept, (n_rows, len(self._intercept))).copy()
+
+            numeric = [spec for spec in self.features if "categories" not in spec]
+            if numeric:
+                X = np.column_stack([self._numeric(spec, columns[spec["column"]]) for spec in numeric])
+                prediction += X @ self._weights
+
+            tables = iter(self._tables)
+            for spec in self.features:
+                if "categories" in spec:
+                    prediction += next(tables)[self._codes(spec, columns[spec["column"]])]
+
+            return prediction
+
+        design = np.empty((n_rows, sum(c.stop - c.start for c, _ in self._layout)))
+
+        for spec, (design_columns, transform) in zip(self.features, self._layout):
+            if "categories" in spec:
+                design[:, design_columns] = transform[self._codes(spec, columns[spec["column"]])]
+            else:
+                scale, offset = transform
+                design[:, design_columns.start] = self._numeric(spec, columns[spec["column"]]) * scale + offset
+
+        prediction = np.asarray(self.model.predict(design), dtype=np.float64).reshape(n_rows, -1)
+
+        return prediction * self.y_scale + self.y_mean
+
+    def predict_frame(self, df):
+        return self.predict({spec["column"]: df[spec["column"]].to_numpy() for spec in self.features})
+
+    def predict_records(self, records):
+        return self.predict({spec["column"]: [row[spec["column"]] for row in records] for spec in self.features})
+
+
+def bundle_pipeline(bundle):
+    """The bundle's fitted pipeline, or an equivalent of how pre-pipeline bundles were applied."""
+    pipeline = bundle.get("pipeline")
+
+    if pipeline is None:
+        pipeline = InferencePipeline.for_legacy_bundle(bundle)
+
+    return pipeline
\ No newline at end of file
@@ -0,0 +1,120 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from sqlalchemy.orm import Session
+
+from models.datasets import DataSets
+from models.trained_models import TrainedModels
+from models.user_flow import UserFlows
+from services import shared_store_service
+
+METADATA_CACHE_SIZE = int(os.getenv("METADATA_CACHE_SIZE", "10000"))
+# Bounds staleness across worker processes; writes in this process invalidate immediately
+METADATA_CACHE_TTL = float(os.getenv("METADATA_CACHE_TTL", "60"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = TTLCache(METADATA_CACHE_SIZE, METADATA_CACHE_TTL)
+
+def _snapshot(row, table):
+    # Detached plain copy: safe to share between requests and sessions
+    return SimpleNamespace(**{
+        column.key: copy.deepcopy(getattr(row, column.key)) for column in table.columns
+    })
+
+def _lookup(key, db: Session, model, *criteria):
+    cached = _cache.get(key)
+
+    if cached is not None:
+        return cached
+
+    row = db.query(model).filter(*criteria).first()
+
+    if row is None:
+        return None
+
+    snapshot = _snapshot(row, model.__table__)
+    _cache.set(key, snapshot)
+
+    return snapshot
+
+def get_trained_model(db: Session, user_id, model_id: str):
+    key = ("model", str(user_id), model_id)
+
+    # Deleted through another worker since we cached it
+    if shared_store_service.enabled() and shared_store_service.is_invalidated(user_id, model_id):
+        _cache.invalidate(key)
+        return None
+
+    return _lookup(
+        key, db, TrainedModels,
+        TrainedModels.user_id == user_id,
+        TrainedModels.id == model_id
+    )
+
+def get_flow(db: Session, user_id, flow_name: str):
+    return _lookup(
+        ("flow", str(user_id), flow_name), db, UserFlows,
+        UserFlows.user_id == user_id,
+        UserFlows.flow_name == flow_name
+    )
+
+def get_dataset(db: Session, user_id, dataset_name: str):
+    return _lookup(
+        ("dataset", str(user_id), dataset_name), db, DataSets,
+        DataSets.user_id == user_id,
+        DataSets.dataset_name == dataset_name
+    )
+
+def invalidate_model(user_id, model_id: str):
+    _cache.invalidate(("model", str(user_id), model_id))
+
+def invalidate_flow(user_id, flow_name: str):
+    _cache.invalidate(("flow", str(user_id), flow_name))
+
+def invalidate_dataset(user_id, dataset_name: str):
+    _cache.invalidate(("dataset", str(user_id), dataset_name))
@@ -1,104 +1,358 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-import joblib
+import numpy as np
 from fastapi import HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from models.datasets import DataSets
 from models.trained_models import TrainedModels
+from models.user_flow import UserFlows
+from services.model_cache_service import load_model_bundle
+from services.inference_pipeline_service import bundle_pipeline
 from services.storage_service import get_file
+from schemas.config_schema import as_columns
 
-def metrics_with_saved_models(user_id: str, model_id_a, model_id_b, db: Session):
-    model_a = db.query(TrainedModels).filter(
-        TrainedModels.user_id == user_id,
-        TrainedModels.id == model_id_a
-    ).first()
+EVALUATION_MAX_WORKERS = int(os.getenv("EVALUATION_MAX_WORKERS", "8"))
 
-    if not model_a:
-        raise HTTPException(
-            status_code=404,
-            detail=f"model '{model_id_a}' not found."
-        )
+# metric name -> True when a higher value is better
+LEADERBOARD_METRICS = {
+    "mae": False,
+    "rmse": False,
+    "r2": True
+}
 
-    model_b = db.query(TrainedModels).filter(
-        TrainedModels.user_id == user_id,
-        TrainedModels.id == model_id_b
-    ).first()
-
-    if not model_b:
-        raise HTTPException(
-            status_code=404,
-            detail=f"model '{model_id_b}' not found."
+async def metrics_with_saved_models(user_id: str, model_id_a, model_id_b, adb):
+    # Metrics are already persisted in metrics_json at training time, so a single
+    # projected query is enough - no need to pull the model bundles from storage.
+    result = await adb.execute(
+        select(TrainedModels.id, TrainedModels.metrics_json).where(
+            TrainedModels.user_id == user_id,
+            TrainedModels.id.in_([model_id_a, model_id_b])
         )
+    )
+    rows = result.all()
 
-    mp_a = f"{user_id}/trained_models/model_{model_a.id}.pkl"
+    metrics_by_id = {row.id: row.metrics_json for row in rows}
 
-    metrics_model_a = joblib.load(get_file(mp_a)).get("metrics")
+    for model_id in (model_id_a, model_id_b):
+        if model_id not in metrics_by_id:
+            raise HTTPException(
+                status_code=404,
+                detail=f"model '{model_id}' not found."
+            )
 
-    mp_b = f"{user_id}/trained_models/model_{model_b.id}.pkl"
-
-    metrics_model_b = joblib.load(get_file(mp_b)).get("metrics")
+    metrics_model_a = metrics_by_id[model_id_a]
+    metrics_model_b = metrics_by_id[model_id_b]
 
     if not metrics_model_a or not metrics_model_b:
         raise HTTPException(
             status_code=500,
-            detail="Model metrics missing from bundle"
+            detail="Stored metrics missing for model"
         )
 
-    decider = {
-        "model_a": 0,
-        "model_b": 0
-    }
-
-    metric_winners = {}
-
-    # MAE (lower is better)
-    if metrics_model_a.get('mae') < metrics_model_b.get('mae'):
-        decider["model_a"] += 1
-        metric_winners["mae"] = model_a.id
-    else:
-        decider["model_b"] += 1
-        metric_winners["mae"] = model_b.id
-
-    # RMSE (lower is better)
-    if metrics_model_a.get('rmse') < metrics_model_b.get('rmse'):
-        decider["model_a"] += 1
-        metric_winners["rmse"] = model_a.id
-    else:
-        decider["model_b"] += 1
-        metric_winners["rmse"] = model_b.id
-
-    # R2 (higher is better)
-    if metrics_model_a.get('r2') > metrics_model_b.get('r2'):
-        decider["model_a"] += 1
-        metric_winners["r2"] = model_a.id
-    else:
-        decider["model_b"] += 1
-        metric_winners["r2"] = model_b.id
-
-    better_model = None
-
-    if decider["model_a"] > decider["model_b"]:
-        better_model = model_a.id
-
-    elif decider["model_b"] > decider["model_a"]:
-        better_model = model_b.id
+    # Missing metrics (None when undefined on the test rows) rank last
+    comparison = compare_metrics([model_id_a, model_id_b], [metrics_model_a, metrics_model_b])
 
     return {
         "model_a": {
-            "model_id": model_a.id,
+            "model_id": model_id_a,
             "metrics": metrics_model_a
         },
 
         "model_b": {
-            "model_id": model_b.id,
+            "model_id": model_id_b,
             "metrics": metrics_model_b
         },
 
+        **comparison
+    }
+
+def _rank_keys(metrics_list, rank_by):
+    """One ascending sort key per model and rank_by metric (lower is better)."""
+    values = np.array(
+        [[(metrics or {}).get(m, np.nan) for m in rank_by] for metrics in metrics_list],
+        dtype=float
+    )
+
+    # Flip "higher is better" metrics so every column sorts ascending,
+    # and push models without the metric to the bottom.
+    signs = np.array([-1.0 if LEADERBOARD_METRICS[m] else 1.0 for m in rank_by])
+    keys = values * signs
+
+    return np.where(np.isnan(keys), np.inf, keys)
+
+def rank_by_metrics(metrics_list, rank_by):
+    """Return the indices of metrics_list ordered best-first on the rank_by metrics."""
+    if not metrics_list:
+        return np.array([], dtype=int)
+
+    keys = _rank_keys(metrics_list, rank_by)
+
+    # np.lexsort uses the last key as the primary one
+    return np.lexsort(keys.T[::-1])
+
+async def metrics_leaderboard(user_id: str, adb, flow_name: str = None, model_ids=None, rank_by=None, limit: int = 50, offset: int = 0):
+    rank_by = rank_by or ["r2"]
+
+    unknown = [m for m in rank_by if m not in LEADERBOARD_METRICS]
+
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown metric(s): {unknown}. Available metrics: {list(LEADERBOARD_METRICS)}"
+        )
+
+    query = select(
+        TrainedModels.id,
+        TrainedModels.flow_id,
+        TrainedModels.model_type,
+        TrainedModels.metrics_json,
+        TrainedModels.trained_at
+    ).where(
+        TrainedModels.user_id == user_id
+    )
+
+    if flow_name:
+        result = await adb.execute(
+            select(UserFlows.id).where(
+                UserFlows.user_id == user_id,
+                UserFlows.flow_name == flow_name
+            )
+        )
+        flow = result.first()
+
+        if not flow:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Flow '{flow_name}' not found"
+            )
+
+        query = query.where(TrainedModels.flow_id == flow.id)
+
+    if model_ids:
+        query = query.where(TrainedModels.id.in_(model_ids))
+
+    rows = (await adb.execute(query)).all()
+
+    order = rank_by_metrics([row.metrics_json for row in rows], rank_by)
+    page = order[offset:offset + limit]
+
+    leaderboard = []
+
+    for position, index in enumerate(page):
+        row = rows[index]
+        leaderboard.append({
+            "rank": offset + position + 1,
+            "model_id": row.id,
+            "flow_id": row.flow_id,
+            "model_type": row.model_type,
+            "metrics": row.metrics_json,
+            "trained_at": row.trained_at
+        })
+
+    return {
+        "rank_by": rank_by,
+        "total": len(rows),
+        "limit": limit,
+        "offset": offset,
+        "models": leaderboard
+    }
+
+
+def compare_metrics(model_ids, metrics_list):
+    metric_winners = {}
+    score = {model_id: 0 for model_id in model_ids}
+
+    for metric in LEADERBOARD_METRICS:
+        keys = _rank_keys(metrics_list, [metric])[:, 0]
+        best = int(np.argmin(keys))
+
+        # A tie for first (including every model missing the metric) has no
+        # winner and scores for nobody
+        if np.count_nonzero(keys == keys[best]) > 1:
+            metric_winners[metric] = None
+            continue
+
+        metric_winners[metric] = model_ids[best]
+        score[model_ids[best]] += 1
+
+    top = max(score.values())
+    leaders = [model_id for model_id, wins in score.items() if wins == top]
+
+    return {
         "metric_winners": metric_winners,
+        "score": score,
+        "better_model": leaders[0] if len(leaders) == 1 else None
+    }
 
-        "score": {
-            model_a.id: decider["model_a"],
-            model_b.id: decider["model_b"]
-        },
+def score_models(predictions, y):
+    """Vectorized MAE/RMSE/R2 for a (n_models, n_rows) prediction matrix against y."""
+    errors = predictions - y
+    sst = np.sum((y - y.mean()) ** 2)
+
+    mae = np.abs(errors).mean(axis=1)
+    rmse = np.sqrt((errors ** 2).mean(axis=1))
+    r2 = 1 - (errors ** 2).sum(axis=1) / sst if sst > 0 else np.full(len(predictions), np.nan)
 
-        "better_model": better_model
-    }
\ No newline at end of file
+    # Undefined metrics (R2 of a constant target, anything over no rows) are
+    # None, as training stores them; NaN is not valid JSON
+    return [
+        {"mae": _finite_or_none(mae[i]), "rmse": _finite_or_none(rmse[i]), "r2": _finite_or_none(r2[i])}
+        for i in range(len(predictions))
+    ]
+
+def _finite_or_none(value):
+    return float(value) if value is not None and np.isfinite(value) else None
+
+def average_target_metrics(per_target):
+    """One set of metrics for a multi-target model, averaged over targets the
+    way training's metrics are (RMSE from the mean squared error)."""
+    def values(metric):
+        # Undefined for one target means undefined for the average
+        values = [m[metric] for m in per_target]
+        return np.array(values, dtype=float) if None not in values else np.array([np.nan])
+
+    return {
+        "mae": _finite_or_none(np.mean(values("mae"))),
+        "rmse": _finite_or_none(np.sqrt(np.mean(values("rmse") ** 2))),
+        "r2": _finite_or_none(np.mean(values("r2")))
+    }
+
+def _predict_frame(user_id: str, model_id: str, df):
+    bundle = load_model_bundle(user_id, model_id)
+
+    feature_order_columns = bundle.get("feature_order")
+
+    missing = [f for f in feature_order_columns if f not in df.columns]
+
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model '{model_id}': missing feature(s) {missing} in dataset"
+        )
+
+    try:
+        prediction = bundle_pipeline(bundle).predict_frame(df)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model '{model_id}': {e}"
+        )
+
+    # One column per target
+    return prediction
+
+def evaluate_models_on_dataset(user_id: str, dataset_name: str, model_ids, db: Session):
+    import pandas as pd
+
+    model_ids = list(dict.fromkeys(model_ids))
+
+    if not model_ids:
+        raise HTTPException(400, "No model ids provided")
+
+    trained_models = db.query(TrainedModels.id, TrainedModels.flow_id).filter(
+        TrainedModels.user_id == user_id,
+        TrainedModels.id.in_(model_ids)
+    ).all()
+
+    flow_ids = {row.id: row.flow_id for row in trained_models}
+
+    for model_id in model_ids:
+        if model_id not in flow_ids:
+            raise HTTPException(
+                status_code=404,
+                detail=f"model '{model_id}' not found."
+            )
+
+    flows = db.query(UserFlows.id, UserFlows.config_json).filter(
+        UserFlows.user_id == user_id,
+        UserFlows.id.in_(set(flow_ids.values()))
+    ).all()
+
+    targets = {flow.id: (flow.config_json or {}).get("data_range_y") for flow in flows}
+
+    dataset = db.query(DataSets.storage_path).filter(
+        DataSets.user_id == user_id,
+        DataSets.dataset_name == dataset_name
+    ).first()
+
+    if not dataset:
+        raise HTTPException(
+            status_code=404,
+            detail=f"the dataset '{dataset_name}' not found"
+        )
+
+    # Load the holdout once and share it between all models
+    df = pd.read_csv(get_file(dataset.storage_path))
+
+    if df.empty:
+        raise HTTPException(400, "Dataset is empty")
+
+    model_targets = {}
+
+    for model_id in model_ids:
+        target_columns = as_columns(targets.get(flow_ids[model_id]))
+
+        for target in target_columns or [None]:
+            if not target or target not in df.columns:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Model '{model_id}': target column '{target}' not found in dataset"
+                )
+
+        model_targets[model_id] = target_columns
+
+    with ThreadPoolExecutor(max_workers=min(len(model_ids), EVALUATION_MAX_WORKERS)) as executor:
+        predictions = dict(zip(
+            model_ids,
+            executor.map(lambda model_id: _predict_frame(user_id, model_id, df), model_ids)
+        ))
+
+    for model_id in model_ids:
+        if predictions[model_id].shape[1] != len(model_targets[model_id]):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Model '{model_id}': predicts {predictions[model_id].shape[1]} values per row for target(s) {model_targets[model_id]}"
+            )
+
+    # Predictions of every model for the same target column are scored
+    # together in one matrix operation
+    by_target = {}
+
+    for model_id in model_ids:
+        for i, target in enumerate(model_targets[model_id]):
+            by_target.setdefault(target, []).append((model_id, i))
+
+    scores = {}
+
+    for target, group in by_target.items():
+        y = pd.to_numeric(df[target], errors="coerce").to_numpy(dtype=float)
+        mask = ~np.isnan(y)
+
+        stacked = np.vstack([predictions[model_id][:, i] for model_id, i in group])[:, mask]
+
+        for (model_id, _), metrics in zip(group, score_models(stacked, y[mask])):
+            scores[(model_id, target)] = metrics
+
+    metrics_by_model = {}
+
+    for model_id in model_ids:
+        per_target = {target: scores[(model_id, target)] for target in model_targets[model_id]}
+
+        if len(per_target) == 1:
+            metrics_by_model[model_id] = next(iter(per_target.values()))
+        else:
+            metrics_by_model[model_id] = {**average_target_metrics(list(per_target.values())), "per_target": per_target}
+
+    metrics_list = [metrics_by_model[model_id] for model_id in model_ids]
+
+    return {
+        "dataset_name": dataset_name,
+        "num_rows": len(df),
+        "models": [
+            {"model_id": model_id, "metrics": metrics}
+            for model_id, metrics in zip(model_ids, metrics_list)
+        ],
+        **compare_metrics(model_ids, metrics_list)
+    }
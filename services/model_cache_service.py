@@ -0,0 +1,57 @@
+import os
+import threading
+from collections import OrderedDict
+
+from services import shared_store_service
+from services.storage_service import get_file
+
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "32"))
+
+_bundles = OrderedDict()
+_lock = threading.Lock()
+
+def model_storage_key(user_id, model_id: str):
+    return f"{user_id}/trained_models/model_{model_id}.pkl"
+
+def _load(user_id, model_id: str):
+    import joblib
+
+    if shared_store_service.enabled():
+        return shared_store_service.attach_bundle(
+            user_id,
+            model_id,
+            lambda: get_file(model_storage_key(user_id, model_id))
+        )
+
+    return joblib.load(get_file(model_storage_key(user_id, model_id)))
+
+def load_model_bundle(user_id, model_id: str):
+    key = (str(user_id), model_id)
+
+    with _lock:
+        bundle = _bundles.get(key)
+        if bundle is not None:
+            # Another worker may have deleted the model since we cached it
+            if shared_store_service.enabled() and shared_store_service.is_invalidated(user_id, model_id):
+                del _bundles[key]
+            else:
+                _bundles.move_to_end(key)
+                return bundle
+
+    # Download outside the lock so concurrent loads of different models overlap
+    bundle = _load(user_id, model_id)
+
+    with _lock:
+        _bundles[key] = bundle
+        _bundles.move_to_end(key)
+        while len(_bundles) > MODEL_CACHE_SIZE:
+            _bundles.popitem(last=False)
+
+    return bundle
+
+def evict_model_bundle(user_id, model_id: str):
+    with _lock:
+        _bundles.pop((str(user_id), model_id), None)
+
+    if shared_store_service.enabled():
+        shared_store_service.invalidate(user_id, model_id)
@@ -0,0 +1,149 @@
+import threading
+
+import numpy as np
+
+
+class _CoefficientBlock:
+    """Contiguous coefficient/intercept storage for models sharing one feature order."""
+
+    def __init__(self, feature_order, capacity=64):
+        self.feature_order = list(feature_order)
+        self.coef = np.zeros((capacity, len(feature_order)), dtype=np.float64)
+        self.intercept = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self.free_rows = []
+
+    def add(self, coef, intercept):
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.size == len(self.intercept):
+                # Amortized growth, same as a Python list
+                capacity = len(self.intercept) * 2
+                grown_coef = np.zeros((capacity, self.coef.shape[1]), dtype=np.float64)
+                grown_intercept = np.zeros(capacity, dtype=np.float64)
+                grown_coef[:self.size] = self.coef
+                grown_intercept[:self.size] = self.intercept
+                self.coef, self.intercept = grown_coef, grown_intercept
+            row = self.size
+            self.size += 1
+
+        self.coef[row] = coef
+        self.intercept[row] = intercept
+
+        return row
+
+    def remove(self, row):
+        self.coef[row] = 0
+        self.intercept[row] = 0
+        self.free_rows.append(row)
+
+
+class LinearModelRegistry:
+    """Packs single-output linear models into per-feature-order NumPy blocks.
+
+    Each model costs one row of coefficients plus an intercept instead of a
+    pickled estimator, and any mix of inputs x models is scored with one
+    matrix product per feature order.
+
+    Every worker process holds its own registry, filled from the bundles it
+    loads (shared ones when SHARED_MODEL_STORE_DIR is set).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._index = {}
+
+    @staticmethod
+    def linear_parameters(bundle):
+        # Trained bundles fold preprocessing and target scaling into the
+        # coefficients; legacy bundles are the bare estimator
+        pipeline = bundle.get("pipeline")
+        if pipeline is not None:
+            return pipeline.linear_parameters()
+
+        model = bundle.get("model")
+        coef = getattr(model, "coef_", None)
+        intercept = getattr(model, "intercept_", None)
+
+        if coef is None or intercept is None:
+            return None
+
+        coef = np.asarray(coef, dtype=np.float64)
+        intercept = np.atleast_1d(np.asarray(intercept, dtype=np.float64))
+
+        # Only single-output models fit in a row
+        if coef.ndim == 2:
+            if coef.shape[0] != 1:
+                return None
+            coef = coef[0]
+
+        if intercept.shape != (1,) or coef.shape != (len(bundle.get("feature_order")),):
+            return None
+
+        return coef, float(intercept[0])
+
+    def register(self, user_id, model_id: str, bundle):
+        """Pack the bundle's model and return its feature order, or None if
+        it is not a single-output linear model."""
+        parameters = self.linear_parameters(bundle)
+
+        if parameters is None:
+            return None
+
+        key = (str(user_id), model_id)
+        feature_order = tuple(bundle.get("feature_order"))
+
+        with self._lock:
+            if key in self._index:
+                return list(self._index[key][0])
+
+            block = self._blocks.get(feature_order)
+            if block is None:
+                block = self._blocks[feature_order] = _CoefficientBlock(feature_order)
+
+            self._index[key] = (feature_order, block.add(*parameters))
+
+        return list(feature_order)
+
+    def unregister(self, user_id, model_id: str):
+        with self._lock:
+            entry = self._index.pop((str(user_id), model_id), None)
+            if entry is not None:
+                self._blocks[entry[0]].remove(entry[1])
+
+    def feature_order(self, user_id, model_id: str):
+        """The packed model's feature order, or None if it is not packed."""
+        with self._lock:
+            entry = self._index.get((str(user_id), model_id))
+
+        return None if entry is None else list(entry[0])
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def predict(self, user_id, model_ids, X, feature_order):
+        """Score X (n_rows x n_features, columns in feature_order) against every model.
+
+        Returns an (n_rows, n_models) array. Raises KeyError for a model that
+        is no longer packed under feature_order (unregistered meanwhile).
+        """
+        feature_order = tuple(feature_order)
+
+        with self._lock:
+            block = self._blocks[feature_order]
+            rows = []
+            for model_id in model_ids:
+                entry = self._index.get((str(user_id), model_id))
+                if entry is None or entry[0] != feature_order:
+                    raise KeyError(model_id)
+                rows.append(entry[1])
+            rows = np.array(rows)
+            coef = block.coef[rows]
+            intercept = block.intercept[rows]
+
+        return X @ coef.T + intercept
+
+
+registry = LinearModelRegistry()
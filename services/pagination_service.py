@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import String, and_, literal, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(sort_value: datetime, row_id: str):
+    payload = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(sort_value), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+def timestamp_bound(value: datetime):
+    # Bound as text in the same shape CURRENT_TIMESTAMP stores it: SQLite
+    # compares datetimes as strings and the DateTime type would append
+    # ".000000", which sorts after an equal timestamp stored without it.
+    # Stored timestamps are naive UTC, so an aware bound is converted first;
+    # its offset would otherwise be compared as part of the string.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return literal(value.isoformat(sep=" "), String)
+
+def keyset_page(query, sort_column, id_column, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Newest-first page of `query` after `cursor`.
+
+    (sort_column, id_column) is a total order, so rows sharing a timestamp are
+    neither skipped nor repeated; fetching limit + 1 rows tells us whether
+    another page exists without a COUNT.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        sort_value = timestamp_bound(sort_value)
+        query = query.where(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+def page_response(rows, limit: int, item, sort_key: str, id_key: str):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_key), getattr(last, id_key))
+
+    return {
+        "items": [item(row) for row in rows],
+        "next_cursor": next_cursor
+    }
@@ -1,19 +1,18 @@
 import time
 from fastapi import HTTPException
-import joblib
 from sqlalchemy.orm import Session
 
 from models.trained_models import TrainedModels
-import pandas as pd
 
-from services.storage_service import get_file
+from services import metadata_cache_service
+from services.model_cache_service import load_model_bundle
+from services.model_registry_service import registry
+from services.inference_pipeline_service import bundle_pipeline
+import numpy as np
 
 def predict_model(model_id: str, input_data: dict, user_id: str, db: Session):
 
-    trained_model = db.query(TrainedModels).filter(
-        TrainedModels.user_id == user_id,
-        TrainedModels.id == model_id
-    ).first()
+    trained_model = metadata_cache_service.get_trained_model(db, user_id, model_id)
 
     if not trained_model:
         raise HTTPException(
@@ -21,12 +20,10 @@ def predict_model(model_id: str, input_data: dict, user_id: str, db: Session):
             detail=f"model '{model_id}' for user {user_id} not found."
         )
 
-    mp = f"{user_id}/trained_models/model_{model_id}.pkl"
-
-    bundle = joblib.load(get_file(mp))
+    bundle = load_model_bundle(user_id, model_id)
 
     feature_order_columns = bundle.get("feature_order")
-    model = bundle.get("model")
+    pipeline = bundle_pipeline(bundle)
 
     if isinstance(input_data, dict):
         input_data = [input_data]
@@ -46,36 +43,34 @@ def predict_model(model_id: str, input_data: dict, user_id: str, db: Session):
             detail="Input features do not match model features."
         )
 
-    X = []
-
     for row in input_data:
-        row_values = []
         for f in feature_order_columns:
             if f not in row:
                 raise HTTPException(400, f"Missing feature: {f}")
 
-            row_values.append(float(row[f]))
-
-        X.append(row_values)
-
     start = time.perf_counter()
 
-    prediction = model.predict(X)
+    # Preprocessing fitted at training time runs here, on the raw values;
+    # each row comes back with one value per target (see "targets")
+    try:
+        prediction = pipeline.predict_records(input_data)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
     latency = (time.perf_counter() - start) * 1000
 
     return {
         "prediction": prediction.tolist(),
+        "targets": bundle.get("target_order"),
         "model_id": model_id,
         "num_predictions": len(prediction),
         "latency_ms": round(latency, 3)
     }
 
 def predict_using_csv(model_id: str, file, user_id: str, db: Session):
-    trained_model = db.query(TrainedModels).filter(
-        TrainedModels.user_id == user_id,
-        TrainedModels.id == model_id
-    ).first()
+    import pandas as pd
+
+    trained_model = metadata_cache_service.get_trained_model(db, user_id, model_id)
 
     if not trained_model:
         raise HTTPException(
@@ -83,28 +78,29 @@ def predict_using_csv(model_id: str, file, user_id: str, db: Session):
             detail=f"model '{model_id}' for user {user_id} not found."
         )
 
-    model_dir = f"bucket/{user_id}/trained_models"
-    model_path = f"{model_dir}/model_{model_id}.pkl"
-
-    mp = f"{user_id}/trained_models/model_{model_id}.pkl"
-
-    bundle = joblib.load(get_file(mp))
+    bundle = load_model_bundle(user_id, model_id)
 
     feature_order_columns = bundle.get("feature_order")
-    model = bundle.get("model")
+    pipeline = bundle_pipeline(bundle)
 
     print(file)
 
-    df = pd.read_csv(file.file)
+    # Numeric features are parsed as float64 directly and categorical ones as
+    # text, instead of inferring dtypes and converting row by row
+    dtype = {
+        spec["column"]: str if "categories" in spec else np.float64
+        for spec in pipeline.features
+    }
+
+    try:
+        df = pd.read_csv(file.file, dtype=dtype)
+    except ValueError:
+        raise HTTPException(400, "Invalid type: every numeric feature must be numeric")
 
     if df.empty:
         raise HTTPException(400, "CSV file is empty")
 
-    data_dict = df.to_dict(orient='records')
-
-    print(data_dict)
-
-    user_input_columns = list(data_dict[0].keys())
+    user_input_columns = list(df.columns)
 
     if set(user_input_columns) != set(feature_order_columns):
         raise HTTPException(
@@ -112,36 +108,118 @@ def predict_using_csv(model_id: str, file, user_id: str, db: Session):
             detail="Input features do not match model features."
         )
 
-    X = []
+    start = time.perf_counter()
+
+    try:
+        prediction = pipeline.predict_frame(df)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-    for i, row in enumerate(data_dict):
-        row_values = []
+    latency = (time.perf_counter() - start) * 1000
 
-        for f in feature_order_columns:
-            if f not in row:
-                raise HTTPException(400, f"Row {i}: Missing feature '{f}'")
+    return {
+        "prediction": prediction.tolist(),
+        "targets": bundle.get("target_order"),
+        "model_id": model_id,
+        "num_predictions": len(prediction),
+        "latency_ms": round(latency, 3)
+    }
+
+def predict_multi_model(model_ids, input_data, user_id: str, db: Session):
+    model_ids = list(dict.fromkeys(model_ids))
+
+    if not model_ids:
+        raise HTTPException(400, "No model ids provided")
 
-            if pd.isna(row[f]) or row[f] == "":
-                raise HTTPException(400, f"Row {i}: Missing value for '{f}'")
+    if isinstance(input_data, dict):
+        input_data = [input_data]
 
-            try:
-                value = float(row[f])
-            except:
-                raise HTTPException(400, f"Row {i}: Invalid type for '{f}'")
+    if not input_data:
+        raise HTTPException(400, "No input data provided")
 
-            row_values.append(value)
+    found = {
+        row.id for row in db.query(TrainedModels.id).filter(
+            TrainedModels.user_id == user_id,
+            TrainedModels.id.in_(model_ids)
+        ).all()
+    }
 
-        X.append(row_values)
+    for model_id in model_ids:
+        if model_id not in found:
+            # May have been deleted through another worker; drop the packed row
+            registry.unregister(user_id, model_id)
+            raise HTTPException(
+                status_code=404,
+                detail=f"model '{model_id}' for user {user_id} not found."
+            )
+
+    # Group packed models by feature order; anything that is not a
+    # single-output linear model of numeric features is predicted through
+    # its own pipeline.
+    packed = {}
+    unpacked = {}
+
+    for model_id in model_ids:
+        # One read of the registry entry: another request may unregister
+        # the model at any point
+        feature_order = registry.feature_order(user_id, model_id)
+
+        if feature_order is None:
+            bundle = load_model_bundle(user_id, model_id)
+            feature_order = registry.register(user_id, model_id, bundle)
+
+            if feature_order is None:
+                unpacked[model_id] = bundle
+                continue
+
+        packed.setdefault(tuple(feature_order), []).append(model_id)
+
+    def feature_matrix(feature_order_columns):
+        # Models with different feature orders can share one input, so
+        # extra keys are allowed here as long as every feature is present.
+        for i, row in enumerate(input_data):
+            missing = [f for f in feature_order_columns if f not in row]
+            if missing:
+                raise HTTPException(400, f"Row {i}: Missing feature(s) {missing}")
+        try:
+            return np.array([[float(row[f]) for f in feature_order_columns] for row in input_data])
+        except (TypeError, ValueError):
+            raise HTTPException(400, "Input features must be numeric")
+
+    predictions = {}
 
     start = time.perf_counter()
 
-    prediction = model.predict(X)
+    for feature_order, group in packed.items():
+        try:
+            scores = registry.predict(user_id, group, feature_matrix(feature_order), feature_order)
+        except KeyError as e:
+            # Deleted while this request was running
+            raise HTTPException(
+                status_code=404,
+                detail=f"model '{e.args[0]}' for user {user_id} not found."
+            )
+        for i, model_id in enumerate(group):
+            predictions[model_id] = scores[:, i].tolist()
+
+    for model_id, bundle in unpacked.items():
+        missing = [f for f in bundle.get("feature_order") if any(f not in row for row in input_data)]
+        if missing:
+            raise HTTPException(400, f"Missing feature(s) {missing}")
+
+        try:
+            prediction = bundle_pipeline(bundle).predict_records(input_data)
+        except ValueError as e:
+            raise HTTPException(400, f"Model '{model_id}': {e}")
+
+        # Single-output models answer with a flat list, as packed ones do
+        predictions[model_id] = (prediction[:, 0] if prediction.shape[1] == 1 else prediction).tolist()
 
     latency = (time.perf_counter() - start) * 1000
 
     return {
-        "prediction": prediction.tolist(),
-        "model_id": model_id,
-        "num_predictions": len(prediction),
+        "predictions": {model_id: predictions[model_id] for model_id in model_ids},
+        "num_models": len(model_ids),
+        "num_predictions": len(input_data),
         "latency_ms": round(latency, 3)
     }
\ No newline at end of file
@@ -0,0 +1,107 @@
+import io
+from functools import lru_cache
+
+import numpy as np
+
+from services.storage_service import delete_file, get_file, read_range, upload_file
+
+# Byte offset of every ROW_INDEX_EVERY-th data row, stored next to the CSV as
+# "<storage_path>.rowidx.npy". Layout: [every, start of row 0, start of row
+# every, start of row 2*every, ..., end of data]; bytes [0, start of row 0)
+# are the header.
+ROW_INDEX_EVERY = 10_000
+ROW_INDEX_SUFFIX = ".rowidx.npy"
+
+def index_path(storage_path: str):
+    return f"{storage_path}{ROW_INDEX_SUFFIX}"
+
+def build_row_index(file, row_count: int, every: int = ROW_INDEX_EVERY, chunk_size: int = 8 * 1024 * 1024):
+    """Scan the CSV once for row starts. Returns None when rows can't be found by newlines."""
+    file.seek(0)
+
+    offsets = []
+    newlines_seen = 0
+    position = 0
+    last_byte = b""
+
+    while True:
+        chunk = file.read(chunk_size)
+
+        if not chunk:
+            break
+
+        # A quoted field may span lines, so newlines stop being row boundaries
+        if b'"' in chunk:
+            return None
+
+        newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord("\n")) + position
+        # Newline k ends line k; line 0 is the header, so data row r starts
+        # right after newline r
+        line_numbers = np.arange(newlines_seen, newlines_seen + len(newlines))
+        offsets.extend((newlines[line_numbers % every == 0] + 1).tolist())
+
+        newlines_seen += len(newlines)
+        position += len(chunk)
+        last_byte = chunk[-1:]
+
+    file.seek(0)
+
+    data_rows = newlines_seen - 1 + (last_byte != b"\n")
+
+    # Blank lines are skipped by pandas but not by this count
+    if newlines_seen == 0 or data_rows != row_count:
+        return None
+
+    offsets = [offset for offset in offsets if offset < position]
+
+    return np.array([every, *offsets, position], dtype=np.int64)
+
+def store_row_index(storage_path: str, index):
+    buffer = io.BytesIO()
+    np.save(buffer, index, allow_pickle=False)
+    buffer.seek(0)
+
+    upload_file(buffer, index_path(storage_path))
+
+def delete_row_index(storage_path: str):
+    try:
+        delete_file(index_path(storage_path))
+    except Exception:
+        pass
+
+@lru_cache(maxsize=256)
+def load_row_index(storage_path: str):
+    # Blobs are content-addressed and never rewritten, so the index (or its
+    # absence) is safe to cache for the life of the process
+    try:
+        file = get_file(index_path(storage_path))
+    except Exception:
+        return None
+
+    try:
+        return np.load(io.BytesIO(file.read()), allow_pickle=False)
+    finally:
+        file.close()
+
+def read_rows(storage_path: str, index, start: int, end: int, usecols=None, dtype=None):
+    """Parse rows [start, end) by fetching the header plus only the byte range covering them."""
+    import pandas as pd
+
+    every = int(index[0])
+    offsets = index[1:]
+
+    first_block = start // every
+    last_block = min(-(-end // every), len(offsets) - 1)
+
+    header = read_range(storage_path, 0, int(offsets[0]))
+    body = read_range(storage_path, int(offsets[first_block]), int(offsets[last_block]))
+
+    skip = start - first_block * every
+
+    return pd.read_csv(
+        io.BytesIO(header + body),
+        usecols=usecols,
+        dtype=dtype,
+        skiprows=range(1, skip + 1),
+        nrows=end - start
+    )
\ No newline at end of file
@@ -0,0 +1,154 @@
+import os
+
+import numpy as np
+
+from services.dataset_stats_service import QUANTILES
+from services.row_index_service import read_rows
+from services.storage_service import open_file_stream
+
+# Preview training fits on a sample of the flow's rows instead of all of them
+PREVIEW_SAMPLE_SIZE = int(os.getenv("PREVIEW_SAMPLE_SIZE", "10000"))
+PREVIEW_CHUNK_ROWS = int(os.getenv("PREVIEW_CHUNK_ROWS", "100000"))
+# Indexed datasets are sampled from this many times more rows than the
+# sample needs, read as whole index blocks picked at random
+PREVIEW_BLOCK_OVERSAMPLING = int(os.getenv("PREVIEW_BLOCK_OVERSAMPLING", "4"))
+# ...and from at least this many blocks: rows of one block are not
+# independent, so the error estimates resample blocks and need enough of them
+PREVIEW_MIN_BLOCKS = int(os.getenv("PREVIEW_MIN_BLOCKS", "20"))
+
+SAMPLING_METHODS = ("reservoir", "stratified")
+
+# Added to rows read by indexed_blocks: the index block each row came from
+BLOCK_COLUMN = "__block__"
+
+def target_strata(target_stats):
+    """Stratum edges and population shares for a numeric target, from its
+    upload-time quantiles. None when the stats don't have them."""
+    quantiles = (target_stats or {}).get("quantiles") or {}
+    edges = [quantiles.get(str(q)) for q in QUANTILES]
+
+    if any(edge is None for edge in edges):
+        return None
+
+    shares = np.diff([0.0, *QUANTILES, 1.0])
+
+    # Missing targets form one more stratum
+    count = target_stats.get("count") or 0
+    nulls = target_stats.get("null_count") or 0
+    missing_share = nulls / (count + nulls) if count + nulls else 0.0
+
+    return np.array(edges, dtype=np.float64), np.append(shares * (1 - missing_share), missing_share)
+
+def _stratum_of(values, edges):
+    values = np.asarray(values, dtype=np.float64)
+    strata = np.searchsorted(edges, values, side="right")
+    strata[np.isnan(values)] = len(edges) + 1
+
+    return strata
+
+def _keep(keys, strata, quotas):
+    """Positions of the `quotas[s]` smallest keys within each stratum s."""
+    order = np.lexsort((keys, strata))
+    sorted_strata = strata[order]
+
+    # Rank of every row within its stratum
+    starts = np.searchsorted(sorted_strata, sorted_strata, side="left")
+    ranks = np.arange(len(order)) - starts
+
+    return order[ranks < quotas[sorted_strata]]
+
+def sample_chunks(chunks, size: int, seed: int = 0, target=None, strata=None):
+    """Uniform sample of `size` rows from an iterable of DataFrames, holding
+    at most one chunk plus the sample in memory. None for an empty stream.
+
+    Every row gets a random key and the smallest keys are kept (a reservoir
+    over the stream). With strata=(edges, shares) from target_strata, keys
+    compete only within the target's quantile band and each band keeps its
+    population share of the sample (proportional allocation).
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+
+    if strata is None:
+        quotas = np.array([size])
+    else:
+        edges, shares = strata
+        quotas = np.round(shares * size).astype(np.int64)
+
+    sample = None
+    keys = np.empty(0)
+    bands = np.empty(0, dtype=np.int64)
+    positions = np.empty(0, dtype=np.int64)
+    seen = 0
+
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        bands = np.concatenate([bands, np.zeros(len(chunk), dtype=np.int64) if strata is None else _stratum_of(chunk[target], edges)])
+        positions = np.concatenate([positions, np.arange(seen, seen + len(chunk))])
+        seen += len(chunk)
+
+        keep = _keep(keys, bands, quotas)
+
+        sample = sample.iloc[keep].reset_index(drop=True)
+        keys, bands, positions = keys[keep], bands[keep], positions[keep]
+
+    if sample is None:
+        return None
+
+    # Back in stream order
+    order = np.argsort(positions)
+
+    return sample.iloc[order].reset_index(drop=True)
+
+def stream_range(storage_path, start: int, end: int, usecols=None, dtype=None):
+    """Rows [start, end) of a stored CSV in chunks; stops reading at `end`."""
+    import pandas as pd
+
+    stream = open_file_stream(storage_path)
+
+    try:
+        position = 0
+
+        for chunk in pd.read_csv(stream, usecols=usecols, dtype=dtype, chunksize=PREVIEW_CHUNK_ROWS):
+            chunk_start, position = position, position + len(chunk)
+
+            if position <= start:
+                continue
+
+            yield chunk.iloc[max(start - chunk_start, 0):end - chunk_start]
+
+            if position >= end:
+                break
+    finally:
+        stream.close()
+
+def indexed_blocks(storage_path, index, start: int, end: int, size: int, usecols=None, dtype=None, seed: int = 0):
+    """Random whole blocks of an indexed CSV within [start, end), enough to
+    hold PREVIEW_BLOCK_OVERSAMPLING x size rows and at least
+    PREVIEW_MIN_BLOCKS of them; only their bytes are read. None when that
+    would be most of the range anyway.
+
+    This is a cluster sample: every row carries its block number in
+    BLOCK_COLUMN, so error estimates can resample whole blocks.
+    """
+    every = int(index[0])
+
+    # The index knows how many blocks there are even when the row count
+    # (and so end) is not known
+    first, last = start // every, min(-(-end // every), len(index) - 2)
+    wanted = max(-(-size * PREVIEW_BLOCK_OVERSAMPLING // every), PREVIEW_MIN_BLOCKS)
+
+    if wanted >= (last - first) // 2:
+        return None
+
+    rng = np.random.default_rng(seed)
+    blocks = np.sort(rng.choice(np.arange(first, last), size=wanted, replace=False))
+
+    return (
+        read_rows(storage_path, index, max(block * every, start), min((block + 1) * every, end), usecols, dtype).assign(**{BLOCK_COLUMN: block})
+        for block in blocks
+    )
@@ -0,0 +1,94 @@
+import fcntl
+import os
+import shutil
+import tempfile
+import time
+
+# When set (e.g. /dev/shm/model_store), model bundles are written once to this
+# directory and memory-mapped read-only by every worker process.
+#
+# Only bundles are shared. The packed LinearModelRegistry
+# (services/model_registry_service.py) is still built per process; its rows
+# are one float per feature, small next to the bundles, and deletions reach
+# it through the database check in predict_multi_model.
+SHARED_MODEL_STORE_DIR = os.getenv("SHARED_MODEL_STORE_DIR")
+# Tombstones of deleted models are swept after this long. It must exceed
+# METADATA_CACHE_TTL: after that no worker still has the model's row cached,
+# and a lookup finds it gone from the database.
+SHARED_TOMBSTONE_MAX_AGE = float(os.getenv("SHARED_TOMBSTONE_MAX_AGE", str(24 * 3600)))
+
+def enabled():
+    return bool(SHARED_MODEL_STORE_DIR)
+
+def _bundle_path(user_id, model_id: str):
+    return os.path.join(SHARED_MODEL_STORE_DIR, str(user_id), f"model_{model_id}.joblib")
+
+def _tombstone_path(user_id, model_id: str):
+    return os.path.join(SHARED_MODEL_STORE_DIR, "tombstones", f"{user_id}_{model_id}")
+
+def attach_bundle(user_id, model_id: str, download):
+    """Memory-map the shared copy of a bundle, materializing it first if needed.
+
+    `download` returns a file-like object with the serialized bundle; it is only
+    called by the one process that wins the file lock.
+    """
+    path = _bundle_path(user_id, model_id)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another worker may have written it while we were waiting
+                if not os.path.exists(path):
+                    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                    with os.fdopen(fd, "wb") as tmp:
+                        shutil.copyfileobj(download(), tmp)
+                    os.replace(tmp_path, path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    import joblib
+
+    # NumPy arrays inside the bundle become read-only views of the shared pages
+    return joblib.load(path, mmap_mode="r")
+
+def invalidate(user_id, model_id: str):
+    path = _bundle_path(user_id, model_id)
+
+    # Leave a tombstone so other workers drop their in-process references
+    os.makedirs(os.path.dirname(_tombstone_path(user_id, model_id)), exist_ok=True)
+    open(_tombstone_path(user_id, model_id), "w").close()
+
+    for stale in (path, f"{path}.lock"):
+        try:
+            os.remove(stale)
+        except FileNotFoundError:
+            pass
+
+    sweep_tombstones()
+
+def sweep_tombstones(max_age: float = None):
+    """Remove tombstones older than max_age. Runs on every invalidate, so
+    the directory stays bounded by the deletions of the last max_age."""
+    max_age = SHARED_TOMBSTONE_MAX_AGE if max_age is None else max_age
+    directory = os.path.join(SHARED_MODEL_STORE_DIR, "tombstones")
+
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+
+    now = time.time()
+
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime > max_age:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            # Swept by another worker
+            pass
+
+def is_invalidated(user_id, model_id: str):
+    return os.path.exists(_tombstone_path(user_id, model_id))
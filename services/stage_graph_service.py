@@ -0,0 +1,87 @@
+import hashlib
+import json
+import time
+
+from services import feature_store_service
+
+# Bump whenever a stage changes what it produces for the same params
+STAGE_GRAPH_VERSION = 2
+
+
+class StageGraph:
+    """Runs named stages on demand, reusing cached outputs where keys match.
+
+    A stage's key hashes its name, its params and the keys of the stages it
+    depends on, so a config change invalidates exactly the stages downstream
+    of it. Asking for an output only runs what is missing: a cached stage is
+    loaded without touching its dependencies. Each stage's run function gets
+    its dependencies' outputs (dicts) and returns a dict.
+    """
+
+    def __init__(self, cache: bool = True):
+        self.cache = cache and feature_store_service.enabled()
+        self._stages = {}
+        self._keys = {}
+        self._outputs = {}
+        self._report = {}
+
+    def add(self, name: str, run, deps=(), params=None, cache: bool = True):
+        """Register a stage. Stages with cache=False are cheap derivations
+        that are recomputed whenever something downstream needs them."""
+        self._stages[name] = (run, tuple(deps), params or {}, cache)
+
+    def key(self, name: str):
+        if name not in self._keys:
+            _, deps, params, _ = self._stages[name]
+
+            payload = {
+                "version": STAGE_GRAPH_VERSION,
+                "stage": name,
+                "params": params,
+                "deps": [self.key(dep) for dep in deps]
+            }
+
+            self._keys[name] = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+        return self._keys[name]
+
+    def output(self, name: str):
+        if name in self._outputs:
+            return self._outputs[name]
+
+        run, deps, _, cache = self._stages[name]
+        cache = cache and self.cache
+
+        start = time.perf_counter()
+        output = feature_store_service.load_entry(self.key(name)) if cache else None
+
+        if output is not None:
+            status = "hit"
+        else:
+            inputs = [self.output(dep) for dep in deps]
+
+            # Only this stage's own work, not its dependencies'
+            start = time.perf_counter()
+            output = run(*inputs)
+
+            if cache:
+                feature_store_service.store_entry(self.key(name), output)
+
+            status = "miss" if cache else "computed"
+
+        self._report[name] = {"status": status, "seconds": round(time.perf_counter() - start, 4)}
+        self._outputs[name] = output
+
+        return output
+
+    def report(self):
+        """Per stage, in registration order: hit, miss, computed (not
+        cacheable) or skipped (not needed), with its key and time."""
+        return [
+            {
+                "stage": name,
+                "key": self.key(name)[:16],
+                **self._report.get(name, {"status": "skipped", "seconds": 0.0})
+            }
+            for name in self._stages
+        ]
\ No newline at end of file
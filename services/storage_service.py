@@ -1,50 +1,526 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from io import BytesIO
+from pathlib import Path
 
-import boto3
+import hashlib
+import io
+import mmap
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import shutil
+import tempfile
+import threading
+import uuid
+import config
 
 '''print("AWS_ACCESS_KEY_ID:", os.getenv("AWS_ACCESS_KEY_ID"))
 print("AWS_SECRET_ACCESS_KEY:", os.getenv("AWS_SECRET_ACCESS_KEY"))
 print("AWS_REGION:", os.getenv("AWS_REGION"))
 print("AWS_BUCKET_NAME:", os.getenv("AWS_BUCKET_NAME"))'''
 
-s3_client = boto3.client(
-    "s3",
-    region_name=os.getenv("AWS_REGION"),
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
+
+# "s3", "local" (files under LOCAL_STORAGE_ROOT, the embedded default) or
+# "memory" (process-local, for tests and throwaway runs).
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local" if config.EMBEDDED else "s3").lower()
+LOCAL_STORAGE_ROOT = Path(os.getenv("LOCAL_STORAGE_ROOT", "bucket")).resolve()
+
+# Transfer tuning. Objects at or above the threshold are moved in chunks,
+# up to STORAGE_MAX_CONCURRENCY at a time, in both directions.
+STORAGE_MAX_CONCURRENCY = max(1, int(os.getenv("STORAGE_MAX_CONCURRENCY", "8")))
+STORAGE_MULTIPART_THRESHOLD = int(os.getenv("STORAGE_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+STORAGE_MULTIPART_CHUNKSIZE = max(
+    5 * 1024 * 1024,
+    int(os.getenv("STORAGE_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
 )
 
-BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
+def _write_at(fd, data, offset, lock):
+    if hasattr(os, "pwrite"):
+        os.pwrite(fd, data, offset)
+        return
 
+    with lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
 
-def upload_file(file, path):
+def _map_fd(fd):
+    # Read-only mapping: pandas and joblib read straight from the page cache
+    # without copying the whole object into a buffer first.
+    if os.fstat(fd).st_size == 0:
+        return BytesIO()
 
-    s3_client.upload_fileobj(
-        file,
-        BUCKET_NAME,
-        path
-    )
+    return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
 
-def get_file(path):
-    file = BytesIO()
+class HashingReader(io.RawIOBase):
+    """Pass-through reader that hashes every byte read from `file`.
+
+    Lets a parser consume an upload while its content hash is computed in
+    the same pass; call drain() before hexdigest() if the parser may stop
+    early.
+    """
+
+    def __init__(self, file, algorithm="sha256"):
+        self.file = file
+        self.hash = hashlib.new(algorithm)
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.file.read(len(buffer))
+        size = len(data)
+
+        buffer[:size] = data
+        self.hash.update(data)
+        self.bytes_read += size
+
+        return size
+
+    def drain(self, chunk_size=1024 * 1024):
+        while self.read(chunk_size):
+            pass
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+class _RangedStream(io.RawIOBase):
+    """Sequential reader that keeps up to `concurrency` ranged GETs in flight."""
+
+    def __init__(self, fetch_range, size, chunksize, concurrency):
+        self._fetch_range = fetch_range
+        self._size = size
+        self._chunksize = chunksize
+        self._concurrency = concurrency
+        self._pool = ThreadPoolExecutor(max_workers=concurrency)
+        self._pending = deque()
+        self._next_start = 0
+        self._buffer = memoryview(b"")
+        self._prefetch()
+
+    def _prefetch(self):
+        while len(self._pending) < self._concurrency and self._next_start < self._size:
+            end = min(self._next_start + self._chunksize, self._size) - 1
+            self._pending.append(self._pool.submit(self._fetch_range, self._next_start, end))
+            self._next_start = end + 1
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer:
+            if not self._pending:
+                return 0
+
+            self._buffer = memoryview(self._pending.popleft().result())
+            self._prefetch()
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pending.clear()
+
+        super().close()
+
+class StorageBackend:
+    """Object storage used for datasets, model bundles and batch outputs.
+
+    get_file returns a seekable binary file-like with the whole object;
+    open_file_stream returns a sequential reader callers can parse while the
+    object is still arriving.
+    """
+
+    def upload_file(self, file, path):
+        raise NotImplementedError
+
+    def get_file(self, path):
+        raise NotImplementedError
+
+    def open_file_stream(self, path):
+        return self.get_file(path)
+
+    def read_range(self, path, start, end):
+        """Bytes [start, end) of the object."""
+        if end <= start:
+            return b""
+
+        file = self.get_file(path)
+        file.seek(start)
+
+        return file.read(end - start)
+
+    def delete_file(self, path):
+        raise NotImplementedError
+
+    def create_multipart_upload(self, path):
+        raise NotImplementedError
+
+    def upload_part(self, path, upload_id, part_number, data):
+        raise NotImplementedError
+
+    def complete_multipart_upload(self, path, upload_id, parts):
+        raise NotImplementedError
+
+    def abort_multipart_upload(self, path, upload_id):
+        raise NotImplementedError
+
+    def get_download_url(self, path, expires_in=3600):
+        """A URL a remote client can fetch the object from directly, or None
+        when the backend has no such URL and the API has to serve it."""
+        return None
+
+class S3Storage(StorageBackend):
+
+    def __init__(self, bucket, max_concurrency, multipart_threshold, multipart_chunksize):
+        self.bucket = bucket
+        self.max_concurrency = max_concurrency
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+
+    @cached_property
+    def client(self):
+        return get_s3_client()
+
+    @cached_property
+    def transfer_config(self):
+        from boto3.s3.transfer import TransferConfig
+
+        return TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_chunksize,
+            max_concurrency=self.max_concurrency,
+            use_threads=self.max_concurrency > 1
+        )
+
+    def _size(self, path):
+        return self.client.head_object(Bucket=self.bucket, Key=path)["ContentLength"]
+
+    def _fetch_range(self, path, start, end):
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=path,
+            Range=f"bytes={start}-{end}"
+        )
+
+        return response["Body"].read()
+
+    def upload_file(self, file, path):
+        self.client.upload_fileobj(file, self.bucket, path, Config=self.transfer_config)
+
+    def read_range(self, path, start, end):
+        if end <= start:
+            return b""
+
+        return self._fetch_range(path, start, end - 1)
+
+    def get_file(self, path):
+        size = self._size(path)
+
+        if size < self.multipart_threshold:
+            file = BytesIO()
+            self.client.download_fileobj(self.bucket, path, file, Config=self.transfer_config)
+            file.seek(0)
+
+            return file
+
+        return self._download_ranged(path, size)
+
+    def _download_ranged(self, path, size):
+        # Parallel ranged GETs written at their offsets into a preallocated,
+        # already-unlinked temp file, then mapped read-only. The object never
+        # sits in the Python heap and the file disappears with the mapping.
+        tmp = tempfile.TemporaryFile()
+
+        try:
+            fd = tmp.fileno()
+            os.ftruncate(fd, size)
+            lock = threading.Lock()
+
+            def fetch(start):
+                end = min(start + self.multipart_chunksize, size) - 1
+                _write_at(fd, self._fetch_range(path, start, end), start, lock)
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                list(pool.map(fetch, range(0, size, self.multipart_chunksize)))
+
+            return _map_fd(fd)
+        finally:
+            tmp.close()
+
+    def open_file_stream(self, path):
+        size = self._size(path)
+
+        if size < self.multipart_threshold or self.max_concurrency == 1:
+            # Streaming body: callers can parse while the object is still downloading
+            return self.client.get_object(Bucket=self.bucket, Key=path)["Body"]
+
+        stream = _RangedStream(
+            lambda start, end: self._fetch_range(path, start, end),
+            size,
+            self.multipart_chunksize,
+            self.max_concurrency
+        )
+
+        return io.BufferedReader(stream, buffer_size=1024 * 1024)
 
-    s3_client.download_fileobj(
-        BUCKET_NAME,
-        path,
-        file
+    def delete_file(self, path):
+        self.client.delete_object(Bucket=self.bucket, Key=path)
+
+    def create_multipart_upload(self, path):
+        response = self.client.create_multipart_upload(Bucket=self.bucket, Key=path)
+
+        return response["UploadId"]
+
+    def upload_part(self, path, upload_id, part_number, data):
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=path,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            Body=data
+        )
+
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def complete_multipart_upload(self, path, upload_id, parts):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=path,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+
+    def abort_multipart_upload(self, path, upload_id):
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=path, UploadId=upload_id)
+
+    def get_download_url(self, path, expires_in=3600):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": path},
+            ExpiresIn=expires_in
+        )
+
+class LocalStorage(StorageBackend):
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+
+    def _path(self, path):
+        full_path = (self.root / path.lstrip("/")).resolve()
+
+        if self.root not in full_path.parents:
+            raise ValueError(f"Storage path escapes the storage root: {path}")
+
+        return full_path
+
+    def _temp_file(self, full_path, suffix):
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        return tempfile.mkstemp(dir=full_path.parent, prefix=f".{full_path.name}.", suffix=suffix)
+
+    def upload_file(self, file, path):
+        # Write next to the target and rename over it, so readers only ever see
+        # a complete file and a crash never leaves a truncated object behind.
+        full_path = self._path(path)
+        fd, tmp_path = self._temp_file(full_path, ".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                shutil.copyfileobj(file, tmp)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get_file(self, path):
+        with open(self._path(path), "rb") as f:
+            return _map_fd(f.fileno())
+
+    def read_range(self, path, start, end):
+        if end <= start:
+            return b""
+
+        with open(self._path(path), "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def delete_file(self, path):
+        # Mirrors S3, where deleting a missing key is not an error
+        self._path(path).unlink(missing_ok=True)
+
+    def _parts_dir(self, path, upload_id):
+        parent = self._path(path).parent
+        parts_dir = parent / upload_id
+
+        if parts_dir.parent != parent or not upload_id.endswith(".parts"):
+            raise ValueError(f"Unknown multipart upload: {upload_id}")
+
+        return parts_dir
+
+    def create_multipart_upload(self, path):
+        # Each part is its own file in a temp directory next to the target,
+        # so parts may arrive in any order or be retried; the directory name
+        # doubles as the upload id.
+        full_path = self._path(path)
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        return os.path.basename(tempfile.mkdtemp(dir=full_path.parent, prefix=f".{full_path.name}.", suffix=".parts"))
+
+    def upload_part(self, path, upload_id, part_number, data):
+        part_path = self._parts_dir(path, upload_id) / f"{part_number:05d}"
+
+        # A retried part replaces the earlier attempt whole
+        tmp_path = part_path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, part_path)
+
+        return {"PartNumber": part_number, "ETag": str(part_number)}
+
+    def complete_multipart_upload(self, path, upload_id, parts):
+        full_path = self._path(path)
+        parts_dir = self._parts_dir(path, upload_id)
+        fd, tmp_path = self._temp_file(full_path, ".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for part in sorted(parts, key=lambda part: part["PartNumber"]):
+                    with open(parts_dir / f"{part['PartNumber']:05d}", "rb") as part_file:
+                        shutil.copyfileobj(part_file, tmp)
+
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, path, upload_id):
+        shutil.rmtree(self._parts_dir(path, upload_id), ignore_errors=True)
+
+class InMemoryStorage(StorageBackend):
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.lock = threading.Lock()
+
+    def upload_file(self, file, path):
+        data = file.read()
+
+        with self.lock:
+            self.objects[path] = data
+
+    def get_file(self, path):
+        with self.lock:
+            if path not in self.objects:
+                raise FileNotFoundError(path)
+
+            return BytesIO(self.objects[path])
+
+    def delete_file(self, path):
+        with self.lock:
+            self.objects.pop(path, None)
+
+    def create_multipart_upload(self, path):
+        upload_id = uuid.uuid4().hex
+
+        with self.lock:
+            self.uploads[upload_id] = {}
+
+        return upload_id
+
+    def upload_part(self, path, upload_id, part_number, data):
+        with self.lock:
+            self.uploads[upload_id][part_number] = bytes(data)
+
+        return {"PartNumber": part_number, "ETag": str(part_number)}
+
+    def complete_multipart_upload(self, path, upload_id, parts):
+        with self.lock:
+            uploaded = self.uploads.pop(upload_id)
+            self.objects[path] = b"".join(
+                uploaded[part["PartNumber"]] for part in sorted(parts, key=lambda part: part["PartNumber"])
+            )
+
+    def abort_multipart_upload(self, path, upload_id):
+        with self.lock:
+            self.uploads.pop(upload_id, None)
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    # boto3 is slow to import and build, so it is deferred until first use
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        region_name=os.getenv("AWS_REGION"),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        # Enough pooled connections for every concurrent part transfer
+        config=Config(max_pool_connections=max(10, STORAGE_MAX_CONCURRENCY * 2))
     )
 
-    file.seek(0)
+@lru_cache(maxsize=None)
+def get_storage():
+    if STORAGE_BACKEND == "s3":
+        return S3Storage(
+            BUCKET_NAME,
+            STORAGE_MAX_CONCURRENCY,
+            STORAGE_MULTIPART_THRESHOLD,
+            STORAGE_MULTIPART_CHUNKSIZE
+        )
+
+    if STORAGE_BACKEND == "local":
+        return LocalStorage(LOCAL_STORAGE_ROOT)
+
+    if STORAGE_BACKEND == "memory":
+        return InMemoryStorage()
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+
+def upload_file(file, path):
+    get_storage().upload_file(file, path)
+
+def get_file(path):
+    return get_storage().get_file(path)
 
-    return file
+def read_range(path, start, end):
+    return get_storage().read_range(path, start, end)
 
 def delete_file(path):
+    get_storage().delete_file(path)
+
+def open_file_stream(path):
+    return get_storage().open_file_stream(path)
+
+def create_multipart_upload(path):
+    return get_storage().create_multipart_upload(path)
+
+def upload_part(path, upload_id, part_number, data):
+    return get_storage().upload_part(path, upload_id, part_number, data)
+
+def complete_multipart_upload(path, upload_id, parts):
+    get_storage().complete_multipart_upload(path, upload_id, parts)
+
+def abort_multipart_upload(path, upload_id):
+    get_storage().abort_multipart_upload(path, upload_id)
 
-    s3_client.delete_object(
-        Bucket=BUCKET_NAME,
-        Key=path
-    )
\ No newline at end of file
+def get_download_url(path, expires_in=3600):
+    return get_storage().get_download_url(path, expires_in)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+
+# CPU threads this process may keep busy. With several workers per host,
+# give each its share (e.g. cores / workers).
+CPU_LIMIT = max(1, int(os.getenv("CPU_LIMIT", str(os.cpu_count() or 1))))
+# Held back from training for request handling and predictions
+SERVING_THREADS = min(max(1, int(os.getenv("SERVING_THREADS", "1"))), CPU_LIMIT)
+# Cap per training job, so one job cannot take the whole budget (0 = no cap)
+TRAINING_THREADS_PER_JOB = int(os.getenv("TRAINING_THREADS_PER_JOB", "0"))
+
+# How each algorithm parallelizes, and therefore which knob its share goes to
+ALGORITHM_PARALLELISM = {
+    "Linear Regression": "blas",
+    "Ridge Regression": "blas",
+    "Random Forest": "n_jobs",
+    "Histogram Gradient Boosting": "openmp"
+}
+
+
+class ThreadBudget:
+    """Hands out CPU threads to training jobs from a fixed pool.
+
+    A job asks before fitting and blocks until at least one thread is free;
+    it gets up to per_job threads and returns them when it is done. The
+    share is applied as n_jobs by the caller, or here through threadpoolctl:
+    OpenMP limits are per calling thread, but BLAS thread counts are
+    process-wide, so BLAS-bound jobs also take turns on a lock instead of
+    overwriting each other's limit.
+
+    Limitations of the BLAS case, which only a separate process per job
+    would lift:
+
+    - BLAS-bound jobs (the linear models) run one at a time per process,
+      even when the budget has threads to spare; other algorithms still
+      run beside them.
+    - While one runs, its limit also applies to BLAS calls made by
+      predictions on serving threads, which may use the job's share instead
+      of SERVING_THREADS. The serving cap is restored when the job ends.
+
+    With many concurrent linear jobs, run more worker processes with a
+    smaller CPU_LIMIT each rather than one large budget.
+    """
+
+    def __init__(self, total: int, per_job: int = 0):
+        self.total = max(1, total)
+        self.per_job = min(per_job or self.total, self.total)
+        self.available = self.total
+        self._condition = threading.Condition()
+        self._blas = threading.Lock()
+
+    def _take(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.available > 0)
+            granted = min(self.per_job, self.available)
+            self.available -= granted
+
+        return granted
+
+    def _give(self, granted: int):
+        with self._condition:
+            self.available += granted
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, algorithm: str):
+        """Yield the number of threads this job may use."""
+        from threadpoolctl import threadpool_limits
+
+        parallelism = ALGORITHM_PARALLELISM.get(algorithm)
+
+        # Queue for the BLAS lock before holding any threads; the limit it
+        # guards is process-wide (see the class docstring)
+        with self._blas if parallelism == "blas" else nullcontext():
+            granted = self._take()
+
+            try:
+                if parallelism in ("blas", "openmp"):
+                    limits = threadpool_limits(limits=granted, user_api=parallelism)
+                else:
+                    limits = nullcontext()
+
+                with limits:
+                    yield granted
+            finally:
+                self._give(granted)
+
+
+# With a single CPU, training still gets one thread and shares it with serving
+training_budget = ThreadBudget(CPU_LIMIT - SERVING_THREADS, TRAINING_THREADS_PER_JOB)
+
+def limit_serving_threads():
+    """Cap BLAS at the serving share for everything outside a training job."""
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=SERVING_THREADS, user_api="blas")
\ No newline at end of file
@@ -1,23 +1,29 @@
 import io
 import os
+import sys
 import uuid
 
-import joblib
 import numpy as np
-import pandas as pd
 from fastapi import HTTPException
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models.datasets import DataSets
 from models.user_flow import UserFlows
 from models.trained_models import TrainedModels
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from services.storage_service import upload_file, delete_file, get_file
+from schemas.config_schema import as_columns
+from services.storage_service import upload_file, delete_file, get_file, open_file_stream
+from services import csv_service, metadata_cache_service
+from services.dataset_stats_service import fill_value, is_categorical
+from services.dtype_service import plan_dtypes, read_csv_optimized
+from services.row_index_service import load_row_index, read_rows
+from services.sampling_service import BLOCK_COLUMN, indexed_blocks, sample_chunks, stream_range, target_strata
+from services.pagination_service import DEFAULT_PAGE_SIZE, keyset_page, page_response, timestamp_bound
+from services.model_cache_service import evict_model_bundle
+from services.model_registry_service import registry
+from services.inference_pipeline_service import InferencePipeline
+from services.stage_graph_service import StageGraph
+from services.thread_budget_service import training_budget
 
 def delete_model(model_id: str, user_id: str, db: Session):
     trained_model = db.query(TrainedModels).filter(
@@ -53,81 +59,413 @@ def delete_model(model_id: str, user_id: str, db: Session):
             detail="Failed to delete trained model from database."
         )
 
+    # Only once the row is gone, so a concurrent lookup cannot cache it again
+    evict_model_bundle(user_id, model_id)
+    metadata_cache_service.invalidate_model(user_id, model_id)
+    registry.unregister(user_id, model_id)
+
     return {"detail": "DELETED"}
 
-def get_all_models(user_id: str, db: Session):
-    trained_models = db.query(TrainedModels).filter(
+async def get_all_models(user_id: str, adb, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, flow_name: str = None, model_type: str = None, trained_after=None, trained_before=None):
+    # Only the listed columns are selected; metrics_json stays in the database
+    query = select(TrainedModels.id, TrainedModels.flow_id, TrainedModels.model_type, TrainedModels.is_preview, TrainedModels.trained_at).where(
         TrainedModels.user_id == user_id
-    ).all()
+    )
+
+    if flow_name:
+        result = await adb.execute(
+            select(UserFlows.id).where(
+                UserFlows.user_id == user_id,
+                UserFlows.flow_name == flow_name
+            )
+        )
+        flow = result.first()
 
-    if not trained_models:
-        return []
+        if not flow:
+            raise HTTPException(404, f"Flow '{flow_name}' not found")
 
-    trained_models_list = []
+        query = query.where(TrainedModels.flow_id == flow.id)
 
-    for model in trained_models:
-        trained_models_list.append({
-            "model_id": model.id
-        })
+    if model_type:
+        query = query.where(TrainedModels.model_type == model_type)
 
-    return trained_models_list
+    if trained_after:
+        query = query.where(TrainedModels.trained_at >= timestamp_bound(trained_after))
 
-def prepare_data(flow, data_set_meta):
+    if trained_before:
+        query = query.where(TrainedModels.trained_at < timestamp_bound(trained_before))
+
+    result = await adb.execute(keyset_page(query, TrainedModels.trained_at, TrainedModels.id, cursor, limit))
+
+    return page_response(
+        result.all(), limit,
+        lambda model: {
+            "model_id": model.id,
+            "flow_id": model.flow_id,
+            "model_type": model.model_type,
+            "is_preview": model.is_preview,
+            "trained_at": model.trained_at
+        },
+        "trained_at", "id"
+    )
+
+# pandas, scikit-learn and joblib are imported inside the training functions
+# so that importing the app (and collecting tests) does not pay for them.
+
+# Categorical columns with at least this many categories are one-hot encoded
+# into a sparse matrix and kept sparse through scaling and fitting
+SPARSE_CARDINALITY_THRESHOLD = int(os.getenv("SPARSE_CARDINALITY_THRESHOLD", "64"))
+
+# Preview metrics come with bootstrap intervals at this confidence level
+PREVIEW_BOOTSTRAP_RESAMPLES = int(os.getenv("PREVIEW_BOOTSTRAP_RESAMPLES", "1000"))
+PREVIEW_CONFIDENCE = float(os.getenv("PREVIEW_CONFIDENCE", "0.95"))
+
+def _column_output(name, series):
+    """A column in a form the stage cache keeps as plain arrays: numbers as
+    they are, text as integer codes plus the list of categories."""
+    if is_categorical(str(series.dtype)):
+        codes, categories = series.factorize()
+        return {f"{name}_codes": codes.astype(np.int32), f"{name}_categories": [str(c) for c in categories]}
+
+    return {name: series.to_numpy()}
+
+def _hstack(blocks):
+    """Feature blocks side by side; sparse if any block is."""
+    from scipy.sparse import csr_matrix, hstack, issparse
+
+    if len(blocks) == 1:
+        return blocks[0]
+
+    if any(issparse(block) for block in blocks):
+        return hstack([csr_matrix(block) for block in blocks], format="csr")
+
+    return np.hstack(blocks)
+
+def _column_values(output, name):
+    if f"{name}_codes" in output:
+        # Code -1 (missing) picks the trailing NaN
+        categories = np.array(list(output[f"{name}_categories"]) + [np.nan], dtype=object)
+        return categories[output[f"{name}_codes"]].reshape(-1, 1)
+
+    return np.asarray(output[name]).reshape(-1, 1)
+
+def flow_stage_graph(flow, data_set_meta, user_id, cache=True, sample=None):
+    """The training stages of a flow, each keyed by the config it depends on:
+
+    load -> select -> encode -> impute -> split -> scale -> fit -> evaluate
+
+    so that e.g. a new test_size reruns split onward and a new algorithm
+    only fit and evaluate. See StageGraph for how outputs are reused.
+
+    With sample={"size", "method", "seed"}, load keeps only a sample of the
+    flow's rows (see services/sampling_service.py) and evaluate adds
+    bootstrap intervals to the metrics.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+
+    config = flow.config_json
     user_file = f"{data_set_meta.storage_path}"
-    df = pd.read_csv(get_file(user_file))
 
-    column_X = flow.config_json.get("data_range_X")
-    column_y = flow.config_json.get("data_range_y")
+    columns_X = as_columns(config.get("data_range_X"))
+    columns_y = as_columns(config.get("data_range_y"))
+    column_schema = data_set_meta.column_schema or {}
+    dataset_stats = getattr(data_set_meta, "column_stats", None) or {}
 
-    # Validate columns
-    missing = []
-    if column_X not in df.columns:
-        missing.append(column_X)
-    if column_y not in df.columns:
-        missing.append(column_y)
+    # Validate columns against the stored schema, before anything is downloaded
+    missing = [column for column in columns_X + columns_y if column not in column_schema]
 
-    if missing:
+    if missing or not columns_X or not columns_y:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid column(s): {missing}. Available columns: {list(df.columns)}"
+            detail=f"Invalid column(s): {missing}. Available columns: {list(column_schema)}"
         )
 
-    rows = flow.config_json.get('row_range')
+    def categorical(column):
+        return is_categorical(column_schema[column])
+
+    usecols = list(dict.fromkeys(columns_X + columns_y))
+    # Compact dtypes planned from the upload-time stats; targets keep theirs
+    dtype = plan_dtypes(column_schema, dataset_stats, usecols, columns_y) or None
+    row_count = data_set_meta.row_count
+    row_range = config.get('row_range')
+    rows = row_range or (0, row_count)
+    full_range = row_count is None or (rows[0] <= 0 and rows[1] >= row_count)
+    # Sampling reads whole index blocks even when the flow uses every row
+    row_index = None if full_range and not sample else load_row_index(user_file)
+
+    # A slice of an indexed CSV is read on its own (header plus only the
+    # byte range covering row_range); anything else, including datasets
+    # without a stored row count, reads the whole columns
+    read_range = (max(rows[0], 0), min(rows[1], row_count)) if row_index is not None and row_count is not None else None
+
+    strata = None
+    if sample:
+        # Multi-target flows are stratified on their first target
+        strata = target_strata(dataset_stats.get(columns_y[0])) if sample["method"] == "stratified" and not categorical(columns_y[0]) else None
+
+        # Targets without quantile stats (text, or datasets from before
+        # stats) are sampled uniformly
+        sample = {**sample, "method": "stratified" if strata is not None else "reservoir"}
+
+    # Upload-time stats describe the whole column, so they stand in for a
+    # fitted imputer only when the flow trains on every row
+    column_stats = dataset_stats if full_range else {}
+
+    # Datasets uploaded before content hashing have no stable version to key on
+    graph = StageGraph(cache=cache and bool(getattr(data_set_meta, "content_hash", None)))
+
+    def load():
+        # Only the columns the flow uses, with compact dtypes planned from
+        # the upload-time stats
+        if sample:
+            df = load_sample()
+        elif read_range is not None:
+            df = read_rows(user_file, row_index, *read_range, usecols, dtype)
+        else:
+            # A parallel parse needs the whole object (fetched with ranged
+            # GETs); otherwise parse while it is still downloading
+            stream = get_file(user_file) if csv_service.parallel_enabled() else open_file_stream(user_file)
+            try:
+                df = read_csv_optimized(stream, column_schema, dataset_stats, usecols=usecols, targets=columns_y)
+            finally:
+                stream.close()
+
+        loaded = {}
+        for i, column in enumerate(columns_X):
+            loaded.update(_column_output(f"X{i}", df[column]))
+        for i, column in enumerate(columns_y):
+            loaded.update(_column_output(f"y{i}", df[column]))
+
+        # Rows of a block sample are not independent; keep which block each
+        # came from for the bootstrap
+        if BLOCK_COLUMN in df:
+            loaded["index_blocks"] = df[BLOCK_COLUMN].to_numpy(np.int64)
+
+        return loaded
+
+    def load_sample():
+        start = max(rows[0], 0)
+        end = min(rows[1], row_count) if row_count is not None else (rows[1] if row_range else sys.maxsize)
+
+        # Indexed datasets: random blocks, fetched by byte range; otherwise
+        # one pass over the stream that stops at the end of the range
+        chunks = None
+        if row_index is not None:
+            chunks = indexed_blocks(user_file, row_index, start, end, sample["size"], usecols, dtype, sample["seed"])
+        if chunks is None:
+            chunks = stream_range(user_file, start, end, usecols, dtype)
+
+        df = sample_chunks(chunks, sample["size"], sample["seed"], columns_y[0], strata)
+
+        if df is None or df.empty:
+            raise HTTPException(
+                status_code=400,
+                detail="No rows to sample in the flow's row_range"
+            )
+
+        return df
+
+    def select(loaded):
+        window = slice(None) if read_range is not None or sample or not row_range else slice(*row_range)
+
+        def values(name, column):
+            # Narrow dtypes are for parsing and holding the frame; fitting
+            # runs in float64 exactly as it did before the dtype plan existed
+            column_values = _column_values(loaded, name)[window]
+            return column_values if categorical(column) else column_values.astype(np.float64)
+
+        return {
+            "X": [values(f"X{i}", column) for i, column in enumerate(columns_X)],
+            "y": [values(f"y{i}", column) for i, column in enumerate(columns_y)],
+            "index_blocks": loaded.get("index_blocks")
+        }
+
+    def encode(selected):
+        X_blocks = []
+        y_blocks = []
+
+        # What inference needs to repeat this preprocessing on raw input; see
+        # services/inference_pipeline_service.py
+        features = []
+
+        for column, X in zip(columns_X, selected["X"]):
+            feature = {"column": column}
+
+            if categorical(column):
+                X, categories = encode_categorical(X, dataset_stats.get(column))
+                feature["categories"] = [str(c) for c in categories if c == c and c is not None]
+                feature["missing_category"] = len(feature["categories"]) < len(categories)
+            else:
+                feature["fill"] = None
+
+            X_blocks.append(X)
+            features.append(feature)
+
+        for column, y in zip(columns_y, selected["y"]):
+            if categorical(column):
+                ct = ColumnTransformer(
+                    transformers=[('encoder', OneHotEncoder(), [0])],
+                    remainder='passthrough'
+                )
+                y = np.array(ct.fit_transform(y).toarray())
+
+            y_blocks.append(y)
+
+        return {"X": X_blocks, "y": y_blocks, "features": features, "index_blocks": selected["index_blocks"]}
+
+    def impute_missing(encoded):
+        X_blocks = list(encoded["X"])
+        y_blocks = list(encoded["y"])
+        features = [dict(feature) for feature in encoded["features"]]
+
+        strategy = config.get("missing_data")
+
+        if strategy:
+            # One-hot output has no NaNs left to fill (NaN becomes its own category)
+            for i, column in enumerate(columns_X):
+                if not categorical(column):
+                    X_blocks[i], features[i]["fill"] = impute(X_blocks[i], strategy, column_stats.get(column))
+
+            for i, column in enumerate(columns_y):
+                y_blocks[i], _ = impute(y_blocks[i], strategy, column_stats.get(column) if not categorical(column) else None)
+
+        # Design columns per target (one-hot targets span several), for
+        # per-target metrics
+        target_widths = np.array([block.shape[1] for block in y_blocks], dtype=np.int64)
+
+        return {"X": _hstack(X_blocks), "y": np.hstack(y_blocks), "features": features, "target_widths": target_widths, "index_blocks": encoded["index_blocks"]}
+
+    def split(prepared):
+        train, test = split_rows(prepared["X"].shape[0], config.get("test_size"))
+
+        return {"train": train, "test": test}
+
+    def scale(prepared, rows_split):
+        train = rows_split["train"]
+        sc_X, sc_y = fit_scalers(prepared["X"][train], prepared["y"][train])
+
+        return {"X": sc_X, "y": sc_y}
+
+    def fit(prepared, rows_split, scalers):
+        train = rows_split["train"]
+        X_train = scalers["X"].transform(prepared["X"][train])
+        y_train = scalers["y"].transform(prepared["y"][train])
+
+        # Native threads come out of this process's training budget, shared
+        # with every other training job in flight
+        with training_budget.reserve(config.get("algorithm")) as n_threads:
+            model = fit_model(config.get("algorithm"), X_train, y_train, n_threads)
+
+        return {"model": model, "features": prepared["features"]}
+
+    def evaluate(prepared, rows_split, scalers, fitted):
+        test = rows_split["test"]
+        X_test = scalers["X"].transform(prepared["X"][test])
+        y_test = scalers["y"].transform(prepared["y"][test])
+
+        y_pred = np.asarray(fitted["model"].predict(X_test)).reshape(y_test.shape)
+        metrics = score_predictions(y_test, y_pred)
+
+        if len(columns_y) > 1:
+            ends = np.cumsum(prepared["target_widths"])
+            metrics["per_target"] = {
+                column: score_predictions(y_test[:, end - width:end], y_pred[:, end - width:end])
+                for column, width, end in zip(columns_y, prepared["target_widths"], ends)
+            }
+
+        if not sample:
+            return {"metrics": metrics}
+
+        # Metrics of a sample are estimates; report how far off they may be
+        return {
+            "metrics": metrics,
+            "preview": {
+                "sampling": sample["method"],
+                "sample_size": sample["size"],
+                "test_rows": len(test),
+                "confidence": PREVIEW_CONFIDENCE,
+                "confidence_intervals": bootstrap_intervals(y_test, y_pred, groups=prepared["index_blocks"][test] if prepared.get("index_blocks") is not None else None)
+            }
+        }
+
+    graph.add("load", load, params={
+        "user_id": str(user_id),
+        "content_hash": getattr(data_set_meta, "content_hash", None),
+        "X": columns_X,
+        "y": columns_y,
+        "read_range": read_range,
+        "sample": sample,
+        "dtype": dtype
+    })
+    graph.add("select", select, ["load"], {"row_range": row_range}, cache=False)
+    graph.add("encode", encode, ["select"], {"sparse_cardinality_threshold": SPARSE_CARDINALITY_THRESHOLD}, cache=False)
+    graph.add("impute", impute_missing, ["encode"], {"missing_data": config.get("missing_data") or None, "full_range": full_range})
+    graph.add("split", split, ["impute"], {"test_size": config.get("test_size"), "random_state": 0})
+    graph.add("scale", scale, ["impute", "split"])
+    graph.add("fit", fit, ["impute", "split", "scale"], {"algorithm": config.get("algorithm")})
+    graph.add("evaluate", evaluate, ["impute", "split", "scale", "fit"], {
+        "bootstrap": (PREVIEW_BOOTSTRAP_RESAMPLES, PREVIEW_CONFIDENCE) if sample else None
+    })
+
+    return graph
 
-    X = df.iloc[rows[0]:rows[1]][[column_X]].values
-    y = df.iloc[rows[0]:rows[1]][[column_y]].values
+def prepare_data(flow, data_set_meta):
+    prepared = flow_stage_graph(flow, data_set_meta, None, cache=False).output("impute")
 
-    # Encoding (basic)
-    DTYPE_X = data_set_meta.column_schema.get(column_X)
-    DTYPE_y = data_set_meta.column_schema.get(column_y)
+    return prepared["X"], prepared["y"], as_columns(flow.config_json.get("data_range_X")), prepared["features"]
 
-    if DTYPE_X == "object":
-        ct = ColumnTransformer(
-            transformers=[('encoder', OneHotEncoder(), [0])],
-            remainder='passthrough'
-        )
-        X = np.array(ct.fit_transform(X).toarray())
+def encode_categorical(values, column_stats=None):
+    """One-hot encode a single categorical column.
 
-    if DTYPE_y == "object":
-        ct = ColumnTransformer(
-            transformers=[('encoder', OneHotEncoder(), [0])],
-            remainder='passthrough'
-        )
-        y = np.array(ct.fit_transform(y).toarray())
+    High-cardinality columns stay CSR: one nonzero per row instead of a dense
+    row per category. Cardinality comes from the upload-time stats, or from
+    the fitted encoder for datasets that predate them.
+    """
+    from sklearn.preprocessing import OneHotEncoder
 
-    # Missing data
-    if flow.config_json.get("missing_data"):
-        imputer = SimpleImputer(
-            missing_values=np.nan,
-            strategy=flow.config_json.get("missing_data")
-        )
-        X = imputer.fit_transform(X)
-        y = imputer.fit_transform(y)
+    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True)
+    encoded = encoder.fit_transform(values).tocsr()
+    categories = encoder.categories_[0].tolist()
 
-    return X, y, [column_X]
+    cardinality = (column_stats or {}).get("cardinality") or encoded.shape[1]
 
-def train_linear_regression(X, y, flow):
-    test_size = flow.config_json.get("test_size")
+    if cardinality >= SPARSE_CARDINALITY_THRESHOLD:
+        return encoded, categories
+
+    return encoded.toarray(), categories
+
+def impute(values, strategy, column_stats=None):
+    """Fill NaNs. Returns the values and the fill value, which inference
+    reuses for missing input (None when it isn't a single number)."""
+    from sklearn.impute import SimpleImputer
+
+    # Precomputed stats: the fill value is known, and only the NaN cells
+    # need touching (none when there are no nulls)
+    if column_stats and column_stats.get("count"):
+        fill = fill_value(column_stats, strategy)
+
+        if isinstance(fill, (int, float)):
+            values = values.astype(float)
+
+            if column_stats.get("null_count"):
+                values[np.isnan(values)] = fill
+
+            return values, float(fill)
+
+    imputer = SimpleImputer(
+        missing_values=np.nan,
+        strategy=strategy
+    )
+
+    values = imputer.fit_transform(values)
+    fill = imputer.statistics_
+
+    return values, float(fill[0]) if len(fill) == 1 else None
+
+def split_rows(n_rows, test_size):
+    """Train and test row positions, as train_test_split on the data itself would pick them."""
+    from sklearn.model_selection import train_test_split
 
     if test_size is None or not (0 < test_size <= 1):
         raise HTTPException(
@@ -135,54 +473,165 @@ def train_linear_regression(X, y, flow):
             detail="Invalid test_size"
         )
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=0
-    )
-
-    sc = StandardScaler()
+    return train_test_split(np.arange(n_rows), test_size=test_size, random_state=0)
+
+def fit_scalers(X_train, y_train):
+    from scipy.sparse import issparse
+    from sklearn.preprocessing import StandardScaler
+
+    # Centering would densify a sparse matrix, so it is only scaled
+    sc_X = StandardScaler(with_mean=not issparse(X_train)).fit(X_train)
+    sc_y = StandardScaler().fit(y_train)
+
+    return sc_X, sc_y
+
+def fit_model(algorithm, X_train, y_train, n_threads=1):
+    from scipy.sparse import issparse
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+    from sklearn.multioutput import MultiOutputRegressor
+
+    if algorithm == "Linear Regression":
+        model = LinearRegression()
+    elif algorithm == "Ridge Regression":
+        model = Ridge()
+    elif algorithm == "Random Forest":
+        model = RandomForestRegressor(random_state=0, n_jobs=n_threads)
+    elif algorithm == "Histogram Gradient Boosting":
+        # Densifying a high-cardinality one-hot matrix could exhaust memory
+        if issparse(X_train):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{algorithm} needs dense features; use a column with fewer than {SPARSE_CARDINALITY_THRESHOLD} categories"
+            )
+        model = HistGradientBoostingRegressor(random_state=0)
+
+        # It fits a single target; several get one booster each
+        if y_train.shape[1] > 1:
+            model = MultiOutputRegressor(model)
+    else:
+        raise HTTPException(400, "Unsupported algorithm")
 
-    X_train = sc.fit_transform(X_train)
-    X_test = sc.transform(X_test)
-    y_train = sc.fit_transform(y_train)
-    y_test = sc.transform(y_test)
+    # The tree ensembles want a 1-D target when there is a single one
+    if algorithm in ("Random Forest", "Histogram Gradient Boosting") and y_train.shape[1] == 1:
+        y_train = y_train.ravel()
 
-    model = LinearRegression()
     model.fit(X_train, y_train)
 
-    y_pred = model.predict(X_test)
+    # Predictions run on serving threads, one per request
+    if algorithm == "Random Forest":
+        model.set_params(n_jobs=None)
+
+    return model
+
+def score_predictions(y_test, y_pred):
+    """MAE, RMSE and R2, averaged over target columns. A metric that is not
+    defined for the test rows (R2 of a single row) is None, so that it can
+    be stored and returned as JSON."""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
     metrics = {
         "mae": mean_absolute_error(y_test, y_pred),
         "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
-        "r2": r2_score(y_test, y_pred)
+        "r2": r2_score(y_test, y_pred) if len(y_test) > 1 else np.nan
     }
 
-    return model, sc, metrics
+    return {name: float(value) if np.isfinite(value) else None for name, value in metrics.items()}
 
-def train_model(flow_name: str, user_id: str, db: Session):
-    flow = db.query(UserFlows).filter(
-        UserFlows.user_id == user_id,
-        UserFlows.flow_name == flow_name
-    ).first()
+def evaluate_model(model, X_test, y_test):
+    return score_predictions(y_test, np.asarray(model.predict(X_test)).reshape(np.shape(y_test)))
+
+def bootstrap_intervals(y_test, y_pred, groups=None, n_resamples=None, confidence=None, seed=0):
+    """Percentile bootstrap intervals for evaluate_model's metrics: the test
+    rows are resampled with replacement and every metric recomputed, in
+    batches of resamples at a time.
+
+    Rows sharing a `groups` label (the index block a sampled row was read
+    from) are drawn together, as a cluster bootstrap; without groups every
+    row is its own. A resample is a count per group, applied to the metrics
+    as row weights.
+    """
+    n_resamples = PREVIEW_BOOTSTRAP_RESAMPLES if n_resamples is None else n_resamples
+    confidence = PREVIEW_CONFIDENCE if confidence is None else confidence
+
+    y_test = np.asarray(y_test, dtype=np.float64).reshape(len(y_test), -1)
+    y_pred = np.asarray(y_pred, dtype=np.float64).reshape(len(y_test), -1)
+    n_rows, n_outputs = y_test.shape
+
+    groups = np.arange(n_rows) if groups is None else np.unique(groups, return_inverse=True)[1]
+    n_groups = int(groups.max()) + 1 if n_rows else 0
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, 4_000_000 // max(n_rows * n_outputs, 1))
+
+    errors = y_pred - y_test
+    samples = {"mae": [], "rmse": [], "r2": []}
+
+    for start in range(0, n_resamples if n_rows else 0, batch):
+        counts = rng.multinomial(n_groups, np.full(n_groups, 1 / n_groups), size=min(batch, n_resamples - start))
+
+        weights = counts[:, groups].astype(np.float64)[:, :, None]
+        total = weights.sum(axis=1)
+
+        # Averaged over outputs as sklearn's multioutput="uniform_average" does
+        sse = (weights * errors ** 2).sum(axis=1)
+        mean = (weights * y_test).sum(axis=1) / total
+        sst = (weights * (y_test - mean[:, None, :]) ** 2).sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r2 = np.where(sst > 0, 1 - sse / sst, np.nan)
+
+        samples["mae"].append((weights * np.abs(errors)).sum(axis=(1, 2)) / (total[:, 0] * n_outputs))
+        samples["rmse"].append(np.sqrt(sse.sum(axis=1) / (total[:, 0] * n_outputs)))
+        samples["r2"].append(r2.mean(axis=1))
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+
+    for metric, values in samples.items():
+        values = np.concatenate(values) if values else np.empty(0)
+        values = values[np.isfinite(values)]
+
+        intervals[metric] = [float(v) for v in np.percentile(values, [tail, 100 - tail])] if len(values) else None
+
+    return intervals
+
+def train_linear_regression(X, y, flow):
+    train, test = split_rows(X.shape[0], flow.config_json.get("test_size"))
+
+    sc_X, sc_y = fit_scalers(X[train], y[train])
+
+    model = fit_model("Linear Regression", sc_X.transform(X[train]), sc_y.transform(y[train]))
+    metrics = evaluate_model(model, sc_X.transform(X[test]), sc_y.transform(y[test]))
+
+    return model, sc_X, sc_y, metrics
+
+def train_model(flow_name: str, user_id: str, db: Session, sample=None):
+    flow = metadata_cache_service.get_flow(db, user_id, flow_name)
 
     if not flow:
         raise HTTPException(404, f"Flow '{flow_name}' not found")
 
-    data_set = db.query(DataSets).filter(
-        DataSets.dataset_name == flow.dataset_name
-    ).first()
+    data_set = metadata_cache_service.get_dataset(db, user_id, flow.dataset_name)
 
     if not data_set:
         raise HTTPException(404, f"Dataset '{flow.dataset_name}' not found")
 
-    # Step 1: preprocess
-    X, y, feature_order = prepare_data(flow, data_set)
+    # Step 1: run the flow's stages, reusing every cached stage whose
+    # inputs did not change since an earlier training
+    graph = flow_stage_graph(flow, data_set, user_id, sample=sample)
 
     # Step 2: train model
-    if flow.config_json.get('algorithm') == "Linear Regression":
-        model, sc, metrics = train_linear_regression(X, y, flow)
-    else:
-        raise HTTPException(400, "Unsupported algorithm")
+    evaluated = graph.output("evaluate")
+    metrics = evaluated["metrics"]
+    fitted = graph.output("fit")
+    scalers = graph.output("scale")
+
+    model = fitted["model"]
+    feature_order = as_columns(flow.config_json.get("data_range_X"))
+
+    # Raw feature values in, target values out
+    pipeline = InferencePipeline.from_fitted(fitted["features"], model, scalers["X"], scalers["y"])
 
     # Step 3: persist
     model_id = str(uuid.uuid4())
@@ -193,11 +642,15 @@ def train_model(flow_name: str, user_id: str, db: Session):
 
     bundle = {
         "model": model,
-        "scaling": sc,
+        "scaling": {"X": scalers["X"], "y": scalers["y"]},
+        "pipeline": pipeline,
         "feature_order": feature_order,
+        "target_order": as_columns(flow.config_json.get("data_range_y")),
         "metrics": metrics
     }
 
+    import joblib
+
     model_buffer = io.BytesIO()
 
     joblib.dump(bundle, model_buffer)
@@ -218,7 +671,8 @@ def train_model(flow_name: str, user_id: str, db: Session):
         user_id=user_id,
         model_type=flow.config_json.get('algorithm'),
         model_path=relative_file_loc,
-        metrics_json=metrics
+        metrics_json={**metrics, "confidence_intervals": evaluated["preview"]["confidence_intervals"]} if sample else metrics,
+        is_preview=bool(sample)
     )
 
     try:
@@ -232,7 +686,41 @@ def train_model(flow_name: str, user_id: str, db: Session):
             detail=f"Failed to save model: {str(e)}"
         )
 
-    return {
+    result = {
         "model_id": model_id,
-        "metrics": metrics
+        "metrics": metrics,
+        "stages": graph.report()
     }
+
+    if sample:
+        result["preview"] = evaluated["preview"]
+
+    return result
+
+def promote_preview(model_id: str, user_id: str, db: Session):
+    """Train the preview model's flow again on all of its rows."""
+    preview = db.query(TrainedModels).filter(
+        TrainedModels.user_id == user_id,
+        TrainedModels.id == model_id
+    ).first()
+
+    if not preview:
+        raise HTTPException(404, f"Model '{model_id}' not found.")
+
+    if not preview.is_preview:
+        raise HTTPException(400, f"Model '{model_id}' is not a preview model.")
+
+    flow = db.query(UserFlows).filter(
+        UserFlows.user_id == user_id,
+        UserFlows.id == preview.flow_id
+    ).first()
+
+    if not flow:
+        raise HTTPException(404, f"The flow of model '{model_id}' no longer exists.")
+
+    # The flow's current config; stages it shares with the preview (e.g.
+    # nothing but the sample differs) still come from the cache
+    result = train_model(flow.flow_name, user_id, db)
+    result["promoted_from"] = model_id
+
+    return result
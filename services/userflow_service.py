@@ -1,5 +1,8 @@
+import copy
+
 from fastapi import HTTPException
 from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -7,17 +10,24 @@ from models.datasets import DataSets
 from models.user_flow import UserFlows
 
 from schemas.config_schema import ConfigSchema
-
-
-def get_by_flowname(flow_name: str, db: Session, user_id: str):
-    flow = (
-        db.query(UserFlows)
-        .filter(
+from services import metadata_cache_service
+from services.flow_validation_service import validate_flow_config, validation_error
+from services.pagination_service import DEFAULT_PAGE_SIZE, keyset_page, page_response, timestamp_bound
+
+
+async def get_by_flowname(flow_name: str, adb, user_id: str):
+    result = await adb.execute(
+        select(
+            UserFlows.id,
+            UserFlows.flow_name,
+            UserFlows.config_json,
+            UserFlows.created_at
+        ).where(
             UserFlows.user_id == user_id,
             UserFlows.flow_name == flow_name
         )
-        .first()
     )
+    flow = result.first()
 
     if not flow:
         raise HTTPException(
@@ -32,23 +42,32 @@ def get_by_flowname(flow_name: str, db: Session, user_id: str):
         "created_at": flow.created_at
     }
 
-def get_userflows(db: Session, user_id: str):
-    flows = (
-        db.query(UserFlows)
-        .filter(
-            UserFlows.user_id == user_id
-        ).all()
+async def get_userflows(adb, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, dataset_name: str = None, created_after=None, created_before=None):
+    # Only the listed columns are selected; config_json stays in the database
+    query = select(UserFlows.id, UserFlows.flow_name, UserFlows.dataset_name, UserFlows.created_at).where(
+        UserFlows.user_id == user_id
     )
 
-    if not flows:
-        return []
+    if dataset_name:
+        query = query.where(UserFlows.dataset_name == dataset_name)
+
+    if created_after:
+        query = query.where(UserFlows.created_at >= timestamp_bound(created_after))
 
-    flow_list = []
+    if created_before:
+        query = query.where(UserFlows.created_at < timestamp_bound(created_before))
 
-    for flow in flows:
-        flow_list.append({flow.flow_name, flow.created_at})
+    result = await adb.execute(keyset_page(query, UserFlows.created_at, UserFlows.id, cursor, limit))
 
-    return flow_list
+    return page_response(
+        result.all(), limit,
+        lambda flow: {
+            "flow_name": flow.flow_name,
+            "dataset_name": flow.dataset_name,
+            "created_at": flow.created_at
+        },
+        "created_at", "id"
+    )
 
 def create_userflow(user_flow, db: Session, user_id: str):
     dataset = (
@@ -69,6 +88,15 @@ def create_userflow(user_flow, db: Session, user_id: str):
     flow_data = user_flow.model_dump()
     flow_data.pop("dataset_name", None)
 
+    # Fail fast against the stored schema instead of at training time
+    errors = validate_flow_config(flow_data["config_json"], dataset)
+
+    if errors:
+        raise HTTPException(
+            status_code=400,
+            detail=errors
+        )
+
     db_user_flow = UserFlows(
         user_id=user_id,
         dataset_id=dataset.id,
@@ -82,6 +110,8 @@ def create_userflow(user_flow, db: Session, user_id: str):
         db.commit()
         db.refresh(db_user_flow)
 
+        metadata_cache_service.invalidate_flow(user_id, user_flow.flow_name)
+
         return {
             "id": db_user_flow.id,
             "flow_name": db_user_flow.flow_name,
@@ -132,6 +162,8 @@ def delete_userflow_by_name(flow_name: str, db: Session, user_id: str):
             detail="Failed to delete flow"
         )
 
+    metadata_cache_service.invalidate_flow(user_id, flow_name)
+
     return {"detail": "Flow deleted"}
 
 def deep_merge(old: dict, new: dict):
@@ -170,6 +202,17 @@ def update_userflow(flow_name: str, updates, db: Session, user_id: str):
                 detail=e.errors()
             )
 
+        dataset = metadata_cache_service.get_dataset(db, user_id, flow.dataset_name)
+
+        if dataset:
+            errors = validate_flow_config(merged_config, dataset)
+
+            if errors:
+                raise HTTPException(
+                    status_code=400,
+                    detail=errors
+                )
+
         flow.config_json = merged_config
 
     try:
@@ -182,6 +225,12 @@ def update_userflow(flow_name: str, updates, db: Session, user_id: str):
             detail="Failed to update flow"
         )
 
+    # After the commit, so a concurrent lookup cannot cache the old row again
+    metadata_cache_service.invalidate_flow(user_id, flow_name)
+
+    if updates.flow_name is not None:
+        metadata_cache_service.invalidate_flow(user_id, updates.flow_name)
+
     return {
         "message": "Flow updated",
         "updated_flow": {
@@ -190,4 +239,76 @@ def update_userflow(flow_name: str, updates, db: Session, user_id: str):
             "config_json": flow.config_json,
             "created_at": flow.created_at
         }
+    }
+
+def validate_flows(items, db: Session, user_id: str):
+    """Dry-run validation of many flows with two queries and no storage access.
+
+    Each item is either a proposed flow (dataset_name + config_json), a stored
+    flow (flow_name), or a proposed update to a stored flow (flow_name +
+    config_json, merged over the stored config).
+    """
+    flow_names = {item.flow_name for item in items if item.flow_name}
+    stored_flows = {}
+
+    if flow_names:
+        rows = db.execute(
+            select(UserFlows.flow_name, UserFlows.dataset_name, UserFlows.config_json).where(
+                UserFlows.user_id == user_id,
+                UserFlows.flow_name.in_(flow_names)
+            )
+        ).all()
+        stored_flows = {row.flow_name: row for row in rows}
+
+    # 1. Resolve each item to (dataset_name, config)
+    resolved = []
+
+    for item in items:
+        stored = stored_flows.get(item.flow_name)
+        dataset_name = item.dataset_name or (stored.dataset_name if stored else None)
+        config = item.config_json
+
+        if stored is not None and not item.dataset_name:
+            config = deep_merge(copy.deepcopy(stored.config_json or {}), config or {})
+
+        resolved.append((item, dataset_name, config, stored))
+
+    # 2. One query for every dataset involved
+    dataset_names = {dataset_name for _, dataset_name, _, _ in resolved if dataset_name}
+    datasets = {}
+
+    if dataset_names:
+        rows = db.execute(
+            select(DataSets.dataset_name, DataSets.column_schema, DataSets.column_stats, DataSets.row_count).where(
+                DataSets.user_id == user_id,
+                DataSets.dataset_name.in_(dataset_names)
+            )
+        ).all()
+        datasets = {row.dataset_name: row for row in rows}
+
+    # 3. Validate
+    results = []
+
+    for item, dataset_name, config, stored in resolved:
+        if item.flow_name and stored is None and not item.dataset_name:
+            errors = [validation_error("flow_name", f"Flow '{item.flow_name}' not found")]
+        elif not dataset_name:
+            errors = [validation_error("dataset_name", "dataset_name is required for a new flow")]
+        elif dataset_name not in datasets:
+            errors = [validation_error("dataset_name", f"Dataset '{dataset_name}' not found")]
+        elif config is None:
+            errors = [validation_error("config_json", "config_json is required for a new flow")]
+        else:
+            errors = validate_flow_config(config, datasets[dataset_name])
+
+        results.append({
+            "flow_name": item.flow_name,
+            "dataset_name": dataset_name,
+            "valid": not errors,
+            "errors": errors
+        })
+
+    return {
+        "valid": all(result["valid"] for result in results),
+        "results": results
     }
\ No newline at end of file
@@ -1,7 +1,21 @@
+import os
+import tempfile
+
+# Run the suite in embedded mode (SQLite + local storage) unless the
+# environment already points it at a server deployment.
+_test_dir = tempfile.mkdtemp(prefix="model_server_tests_")
+os.environ.setdefault("DEPLOYMENT_MODE", "embedded")
+os.environ.setdefault("EMBEDDED_DB_PATH", os.path.join(_test_dir, "test.db"))
+os.environ.setdefault("LOCAL_STORAGE_ROOT", os.path.join(_test_dir, "bucket"))
+os.environ.setdefault("FEATURE_STORE_DIR", os.path.join(_test_dir, "features"))
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
 import pytest
 from fastapi.testclient import TestClient
 from main import app
 
 @pytest.fixture
 def client():
-    return TestClient(app)
\ No newline at end of file
+    # Entering the client runs the lifespan hook, which applies migrations
+    with TestClient(app) as client:
+        yield client
\ No newline at end of file
@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Feature1,Target\n" + "".join(f"{i},{3 * i + 2}\n" for i in range(200))
+
+
+@pytest.mark.parametrize("algorithm", ["Ridge Regression", "Random Forest", "Histogram Gradient Boosting"])
+def test_train_and_predict_with_parallel_algorithms(client, algorithm):
+    dataset_name = "algorithm_" + algorithm.lower().replace(" ", "_")
+
+    # -------------------------
+    # 1. Upload dataset and create flow
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": dataset_name, "description": "algorithm test"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    flow_payload = {
+        "flow_name": dataset_name + "_flow",
+        "dataset_name": dataset_name,
+        "config_json": {
+            "algorithm": algorithm,
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "row_range": [0, 200],
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Train
+    # -------------------------
+    response = client.post(f"/train/{dataset_name}_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+    assert response.json()["metrics"]["r2"] > 0.8
+
+    model_id = response.json()["model_id"]
+
+    # -------------------------
+    # 3. Predict in target units
+    # -------------------------
+    response = client.post(f"/predict/{model_id}", json=[{"Feature1": 100}], headers=API_KEY)
+
+    assert response.status_code == 200
+    assert abs(response.json()["prediction"][0][0] - 302) < 15
\ No newline at end of file
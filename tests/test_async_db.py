@@ -0,0 +1,101 @@
+import asyncio
+import io
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import database
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Feature1,Target\n1,3\n2,5\n3,7\n"
+
+POOL_FIELDS = {"pool_size", "max_overflow", "checked_out", "checked_in", "overflow", "utilization"}
+
+
+@pytest.fixture(params=[False, True], ids=["threaded", "async"])
+def db_async(request, monkeypatch):
+    """Serve get_async_db from the threaded sync session, or from an async
+    engine built the way database.py builds it under DB_ASYNC=true."""
+    if not request.param:
+        monkeypatch.setattr(database, "async_engine", None)
+        monkeypatch.setattr(database, "AsyncSessionLocal", None)
+        yield False
+        return
+
+    async_engine = create_async_engine(database.ASYNC_URL_DATABASE, **database.POOL_OPTIONS)
+    event.listen(async_engine.sync_engine, "connect", database._set_sqlite_pragmas)
+
+    monkeypatch.setattr(database, "DB_ASYNC", True)
+    monkeypatch.setattr(database, "async_engine", async_engine)
+    monkeypatch.setattr(
+        database, "AsyncSessionLocal",
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    )
+
+    yield True
+
+    asyncio.run(async_engine.dispose())
+
+
+def test_read_endpoint_under_both_sessions(client, db_async):
+    dataset_name = f"async_db_{'async' if db_async else 'threaded'}"
+
+    # -------------------------
+    # 1. Upload through the sync session
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": dataset_name, "description": "async db"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Read it back through get_async_db
+    # -------------------------
+    seen = []
+
+    async def spy():
+        async for session in database.get_async_db():
+            seen.append(session)
+            yield session
+
+    from main import app
+
+    app.dependency_overrides[database.get_async_db] = spy
+
+    try:
+        response = client.get(f"/datasets/{dataset_name}", headers=API_KEY)
+    finally:
+        app.dependency_overrides.pop(database.get_async_db)
+
+    assert response.status_code == 200
+    assert response.json()["dataset_name"] == dataset_name
+    assert isinstance(seen[0], AsyncSession if db_async else database.ThreadedSession)
+
+    response = client.get("/datasets/fake-dataset", headers=API_KEY)
+
+    assert response.status_code == 404
+
+    # -------------------------
+    # 3. The pool report covers the async pool only when it exists
+    # -------------------------
+    response = client.get("/metrics/db_pool", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    pools = response.json()
+
+    assert set(pools) == ({"sync", "async"} if db_async else {"sync"})
+
+    for stats in pools.values():
+        assert set(stats) == POOL_FIELDS
+        assert stats["pool_size"] == database.DB_POOL_SIZE
+        assert stats["max_overflow"] == database.DB_MAX_OVERFLOW
+        # Nothing is in flight between requests
+        assert stats["checked_out"] == 0
+        assert stats["overflow"] <= 0
@@ -0,0 +1,101 @@
+import io
+
+import pandas as pd
+
+from services import batch_service
+from services.storage_service import get_file
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Feature1,Target\n" + "".join(f"{i},{2 * i + 1}\n" for i in range(30))
+
+
+def test_batch_scoring_writes_every_row(client, monkeypatch):
+    # Several chunks, so the output header must be written exactly once
+    monkeypatch.setattr(batch_service, "BATCH_CHUNK_ROWS", 7)
+    # ...and the output is uploaded in several parts
+    monkeypatch.setattr(batch_service, "BATCH_PART_SIZE", 64)
+
+    # -------------------------
+    # 1. Upload dataset, create flow and train
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "batch_dataset", "description": "batch scoring"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    flow_payload = {
+        "flow_name": "batch_flow",
+        "dataset_name": "batch_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "test_size": 0.2
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post("/train/batch_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    model_id = response.json()["model_id"]
+
+    # -------------------------
+    # 2. Start the job; it runs once the response is sent
+    # -------------------------
+    response = client.post(
+        "/predict/batch",
+        json={"dataset_name": "batch_dataset", "model_id": model_id},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 202
+
+    job_id = response.json()["job_id"]
+
+    response = client.get(f"/predict/batch/{job_id}", headers=API_KEY)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert response.json()["rows_processed"] == 30
+
+    # -------------------------
+    # 3. The output holds every input row plus its prediction
+    # -------------------------
+    scored = pd.read_csv(get_file(f"1/predictions/batch_{job_id}.csv"))
+
+    assert len(scored) == 30
+    assert list(scored.columns) == ["Feature1", "Target", "prediction"]
+    assert (scored["prediction"] - scored["Target"]).abs().max() < 1e-6
+
+    # -------------------------
+    # 4. Local storage has no URL of its own; the API serves the file
+    # -------------------------
+    download_url = client.get(f"/predict/batch/{job_id}", headers=API_KEY).json()["download_url"]
+
+    assert download_url == f"/predict/batch/{job_id}/download"
+
+    response = client.get(download_url, headers=API_KEY)
+
+    assert response.status_code == 200
+    assert response.content == get_file(f"1/predictions/batch_{job_id}.csv").read()
+
+
+def test_batch_scoring_unknown_model(client):
+
+    response = client.post(
+        "/predict/batch",
+        json={"dataset_name": "batch_dataset", "model_id": "does-not-exist"},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 404
\ No newline at end of file
@@ -0,0 +1,127 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+
+def train_flow(client, name, n_rows, test_size):
+    csv_data = "Feature1,Target\n" + "".join(f"{i},{2 * i + (i % 2)}\n" for i in range(n_rows))
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": name, "description": "compare metrics"},
+        files={"file": ("dummy.csv", io.BytesIO(csv_data.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    flow_payload = {
+        "flow_name": name + "_flow",
+        "dataset_name": name,
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "test_size": test_size
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post(f"/train/{name}_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    return response.json()
+
+
+def test_compare_models_with_undefined_r2(client):
+
+    # -------------------------
+    # 1. A single test row leaves R2 undefined
+    # -------------------------
+    single_row = train_flow(client, "compare_single_row", 5, 0.2)
+    regular = train_flow(client, "compare_regular", 40, 0.25)
+
+    assert single_row["metrics"]["r2"] is None
+
+    # -------------------------
+    # 2. The undefined metric loses the comparison
+    # -------------------------
+    response = client.post(
+        "/metrics/",
+        json={"model_ida": single_row["model_id"], "model_idb": regular["model_id"]},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 201
+    assert response.json()["metric_winners"]["r2"] == regular["model_id"]
+
+
+def test_evaluate_on_constant_target(client):
+
+    # -------------------------
+    # 1. Train, then evaluate on a dataset whose target never changes
+    # -------------------------
+    model = train_flow(client, "evaluate_source", 40, 0.25)
+
+    csv_data = "Feature1,Target\n" + "".join(f"{i},7\n" for i in range(10))
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "evaluate_constant", "description": "constant target"},
+        files={"file": ("dummy.csv", io.BytesIO(csv_data.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. R2 is undefined there, and comes back as null
+    # -------------------------
+    response = client.post(
+        "/metrics/evaluate",
+        json={"dataset_name": "evaluate_constant", "model_ids": [model["model_id"]]},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    metrics = response.json()["models"][0]["metrics"]
+
+    assert metrics["r2"] is None
+    assert metrics["mae"] > 0
+
+def test_compare_tied_models_has_no_winner(client):
+
+    # -------------------------
+    # 1. Training the same flow twice gives identical metrics
+    # -------------------------
+    first = train_flow(client, "compare_tie", 40, 0.25)
+
+    response = client.post("/train/compare_tie_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    second = response.json()
+
+    assert first["metrics"] == second["metrics"]
+
+    # -------------------------
+    # 2. Every metric is tied: no winner, no points, no better model
+    # -------------------------
+    response = client.post(
+        "/metrics/",
+        json={"model_ida": first["model_id"], "model_idb": second["model_id"]},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 201
+
+    comparison = response.json()
+
+    assert comparison["metric_winners"] == {"mae": None, "rmse": None, "r2": None}
+    assert comparison["score"] == {first["model_id"]: 0, second["model_id"]: 0}
+    assert comparison["better_model"] is None
@@ -0,0 +1,63 @@
+import io
+
+import pandas as pd
+import pytest
+
+from services import csv_service
+
+# Every third value empty, a date column pandas leaves as text, and columns
+# whose inferred type differs between the first and last rows
+CSV_DATA = "Feature1,Label,Day,Late,Target\n" + "".join(
+    f"{'' if i % 3 == 0 else i},{'' if i % 4 == 0 else f'label_{i % 5}'},2026-01-{i % 28 + 1:02d},"
+    f"{i if i < 150 else ''},{2 * i + 1}\n"
+    for i in range(200)
+)
+
+MIXED_CSV = "Code,Target\n" + "".join(f"{i if i < 150 else f'code_{i}'},{i}\n" for i in range(200))
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    # Split into several chunks whatever the machine's core count
+    monkeypatch.setattr(csv_service, "CSV_PARSE_ENGINE", "chunks")
+    monkeypatch.setattr(csv_service, "CSV_PARSE_WORKERS", 3)
+    monkeypatch.setattr(csv_service, "CSV_PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(csv_service, "_pool", None)
+
+    yield
+
+    if csv_service._pool is not None:
+        csv_service._pool.shutdown()
+
+
+def test_parallel_read_matches_pandas(parallel, tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(CSV_DATA)
+
+    expected = pd.read_csv(path)
+
+    # -------------------------
+    # 1. From a BytesIO and from a file (read through an mmap)
+    # -------------------------
+    pd.testing.assert_frame_equal(csv_service.read_csv(io.BytesIO(CSV_DATA.encode())), expected)
+
+    with open(path, "rb") as file:
+        pd.testing.assert_frame_equal(csv_service.read_csv(file), expected)
+
+    # -------------------------
+    # 2. Selected columns with a dtype plan
+    # -------------------------
+    df = csv_service.read_csv(io.BytesIO(CSV_DATA.encode()), usecols=["Label", "Target"], dtype={"Label": "category", "Target": "int32"})
+
+    assert str(df["Label"].dtype) == "category"
+    assert str(df["Target"].dtype) == "int32"
+    assert (df["Target"] == expected["Target"]).all()
+    assert df["Label"].isna().sum() == expected["Label"].isna().sum()
+
+
+def test_parallel_read_falls_back_when_chunks_disagree(parallel):
+
+    # Numbers at the top, text at the bottom: only a single parse types it right
+    expected = pd.read_csv(io.StringIO(MIXED_CSV))
+
+    pd.testing.assert_frame_equal(csv_service.read_csv(io.BytesIO(MIXED_CSV.encode())), expected)
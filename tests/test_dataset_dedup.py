@@ -0,0 +1,165 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = """Feature1,Feature2,Target
+4,1,11
+5,2,21
+6,3,31
+7,5,42
+8,4,49
+9,6,62
+"""
+
+
+def upload(client, dataset_name):
+    return client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": dataset_name, "description": "dedup test"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+
+def test_identical_uploads_share_one_blob(client):
+
+    # -------------------------
+    # 1. Same bytes under two names
+    # -------------------------
+    first = upload(client, "dedup_first")
+    second = upload(client, "dedup_second")
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert first.json()["content_hash"] == second.json()["content_hash"]
+
+    # -------------------------
+    # 2. Dropping one reference keeps the shared file
+    # -------------------------
+    response = client.delete("/datasets/dedup_first", headers=API_KEY)
+
+    assert response.status_code == 204
+
+    flow_payload = {
+        "flow_name": "dedup_flow",
+        "dataset_name": "dedup_second",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "row_range": [0, 6],
+            "test_size": 0.5
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post("/train/dedup_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    # -------------------------
+    # 3. A dataset bound to a flow cannot be deleted
+    # -------------------------
+    response = client.delete("/datasets/dedup_second", headers=API_KEY)
+
+    assert response.status_code == 400
+
+def test_upload_losing_the_blob_race_shares_the_winner(client, monkeypatch):
+    from database import SessionLocal
+    from models.dataset_blobs import DatasetBlobs
+    from models.datasets import DataSets
+    from services import datasets_service
+    from services.storage_service import get_file
+
+    content = CSV_DATA + "10,7,70\n"
+    real_upload = datasets_service.upload_file
+
+    # -------------------------
+    # 1. Another upload of the same bytes registers its blob while ours is uploading
+    # -------------------------
+    def racing_upload(file, path):
+        real_upload(io.BytesIO(content.encode()), "1/blobs/winner.csv")
+
+        db = SessionLocal()
+        db.add(DatasetBlobs(user_id=1, content_hash=path.split("/")[2], storage_path="1/blobs/winner.csv", ref_count=1))
+        db.commit()
+        db.close()
+
+        real_upload(file, path)
+
+    monkeypatch.setattr(datasets_service, "upload_file", racing_upload)
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "dedup_race", "description": "dedup test"},
+        files={"file": ("dummy.csv", io.BytesIO(content.encode()), "text/csv")}
+    )
+
+    # -------------------------
+    # 2. Not reported as a duplicate name: the dataset shares the winner's blob
+    # -------------------------
+    assert response.status_code == 201
+
+    db = SessionLocal()
+    dataset = db.query(DataSets).filter(DataSets.dataset_name == "dedup_race").one()
+    blob = db.query(DatasetBlobs).filter(DatasetBlobs.content_hash == dataset.content_hash).one()
+    db.close()
+
+    assert dataset.storage_path == "1/blobs/winner.csv"
+    assert blob.ref_count == 2
+    assert get_file(dataset.storage_path).read() == content.encode()
+
+
+def test_reupload_after_delete_gets_its_own_file(client):
+    from services.storage_service import get_file
+
+    # -------------------------
+    # 1. Upload, delete the only reference, upload the same bytes again
+    # -------------------------
+    content = CSV_DATA + "11,8,80\n"
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "dedup_reupload", "description": "dedup test"},
+        files={"file": ("dummy.csv", io.BytesIO(content.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    first_path = _storage_path("dedup_reupload")
+
+    assert client.delete("/datasets/dedup_reupload", headers=API_KEY).status_code == 204
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "dedup_reupload", "description": "dedup test"},
+        files={"file": ("dummy.csv", io.BytesIO(content.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. The new blob never shares the deleted blob's key
+    # -------------------------
+    second_path = _storage_path("dedup_reupload")
+
+    assert second_path != first_path
+    assert get_file(second_path).read() == content.encode()
+
+
+def _storage_path(dataset_name):
+    from database import SessionLocal
+    from models.datasets import DataSets
+
+    db = SessionLocal()
+
+    try:
+        return db.query(DataSets.storage_path).filter(DataSets.dataset_name == dataset_name).scalar()
+    finally:
+        db.close()
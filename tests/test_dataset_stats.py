@@ -0,0 +1,41 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+
+def test_dataset_exposes_column_stats(client):
+
+    # -------------------------
+    # 1. Upload dataset with a missing value
+    # -------------------------
+    csv_data = """Feature1,Category,Target
+1,A,10
+2,B,20
+,A,30
+4,A,40
+"""
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "stats_dataset", "description": "column stats"},
+        files={"file": ("dummy.csv", io.BytesIO(csv_data.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Stats are stored with the dataset
+    # -------------------------
+    response = client.get("/datasets/stats_dataset", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    stats = response.json()["column_stats"]
+
+    assert stats["Feature1"]["count"] == 3
+    assert stats["Feature1"]["null_count"] == 1
+    assert stats["Feature1"]["mean"] == 7 / 3
+    assert stats["Category"]["cardinality"] == 2
+    assert stats["Category"]["most_frequent"] == "A"
+    assert "mean" not in stats["Category"]
\ No newline at end of file
@@ -0,0 +1,206 @@
+import io
+
+import pandas as pd
+
+from services import dtype_service
+from services.dataset_stats_service import compute_column_stats
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Small,Wide,Ratio,Whole,Huge,Color,Label,Target\n" + "".join(
+    f"{i % 100},{i * 1000},{i / 8},{float(i)},{2.0 ** 25 + i},{['red', 'blue'][i % 2]},label_{i},{2 * i + 1}\n" for i in range(200)
+)
+
+# A float feature and a target around 1.2e8 with cents: float32 cannot hold it
+LARGE_CSV = "Feature1,Revenue\n" + "".join(
+    f"{i * 0.37 + (i % 7) * 0.011:.3f},{120_000_000 + i * 1234.56 + (i % 5) * 0.07:.2f}\n" for i in range(300)
+)
+
+
+def stored_metadata(csv_data):
+    df = pd.read_csv(io.StringIO(csv_data))
+    schema = {column: str(dtype) for column, dtype in df.dtypes.items()}
+
+    return df, schema, compute_column_stats(df)
+
+
+def test_plan_narrows_each_column_from_its_stats():
+    _, schema, stats = stored_metadata(CSV_DATA)
+
+    plan = dtype_service.plan_dtypes(schema, stats)
+
+    # -------------------------
+    # 1. Integers shrink to their range; floats stay float64 by default
+    # -------------------------
+    assert plan["Small"] == "int8"
+    assert plan["Wide"] == "int32"
+    assert "Ratio" not in plan
+    assert "Whole" not in plan
+
+    # -------------------------
+    # 2. Repetitive text is a category; unique text is a string or inferred
+    # -------------------------
+    assert plan["Color"] == "category"
+
+    if dtype_service.arrow_string_dtype():
+        assert plan["Label"] == dtype_service.arrow_string_dtype()
+    else:
+        assert "Label" not in plan
+
+
+def test_floats_narrow_only_when_exact(monkeypatch):
+    _, schema, stats = stored_metadata(CSV_DATA)
+
+    monkeypatch.setattr(dtype_service, "DTYPE_DOWNCAST_FLOATS", True)
+
+    plan = dtype_service.plan_dtypes(schema, stats, targets=["Target"])
+
+    # Whole numbers below 2**24 round-trip; fractions and larger values may not
+    assert plan["Whole"] == "float32"
+    assert "Ratio" not in plan
+    assert "Huge" not in plan
+
+    # Targets are never narrowed
+    assert "Target" not in plan
+    assert "Whole" not in dtype_service.plan_dtypes(schema, stats, targets=["Whole"])
+
+
+def test_plan_can_be_turned_off(monkeypatch):
+    _, schema, stats = stored_metadata(CSV_DATA)
+
+    monkeypatch.setattr(dtype_service, "DTYPE_OPTIMIZE", False)
+
+    assert dtype_service.plan_dtypes(schema, stats) == {}
+
+
+def test_optimized_read_keeps_the_values():
+    df, schema, stats = stored_metadata(CSV_DATA)
+
+    # -------------------------
+    # 1. Only the requested columns, read with the plan
+    # -------------------------
+    optimized = dtype_service.read_csv_optimized(io.BytesIO(CSV_DATA.encode()), schema, stats, usecols=["Small", "Ratio", "Color"])
+
+    assert list(optimized.columns) == ["Small", "Ratio", "Color"]
+    assert str(optimized["Ratio"].dtype) == "float64"
+    assert str(optimized["Small"].dtype) == "int8"
+    assert str(optimized["Color"].dtype) == "category"
+
+    # -------------------------
+    # 2. Same values as the default parse, and less memory
+    # -------------------------
+    assert (optimized["Small"] == df["Small"]).all()
+    assert (optimized["Ratio"] == df["Ratio"]).all()
+    assert (optimized["Color"].astype(str) == df["Color"]).all()
+
+    report = dtype_service.memory_report(df, dtype_service.plan_dtypes(schema, stats))
+
+    assert report["optimized_bytes"] < report["bytes"]
+    assert report["columns"]["Small"]["optimized_dtype"] == "int8"
+
+
+def test_training_on_planned_dtypes(client):
+
+    # -------------------------
+    # 1. The upload reports what the plan saves
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "dtype_dataset", "description": "dtype plan"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    report = response.json()["memory_report"]
+
+    assert report["optimized_bytes"] < report["bytes"]
+
+    # -------------------------
+    # 2. A model fitted on the narrowed columns still fits exactly
+    # -------------------------
+    flow_payload = {
+        "flow_name": "dtype_flow",
+        "dataset_name": "dtype_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Wide",
+            "data_range_y": "Target",
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post("/train/dtype_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    model_id = response.json()["model_id"]
+
+    response = client.post(f"/predict/{model_id}", json=[{"Wide": 500000}], headers=API_KEY)
+
+    assert response.status_code == 200
+    assert abs(response.json()["prediction"][0][0] - 1001) < 1e-6
+
+
+def test_planned_training_matches_float64_path(client, monkeypatch):
+
+    # -------------------------
+    # 1. Upload a float feature with a large-magnitude float target
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "dtype_large_dataset", "description": "dtype parity"},
+        files={"file": ("dummy.csv", io.BytesIO(LARGE_CSV.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Train with every narrowing on, then on the plain float64 path
+    # -------------------------
+    results = []
+
+    for flow_name, optimize in (("dtype_planned_flow", True), ("dtype_float64_flow", False)):
+        monkeypatch.setattr(dtype_service, "DTYPE_OPTIMIZE", optimize)
+        monkeypatch.setattr(dtype_service, "DTYPE_DOWNCAST_FLOATS", optimize)
+
+        flow_payload = {
+            "flow_name": flow_name,
+            "dataset_name": "dtype_large_dataset",
+            "config_json": {
+                "algorithm": "Linear Regression",
+                "data_range_X": "Feature1",
+                "data_range_y": "Revenue",
+                "test_size": 0.25
+            }
+        }
+
+        assert client.post("/user_flows/", json=flow_payload, headers=API_KEY).status_code == 201
+
+        response = client.post(f"/train/{flow_name}", headers=API_KEY)
+
+        assert response.status_code == 200
+
+        model_id = response.json()["model_id"]
+        prediction = client.post(f"/predict/{model_id}", json=[{"Feature1": 1.5}, {"Feature1": 99.123}], headers=API_KEY)
+
+        assert prediction.status_code == 200
+
+        results.append((response.json()["metrics"], prediction.json()["prediction"]))
+
+    # -------------------------
+    # 3. Same model either way
+    # -------------------------
+    (planned_metrics, planned_prediction), (base_metrics, base_prediction) = results
+
+    for metric, value in base_metrics.items():
+        assert abs(planned_metrics[metric] - value) <= 1e-9 * max(abs(value), 1.0), metric
+
+    for planned, base in zip(planned_prediction, base_prediction):
+        assert abs(planned[0] - base[0]) <= 1e-9 * abs(base[0])
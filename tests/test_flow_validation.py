@@ -0,0 +1,72 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+
+def test_bulk_flow_validation(client):
+
+    # -------------------------
+    # 1. Upload dataset
+    # -------------------------
+    csv_data = """Feature1,Category,Target
+1,A,10
+2,B,20
+3,A,30
+4,B,40
+"""
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "validation_dataset", "description": "flow validation"},
+        files={"file": ("dummy.csv", io.BytesIO(csv_data.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Dry-run several configs at once
+    # -------------------------
+    valid_config = {
+        "algorithm": "Linear Regression",
+        "data_range_X": "Feature1",
+        "data_range_y": "Target",
+        "row_range": [0, 4],
+        "test_size": 0.5
+    }
+
+    response = client.post(
+        "/user_flows/validate",
+        headers=API_KEY,
+        json={"flows": [
+            {"dataset_name": "validation_dataset", "config_json": valid_config},
+            {"dataset_name": "validation_dataset", "config_json": {**valid_config, "row_range": [0, 10]}},
+            {"dataset_name": "validation_dataset", "config_json": {**valid_config, "data_range_y": "Category"}},
+            {"flow_name": "no_such_flow"}
+        ]}
+    )
+
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+
+    assert response.json()["valid"] is False
+    assert results[0]["valid"] is True
+    assert results[1]["errors"][0]["field"] == "row_range"
+    assert results[2]["errors"][0]["field"] == "data_range_y"
+    assert results[3]["errors"][0]["field"] == "flow_name"
+
+    # -------------------------
+    # 3. The same checks run on create
+    # -------------------------
+    response = client.post(
+        "/user_flows/",
+        headers=API_KEY,
+        json={
+            "flow_name": "out_of_range_flow",
+            "dataset_name": "validation_dataset",
+            "config_json": {**valid_config, "row_range": [0, 10]}
+        }
+    )
+
+    assert response.status_code == 400
\ No newline at end of file
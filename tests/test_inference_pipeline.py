@@ -0,0 +1,99 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = """Feature1,Color,Target
+1,red,5
+2,blue,7
+3,red,9
+4,green,11
+5,blue,13
+6,red,15
+7,green,17
+8,blue,19
+,red,21
+"""
+
+
+def train(client, flow_name, column_X, **config):
+    flow_payload = {
+        "flow_name": flow_name,
+        "dataset_name": "pipeline_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": column_X,
+            "data_range_y": "Target",
+            "row_range": [0, 8],
+            "test_size": 0.25,
+            **config
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post(f"/train/{flow_name}", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    return response.json()["model_id"]
+
+
+def test_predictions_apply_training_preprocessing(client):
+
+    # -------------------------
+    # 1. Upload dataset and train on a numeric and a categorical feature
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "pipeline_dataset", "description": "pipeline test"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    numeric_model = train(client, "pipeline_numeric_flow", "Feature1", missing_data="mean")
+    categorical_model = train(client, "pipeline_categorical_flow", "Color")
+
+    # -------------------------
+    # 2. Raw inputs give predictions in target units
+    # -------------------------
+    response = client.post(f"/predict/{numeric_model}", json=[{"Feature1": 10}, {"Feature1": 0.5}], headers=API_KEY)
+
+    assert response.status_code == 200
+
+    prediction = response.json()["prediction"]
+
+    assert abs(prediction[0][0] - 23) < 1e-6
+    assert abs(prediction[1][0] - 4) < 1e-6
+
+    # -------------------------
+    # 3. Missing input is imputed with the training fill value (the mean
+    #    of Feature1 over rows 0-7)
+    # -------------------------
+    response = client.post(f"/predict/{numeric_model}", json=[{"Feature1": None}], headers=API_KEY)
+
+    assert response.status_code == 200
+    assert abs(response.json()["prediction"][0][0] - 12) < 1e-6
+
+    # -------------------------
+    # 4. Categorical input is encoded; unknown categories are accepted
+    # -------------------------
+    response = client.post(
+        f"/predict/{categorical_model}/csv",
+        files={"file": ("input.csv", io.BytesIO(b"Color\nred\npurple\n"), "text/csv")},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+    assert response.json()["num_predictions"] == 2
+
+    # -------------------------
+    # 5. Non-numeric input is rejected with the row
+    # -------------------------
+    response = client.post(f"/predict/{numeric_model}", json=[{"Feature1": "abc"}], headers=API_KEY)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Row 0: Invalid value for 'Feature1'"
\ No newline at end of file
@@ -0,0 +1,118 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = """Feature1,Target
+1,2
+2,4
+"""
+
+PAGED_DATASETS = [f"paged_dataset_{i}" for i in range(5)]
+
+
+def upload(client, dataset_name, content):
+    return client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": dataset_name, "description": "pagination test"},
+        files={"file": ("dummy.csv", io.BytesIO(content.encode()), "text/csv")}
+    )
+
+
+def test_list_models_is_paginated(client):
+
+    response = client.get(
+        "/train/",
+        params={"limit": 1},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    response_json = response.json()
+
+    assert len(response_json["items"]) <= 1
+    assert "next_cursor" in response_json
+
+
+def test_following_cursors_lists_every_dataset_once(client):
+
+    # -------------------------
+    # 1. Seed more rows than fit on one page
+    # -------------------------
+    for i, dataset_name in enumerate(PAGED_DATASETS):
+        response = upload(client, dataset_name, CSV_DATA + f"{i},{i}\n")
+
+        assert response.status_code == 201
+
+    # -------------------------
+    # 2. Follow next_cursor to the last page
+    # -------------------------
+    seen = []
+    pages = 0
+    cursor = None
+
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+
+        response = client.get("/datasets/", params=params, headers=API_KEY)
+
+        assert response.status_code == 200
+
+        page = response.json()
+        seen.extend(item["dataset_name"] for item in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+
+        if cursor is None:
+            break
+
+    # -------------------------
+    # 3. No duplicates, no gaps
+    # -------------------------
+    assert pages >= 3
+    assert len(seen) == len(set(seen))
+    assert set(PAGED_DATASETS) <= set(seen)
+
+    # Same order as one page holding everything, ties on created_at included
+    response = client.get("/datasets/", params={"limit": 1000}, headers=API_KEY)
+
+    assert [item["dataset_name"] for item in response.json()["items"]] == seen
+
+
+def test_list_filters_accept_aware_timestamps(client):
+
+    response = upload(client, "paged_dataset_aware", CSV_DATA + "9,9\n")
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 1. The same instant an hour ago, written in UTC+14
+    # -------------------------
+    an_hour_ago = datetime.now(timezone(timedelta(hours=14))) - timedelta(hours=1)
+
+    response = client.get(
+        "/datasets/",
+        params={"created_after": an_hour_ago.isoformat(), "limit": 1000},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    names = [item["dataset_name"] for item in response.json()["items"]]
+
+    assert "paged_dataset_aware" in names
+
+
+def test_list_rejects_invalid_cursor(client):
+
+    response = client.get(
+        "/datasets/",
+        params={"cursor": "not-a-cursor"},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 400
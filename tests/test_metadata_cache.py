@@ -0,0 +1,169 @@
+import io
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from database import SessionLocal, engine
+from services import metadata_cache_service
+from services.metadata_cache_service import TTLCache
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Feature1,Target\n" + "".join(f"{i},{2 * i + 1}\n" for i in range(20))
+
+
+def upload(client, dataset_name):
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": dataset_name, "description": "metadata cache"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+
+def create_flow(client, flow_name, dataset_name):
+    flow_payload = {
+        "flow_name": flow_name,
+        "dataset_name": dataset_name,
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+
+class QueryCounter:
+    """Counts statements touching `table` while active."""
+
+    def __init__(self, table):
+        self.table = table
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.table in statement:
+            self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+
+def cached_lookup(lookup, *args):
+    db = SessionLocal()
+
+    try:
+        return lookup(db, 1, *args)
+    finally:
+        db.close()
+
+
+def test_repeated_predict_reads_model_from_cache(client):
+
+    # -------------------------
+    # 1. Train, then predict once to fill the cache
+    # -------------------------
+    upload(client, "cache_predict_dataset")
+    create_flow(client, "cache_predict_flow", "cache_predict_dataset")
+
+    model_id = client.post("/train/cache_predict_flow", headers=API_KEY).json()["model_id"]
+
+    assert client.post(f"/predict/{model_id}", json=[{"Feature1": 3}], headers=API_KEY).status_code == 200
+
+    # -------------------------
+    # 2. The second predict does not query trained_models
+    # -------------------------
+    with QueryCounter("trained_models") as counter:
+        response = client.post(f"/predict/{model_id}", json=[{"Feature1": 4}], headers=API_KEY)
+
+    assert response.status_code == 200
+    assert counter.count == 0
+
+    # -------------------------
+    # 3. Deleting the model invalidates it: the next predict is a 404
+    # -------------------------
+    assert client.delete(f"/train/{model_id}", headers=API_KEY).status_code == 200
+
+    assert cached_lookup(metadata_cache_service.get_trained_model, model_id) is None
+    assert client.post(f"/predict/{model_id}", json=[{"Feature1": 4}], headers=API_KEY).status_code == 404
+
+
+def test_flow_update_invalidates_cached_flow(client):
+    upload(client, "cache_flow_dataset")
+    create_flow(client, "cache_flow", "cache_flow_dataset")
+
+    # -------------------------
+    # 1. Cache the flow, then change and rename it
+    # -------------------------
+    assert cached_lookup(metadata_cache_service.get_flow, "cache_flow").config_json["test_size"] == 0.25
+
+    response = client.patch(
+        "/user_flows/cache_flow",
+        json={"config_json": {"test_size": 0.5}},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    # -------------------------
+    # 2. The next read sees the new config
+    # -------------------------
+    assert cached_lookup(metadata_cache_service.get_flow, "cache_flow").config_json["test_size"] == 0.5
+
+    response = client.patch("/user_flows/cache_flow", json={"flow_name": "cache_flow_renamed"}, headers=API_KEY)
+
+    assert response.status_code == 200
+    assert cached_lookup(metadata_cache_service.get_flow, "cache_flow") is None
+    assert cached_lookup(metadata_cache_service.get_flow, "cache_flow_renamed").config_json["test_size"] == 0.5
+
+
+def test_dataset_delete_invalidates_cached_dataset(client):
+    upload(client, "cache_dataset")
+
+    assert cached_lookup(metadata_cache_service.get_dataset, "cache_dataset") is not None
+
+    assert client.delete("/datasets/cache_dataset", headers=API_KEY).status_code == 204
+
+    assert cached_lookup(metadata_cache_service.get_dataset, "cache_dataset") is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(metadata_cache_service, "time", SimpleNamespace(monotonic=lambda: now[0]))
+
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("model", "row")
+
+    now[0] += 59
+
+    assert cache.get("model") == "row"
+
+    now[0] += 2
+
+    assert cache.get("model") is None
+
+
+def test_least_recently_used_entry_is_evicted_at_capacity():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
@@ -0,0 +1,149 @@
+import io
+
+from database import SessionLocal
+from models.trained_models import TrainedModels
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Feature1,Target\n" + "".join(f"{i},{2 * i + (i % 3)}\n" for i in range(30))
+
+
+def create_flow(client, flow_name, dataset_name):
+    flow_payload = {
+        "flow_name": flow_name,
+        "dataset_name": dataset_name,
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+
+def set_metrics(model_id, metrics):
+    db = SessionLocal()
+
+    try:
+        model = db.query(TrainedModels).filter(TrainedModels.id == model_id).one()
+        model.metrics_json = {**model.metrics_json, **metrics}
+        db.commit()
+    finally:
+        db.close()
+
+
+def leaderboard(client, **params):
+    response = client.get("/metrics/leaderboard", params=params, headers=API_KEY)
+
+    assert response.status_code == 200
+
+    return response.json()
+
+
+def model_ids(board):
+    return [model["model_id"] for model in board["models"]]
+
+
+
+def test_leaderboard_rejects_unknown_metric(client):
+
+    response = client.get(
+        "/metrics/leaderboard",
+        params={"rank_by": ["accuracy"]},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 400
+
+
+def test_leaderboard_nonexistent_flow(client):
+
+    response = client.get(
+        "/metrics/leaderboard",
+        params={"flow_name": "fake-flow"},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 404
+
+    response_json = response.json()
+
+    assert "detail" in response_json
+
+
+def test_leaderboard_ranking_and_pages(client):
+
+    # -------------------------
+    # 1. Train three models on one flow and one on another
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "leaderboard_dataset", "description": "leaderboard"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    create_flow(client, "leaderboard_flow", "leaderboard_dataset")
+    create_flow(client, "leaderboard_other_flow", "leaderboard_dataset")
+
+    first, second, third = (
+        client.post("/train/leaderboard_flow", headers=API_KEY).json()["model_id"]
+        for _ in range(3)
+    )
+    other = client.post("/train/leaderboard_other_flow", headers=API_KEY).json()["model_id"]
+
+    # -------------------------
+    # 2. Pin the stored metrics so the expected order is known: the first
+    #    two tie on RMSE, and the third has no R2
+    # -------------------------
+    set_metrics(first, {"r2": 0.9, "rmse": 1.0, "mae": 0.8})
+    set_metrics(second, {"r2": 0.5, "rmse": 1.0, "mae": 0.6})
+    set_metrics(third, {"r2": None, "rmse": 0.5, "mae": 0.7})
+    set_metrics(other, {"r2": 0.99, "rmse": 0.1, "mae": 0.1})
+
+    # -------------------------
+    # 3. Rank by R2: a missing R2 ranks last
+    # -------------------------
+    board = leaderboard(client, flow_name="leaderboard_flow", rank_by=["r2"])
+
+    assert model_ids(board) == [first, second, third]
+    assert [model["rank"] for model in board["models"]] == [1, 2, 3]
+
+    # -------------------------
+    # 4. Rank by RMSE, then MAE: MAE breaks the RMSE tie
+    # -------------------------
+    board = leaderboard(client, flow_name="leaderboard_flow", rank_by=["rmse", "mae"])
+
+    assert board["rank_by"] == ["rmse", "mae"]
+    assert model_ids(board) == [third, second, first]
+
+    # -------------------------
+    # 5. Two pages add up to the whole flow
+    # -------------------------
+    page_one = leaderboard(client, flow_name="leaderboard_flow", rank_by=["r2"], limit=2, offset=0)
+    page_two = leaderboard(client, flow_name="leaderboard_flow", rank_by=["r2"], limit=2, offset=2)
+
+    assert page_one["total"] == page_two["total"] == 3
+    assert (page_one["limit"], page_one["offset"]) == (2, 0)
+    assert (page_two["limit"], page_two["offset"]) == (2, 2)
+    assert model_ids(page_one) == [first, second]
+    assert model_ids(page_two) == [third]
+    assert page_two["models"][0]["rank"] == 3
+
+    # -------------------------
+    # 6. Without the flow filter the other flow's model competes too
+    # -------------------------
+    board = leaderboard(client, model_ids=[first, second, third, other], rank_by=["r2"])
+
+    assert board["total"] == 4
+    assert model_ids(board) == [other, first, second, third]
+
+    board = leaderboard(client, flow_name="leaderboard_other_flow")
+
+    assert model_ids(board) == [other]
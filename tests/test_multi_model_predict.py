@@ -0,0 +1,103 @@
+import io
+
+import numpy as np
+import pytest
+
+from services.model_registry_service import registry
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = "Feature1,Target\n" + "".join(f"{i},{3 * i - 2}\n" for i in range(20))
+
+
+def test_multi_model_predict_after_delete(client):
+
+    # -------------------------
+    # 1. Two linear models on the same feature
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "multi_predict_dataset", "description": "multi predict"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    model_ids = []
+
+    for flow_name in ("multi_predict_a", "multi_predict_b"):
+        flow_payload = {
+            "flow_name": flow_name,
+            "dataset_name": "multi_predict_dataset",
+            "config_json": {
+                "algorithm": "Linear Regression",
+                "data_range_X": "Feature1",
+                "data_range_y": "Target",
+                "test_size": 0.25
+            }
+        }
+
+        response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+        assert response.status_code == 201
+
+        response = client.post(f"/train/{flow_name}", headers=API_KEY)
+
+        assert response.status_code == 200
+
+        model_ids.append(response.json()["model_id"])
+
+    # -------------------------
+    # 2. Both are packed and scored together
+    # -------------------------
+    response = client.post(
+        "/predict/multi",
+        json={"model_ids": model_ids, "input_data": [{"Feature1": 10}]},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    for model_id in model_ids:
+        assert round(response.json()["predictions"][model_id][0], 6) == 28
+        assert registry.feature_order(1, model_id) == ["Feature1"]
+
+    # -------------------------
+    # 3. A model unregistered mid-request is a 404, not a 500
+    # -------------------------
+    registry.unregister(1, model_ids[0])
+
+    with pytest.raises(KeyError):
+        registry.predict(1, model_ids, [[10.0]], ["Feature1"])
+
+    response = client.delete(f"/train/{model_ids[0]}", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    response = client.post(
+        "/predict/multi",
+        json={"model_ids": model_ids, "input_data": [{"Feature1": 10}]},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 404
+    assert registry.feature_order(1, model_ids[0]) is None
+
+
+def test_registry_keeps_models_past_block_capacity():
+    from sklearn.linear_model import LinearRegression
+
+    from services.model_registry_service import LinearModelRegistry
+
+    packed = LinearModelRegistry()
+    X = np.arange(4.0).reshape(-1, 1)
+
+    # More models than one block initially holds, so the block grows
+    for i in range(70):
+        bundle = {"model": LinearRegression().fit(X, i * X.ravel() + 1), "feature_order": ["Feature1"]}
+        assert packed.register(1, f"model_{i}", bundle) == ["Feature1"]
+
+    scores = packed.predict(1, [f"model_{i}" for i in range(70)], np.array([[2.0]]), ["Feature1"])
+
+    assert np.allclose(scores[0], [2 * i + 1 for i in range(70)])
@@ -0,0 +1,78 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+# Three targets, each an exact linear function of the two features
+CSV_DATA = "Feature1,Feature2,Target1,Target2,Target3\n" + "".join(
+    f"{i},{(i * 7) % 11},{2 * i + 1},{3 * ((i * 7) % 11) - i},{5 - (i * 7) % 11}\n" for i in range(60)
+)
+
+
+def test_multi_target_training_and_prediction(client):
+
+    # -------------------------
+    # 1. Upload dataset
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "multi_target_dataset", "description": "multi target"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. A column can't be both a feature and a target
+    # -------------------------
+    flow_payload = {
+        "flow_name": "multi_target_flow",
+        "dataset_name": "multi_target_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": ["Feature1", "Target1"],
+            "data_range_y": ["Target1", "Target2"],
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 400
+
+    # -------------------------
+    # 3. One flow, one fit, three targets
+    # -------------------------
+    flow_payload["config_json"]["data_range_X"] = ["Feature1", "Feature2"]
+    flow_payload["config_json"]["data_range_y"] = ["Target1", "Target2", "Target3"]
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post("/train/multi_target_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    metrics = response.json()["metrics"]
+    model_id = response.json()["model_id"]
+
+    assert set(metrics["per_target"]) == {"Target1", "Target2", "Target3"}
+
+    for target_metrics in metrics["per_target"].values():
+        assert target_metrics["r2"] > 0.999
+
+    # -------------------------
+    # 4. Every target per row
+    # -------------------------
+    response = client.post(
+        f"/predict/{model_id}",
+        headers=API_KEY,
+        json=[{"Feature1": 10, "Feature2": 4}, {"Feature1": 0, "Feature2": 0}]
+    )
+
+    assert response.status_code == 200
+    assert response.json()["targets"] == ["Target1", "Target2", "Target3"]
+
+    for predicted, expected in zip(response.json()["prediction"], [[21, 2, 1], [1, 0, 5]]):
+        assert [round(value, 6) for value in predicted] == expected
\ No newline at end of file
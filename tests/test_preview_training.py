@@ -0,0 +1,175 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+# 300 rows of Target = 2 * Feature1 + 1, with a little noise
+CSV_DATA = "Feature1,Target\n" + "".join(
+    f"{i},{2 * i + 1 + (i % 3 - 1) * 0.5}\n" for i in range(300)
+)
+
+
+def test_preview_training_and_promotion(client):
+
+    # -------------------------
+    # 1. Upload dataset and create flow
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "preview_dataset", "description": "preview"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    flow_payload = {
+        "flow_name": "preview_flow",
+        "dataset_name": "preview_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "test_size": 0.2
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Preview trains on a stratified sample
+    # -------------------------
+    response = client.post("/train/preview_flow?preview=true&sample_size=100&sampling=stratified", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    preview = response.json()
+    preview_id = preview["model_id"]
+
+    assert preview["preview"]["sampling"] == "stratified"
+    assert preview["preview"]["test_rows"] == 20
+
+    for low, high in preview["preview"]["confidence_intervals"].values():
+        assert low <= high
+
+    assert preview["metrics"]["r2"] > 0.99
+
+    # -------------------------
+    # 3. Preview models are flagged and can be promoted
+    # -------------------------
+    response = client.post(f"/train/{preview_id}/promote", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    promoted = response.json()
+
+    assert promoted["promoted_from"] == preview_id
+    assert "preview" not in promoted
+
+    response = client.get("/train/?flow_name=preview_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    flags = {model["model_id"]: model["is_preview"] for model in response.json()["items"]}
+
+    assert flags == {preview_id: True, promoted["model_id"]: False}
+
+    # -------------------------
+    # 4. Only preview models can be promoted
+    # -------------------------
+    response = client.post(f"/train/{promoted['model_id']}/promote", headers=API_KEY)
+
+    assert response.status_code == 400
+
+    response = client.post("/train/no-such-model/promote", headers=API_KEY)
+
+    assert response.status_code == 404
+
+def test_bootstrap_resamples_whole_blocks():
+    import numpy as np
+
+    from services.training_service import bootstrap_intervals
+
+    # -------------------------
+    # 1. 20 blocks of 10 identical rows: only 20 independent errors
+    # -------------------------
+    rng = np.random.default_rng(1)
+    block_errors = rng.normal(size=20)
+    groups = np.repeat(np.arange(20), 10)
+
+    y_test = rng.normal(size=200)
+    y_pred = y_test + block_errors[groups]
+
+    rows = bootstrap_intervals(y_test, y_pred, n_resamples=500)
+    blocks = bootstrap_intervals(y_test, y_pred, groups=groups, n_resamples=500)
+
+    # -------------------------
+    # 2. Treating the rows as independent understates the spread (~sqrt(10)x)
+    # -------------------------
+    def width(interval):
+        return interval[1] - interval[0]
+
+    assert width(blocks["mae"]) > 2 * width(rows["mae"])
+    assert width(blocks["rmse"]) > 2 * width(rows["rmse"])
+
+    # -------------------------
+    # 3. One row per group is the plain row bootstrap
+    # -------------------------
+    assert bootstrap_intervals(y_test, y_pred, groups=np.arange(200), n_resamples=500) == rows
+
+
+def test_preview_training_without_row_count(client):
+    from database import SessionLocal
+    from models.datasets import DataSets
+    from services import metadata_cache_service
+
+    # -------------------------
+    # 1. Upload a dataset large enough to be indexed and create a flow
+    # -------------------------
+    csv_data = "Feature1,Target\n" + "".join(f"{i % 50},{3 * (i % 50) + 2}\n" for i in range(10500))
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "preview_no_count", "description": "preview"},
+        files={"file": ("dummy.csv", io.BytesIO(csv_data.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    flow_payload = {
+        "flow_name": "preview_no_count_flow",
+        "dataset_name": "preview_no_count",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "test_size": 0.2
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Drop the row count, as datasets from before it was stored lack it
+    # -------------------------
+    db = SessionLocal()
+
+    try:
+        db.query(DataSets).filter(DataSets.dataset_name == "preview_no_count").update({"row_count": None})
+        db.commit()
+    finally:
+        db.close()
+
+    metadata_cache_service.invalidate_dataset(1, "preview_no_count")
+
+    # -------------------------
+    # 3. Sampling still works, over the whole indexed file
+    # -------------------------
+    response = client.post("/train/preview_no_count_flow?preview=true&sample_size=100", headers=API_KEY)
+
+    assert response.status_code == 200
+    assert response.json()["preview"]["test_rows"] == 20
@@ -0,0 +1,52 @@
+import io
+
+API_KEY = {"x-api-key": "KEY123"}
+
+
+def test_row_range_trains_on_indexed_slice(client):
+
+    # -------------------------
+    # 1. Upload a dataset large enough to be indexed; only rows
+    #    10000-12499 follow Target = 3 * Feature1 + 2
+    # -------------------------
+    lines = ["Feature1,Target"]
+    lines += [f"{i % 7},{(i * 37) % 101}" for i in range(10000)]
+    lines += [f"{i % 50},{3 * (i % 50) + 2}" for i in range(2500)]
+
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "indexed_dataset", "description": "row index"},
+        files={"file": ("dummy.csv", io.BytesIO("\n".join(lines).encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["row_count"] == 12500
+
+    # -------------------------
+    # 2. Train on the tail slice only
+    # -------------------------
+    flow_payload = {
+        "flow_name": "indexed_flow",
+        "dataset_name": "indexed_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "row_range": [10000, 12500],
+            "test_size": 0.2
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    response = client.post("/train/indexed_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+
+    # -------------------------
+    # 3. The fit sees exactly the requested rows
+    # -------------------------
+    assert response.json()["metrics"]["r2"] > 0.999999
\ No newline at end of file
@@ -0,0 +1,48 @@
+import io
+import os
+import time
+
+import joblib
+
+from services import shared_store_service
+
+
+def test_shared_bundles_and_tombstone_sweep(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_store_service, "SHARED_MODEL_STORE_DIR", str(tmp_path))
+
+    # -------------------------
+    # 1. The first attach materializes the bundle; later ones reuse it
+    # -------------------------
+    payload = io.BytesIO()
+    joblib.dump({"feature_order": ["Feature1"]}, payload)
+
+    downloads = []
+
+    def download():
+        downloads.append(1)
+        return io.BytesIO(payload.getvalue())
+
+    for _ in range(2):
+        bundle = shared_store_service.attach_bundle(1, "model_a", download)
+        assert bundle["feature_order"] == ["Feature1"]
+
+    assert len(downloads) == 1
+
+    # -------------------------
+    # 2. Invalidating leaves a tombstone and drops the shared copy
+    # -------------------------
+    shared_store_service.invalidate(1, "model_a")
+
+    assert shared_store_service.is_invalidated(1, "model_a")
+    assert not os.path.exists(shared_store_service._bundle_path(1, "model_a"))
+
+    # -------------------------
+    # 3. Old tombstones are swept by later invalidations
+    # -------------------------
+    old = time.time() - shared_store_service.SHARED_TOMBSTONE_MAX_AGE - 60
+    os.utime(shared_store_service._tombstone_path(1, "model_a"), (old, old))
+
+    shared_store_service.invalidate(1, "model_b")
+
+    assert not shared_store_service.is_invalidated(1, "model_a")
+    assert shared_store_service.is_invalidated(1, "model_b")
\ No newline at end of file
@@ -0,0 +1,100 @@
+import io
+
+import numpy as np
+from scipy.sparse import issparse
+
+from services import training_service
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CITIES = [f"city_{i}" for i in range(10)]
+
+CSV_DATA = "City,Target\n" + "".join(f"{CITIES[i % 10]},{3 * (i % 10) + 1}\n" for i in range(60))
+
+
+def train(client, flow_name, algorithm="Linear Regression"):
+    flow_payload = {
+        "flow_name": flow_name,
+        "dataset_name": "sparse_dataset",
+        "config_json": {
+            "algorithm": algorithm,
+            "data_range_X": "City",
+            "data_range_y": "Target",
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    return client.post(f"/train/{flow_name}", headers=API_KEY)
+
+
+def test_encode_categorical_switches_on_cardinality(monkeypatch):
+    values = np.array(CITIES * 2, dtype=object).reshape(-1, 1)
+
+    monkeypatch.setattr(training_service, "SPARSE_CARDINALITY_THRESHOLD", 5)
+    sparse, categories = training_service.encode_categorical(values)
+
+    monkeypatch.setattr(training_service, "SPARSE_CARDINALITY_THRESHOLD", 64)
+    dense, _ = training_service.encode_categorical(values)
+
+    assert issparse(sparse)
+    assert not issparse(dense)
+    assert categories == CITIES
+    assert (sparse.toarray() == dense).all()
+
+
+def test_sparse_and_dense_training_agree(client, monkeypatch):
+
+    # -------------------------
+    # 1. Upload a dataset with a ten-category feature
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "sparse_dataset", "description": "sparse one-hot"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. Train once above and once below the sparse threshold
+    # -------------------------
+    monkeypatch.setattr(training_service, "SPARSE_CARDINALITY_THRESHOLD", 5)
+    sparse_response = train(client, "sparse_onehot_flow")
+
+    monkeypatch.setattr(training_service, "SPARSE_CARDINALITY_THRESHOLD", 64)
+    dense_response = train(client, "dense_onehot_flow")
+
+    assert sparse_response.status_code == 200
+    assert dense_response.status_code == 200
+
+    # -------------------------
+    # 3. Both models predict every category the same way
+    # -------------------------
+    rows = [{"City": city} for city in CITIES]
+    predictions = []
+
+    for response in (sparse_response, dense_response):
+        result = client.post(f"/predict/{response.json()['model_id']}", json=rows, headers=API_KEY)
+
+        assert result.status_code == 200
+
+        predictions.append(np.array(result.json()["prediction"]).ravel())
+
+    expected = np.array([3 * i + 1 for i in range(10)], dtype=float)
+
+    assert np.allclose(predictions[0], expected, atol=1e-4)
+    assert np.allclose(predictions[1], expected, atol=1e-4)
+
+    # -------------------------
+    # 4. A dense-only algorithm refuses sparse features
+    # -------------------------
+    monkeypatch.setattr(training_service, "SPARSE_CARDINALITY_THRESHOLD", 5)
+
+    response = train(client, "sparse_hgb_flow", algorithm="Histogram Gradient Boosting")
+
+    assert response.status_code == 400
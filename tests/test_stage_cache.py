@@ -0,0 +1,140 @@
+import io
+import os
+
+import numpy as np
+
+from services import feature_store_service
+
+API_KEY = {"x-api-key": "KEY123"}
+
+CSV_DATA = """Feature1,Target
+1,5
+2,7
+3,9
+4,11
+5,13
+6,15
+7,17
+8,19
+"""
+
+
+def stage_status(response):
+    return {stage["stage"]: stage["status"] for stage in response.json()["stages"]}
+
+
+def test_retraining_reruns_only_changed_stages(client):
+
+    # -------------------------
+    # 1. Upload dataset and create flow
+    # -------------------------
+    response = client.post(
+        "/datasets/",
+        headers=API_KEY,
+        data={"dataset_name": "stage_cache_dataset", "description": "stage cache"},
+        files={"file": ("dummy.csv", io.BytesIO(CSV_DATA.encode()), "text/csv")}
+    )
+
+    assert response.status_code == 201
+
+    flow_payload = {
+        "flow_name": "stage_cache_flow",
+        "dataset_name": "stage_cache_dataset",
+        "config_json": {
+            "algorithm": "Linear Regression",
+            "data_range_X": "Feature1",
+            "data_range_y": "Target",
+            "row_range": [0, 8],
+            "test_size": 0.25
+        }
+    }
+
+    response = client.post("/user_flows/", json=flow_payload, headers=API_KEY)
+
+    assert response.status_code == 201
+
+    # -------------------------
+    # 2. First training runs every stage
+    # -------------------------
+    response = client.post("/train/stage_cache_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+    assert stage_status(response) == {
+        "load": "miss",
+        "select": "computed",
+        "encode": "computed",
+        "impute": "miss",
+        "split": "miss",
+        "scale": "miss",
+        "fit": "miss",
+        "evaluate": "miss"
+    }
+
+    # -------------------------
+    # 3. Changing only test_size reruns split onward
+    # -------------------------
+    response = client.patch(
+        "/user_flows/stage_cache_flow",
+        json={"config_json": {"test_size": 0.5}},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    response = client.post("/train/stage_cache_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+    assert response.json()["metrics"]["r2"] > 0.999999
+    assert stage_status(response) == {
+        "load": "skipped",
+        "select": "skipped",
+        "encode": "skipped",
+        "impute": "hit",
+        "split": "miss",
+        "scale": "miss",
+        "fit": "miss",
+        "evaluate": "miss"
+    }
+
+    # -------------------------
+    # 4. Changing the preprocessing reuses the loaded columns
+    # -------------------------
+    response = client.patch(
+        "/user_flows/stage_cache_flow",
+        json={"config_json": {"missing_data": "mean"}},
+        headers=API_KEY
+    )
+
+    assert response.status_code == 200
+
+    response = client.post("/train/stage_cache_flow", headers=API_KEY)
+
+    assert response.status_code == 200
+    assert stage_status(response)["load"] == "hit"
+    assert stage_status(response)["impute"] == "miss"
+
+    # -------------------------
+    # 5. Entries past their age are evicted
+    # -------------------------
+    feature_store_service.evict(max_age=-1)
+
+    assert os.listdir(feature_store_service.FEATURE_STORE_DIR) == []
+
+def test_failed_store_leaves_nothing_behind(caplog):
+
+    # -------------------------
+    # 1. A value joblib cannot pickle fails the write, not the caller
+    # -------------------------
+    values = {"X": np.arange(4.0), "scaler": lambda x: x}
+
+    feature_store_service.store_entry("unpicklable", values)
+
+    assert "Could not store feature store entry unpicklable" in caplog.text
+
+    # -------------------------
+    # 2. The half-written temp dir is removed and the key reads as a miss
+    # -------------------------
+    leftovers = [name for name in os.listdir(feature_store_service.FEATURE_STORE_DIR) if name.startswith(".tmp-")]
+
+    assert leftovers == []
+    assert feature_store_service.load_entry("unpicklable") is None
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("pandas", "sklearn", "joblib", "boto3", "scipy")
+
+IMPORT_CHECK = f"""
+import sys
+import main
+print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+"""
+
+
+def test_import_is_light_and_schema_waits_for_startup(tmp_path):
+
+    # -------------------------
+    # 1. Importing the app in a fresh interpreter
+    # -------------------------
+    db_path = tmp_path / "startup.db"
+    env = {
+        **os.environ,
+        "DEPLOYMENT_MODE": "embedded",
+        "EMBEDDED_DB_PATH": str(db_path),
+        "LOCAL_STORAGE_ROOT": str(tmp_path / "bucket"),
+        "PYTHONPATH": PACKAGE_ROOT
+    }
+
+    result = subprocess.run([sys.executable, "-c", IMPORT_CHECK], env=env, cwd=tmp_path, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+    # -------------------------
+    # 2. No heavy library loaded and no database touched yet
+    # -------------------------
+    assert result.stdout.strip() == ""
+    assert not db_path.exists()
+
+
+def test_startup_creates_schema():
+    from database import engine
+    from main import app
+
+    # -------------------------
+    # 1. The lifespan hook applies migrations
+    # -------------------------
+    with TestClient(app):
+        pass
+
+    tables = set(inspect(engine).get_table_names())
+
+    assert {"datasets", "user_flows", "trained_models", "schema_migrations"} <= tables
+
+def test_migrations_build_the_model_schema(tmp_path):
+    import models.batch_jobs
+    import models.dataset_blobs
+    import models.datasets
+    import models.trained_models
+    import models.user_flow
+    from sqlalchemy import create_engine
+    from database import Base
+    from migrations import run_migrations
+
+    # -------------------------
+    # 1. Migrating an empty database from the frozen baseline
+    # -------------------------
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    run_migrations(engine)
+
+    # -------------------------
+    # 2. Every table and column the models map exists
+    # -------------------------
+    inspector = inspect(engine)
+
+    for table in Base.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+
+        assert set(table.columns.keys()) <= columns, table.name
+
+    engine.dispose()
@@ -0,0 +1,109 @@
+import io
+
+import pytest
+
+from services.storage_service import InMemoryStorage, LocalStorage, S3Storage, _RangedStream
+
+DATA = bytes(range(256)) * 41
+
+
+@pytest.fixture(params=["memory", "local"])
+def storage(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryStorage()
+
+    return LocalStorage(tmp_path / "bucket")
+
+
+def test_upload_and_read_back(storage):
+
+    # -------------------------
+    # 1. Whole object
+    # -------------------------
+    storage.upload_file(io.BytesIO(DATA), "1/object.bin")
+
+    assert storage.get_file("1/object.bin").read() == DATA
+    assert storage.open_file_stream("1/object.bin").read() == DATA
+
+    # -------------------------
+    # 2. Byte ranges, including past the end
+    # -------------------------
+    assert storage.read_range("1/object.bin", 100, 1100) == DATA[100:1100]
+    assert storage.read_range("1/object.bin", len(DATA) - 5, len(DATA) + 50) == DATA[-5:]
+    assert storage.read_range("1/object.bin", 10, 10) == b""
+
+    storage.delete_file("1/object.bin")
+    storage.delete_file("1/object.bin")
+
+
+def test_multipart_parts_assemble_by_part_number(storage):
+
+    pieces = [DATA[i:i + 3000] for i in range(0, len(DATA), 3000)]
+
+    # -------------------------
+    # 1. Parts uploaded out of order, one of them retried
+    # -------------------------
+    upload_id = storage.create_multipart_upload("1/predictions/out.csv")
+
+    parts = [
+        storage.upload_part("1/predictions/out.csv", upload_id, number, piece)
+        for number, piece in reversed(list(enumerate(pieces, start=1)))
+    ]
+    storage.upload_part("1/predictions/out.csv", upload_id, 2, b"garbage")
+    storage.upload_part("1/predictions/out.csv", upload_id, 2, pieces[1])
+
+    storage.complete_multipart_upload("1/predictions/out.csv", upload_id, parts)
+
+    # -------------------------
+    # 2. The object is the parts in part-number order
+    # -------------------------
+    assert storage.get_file("1/predictions/out.csv").read() == DATA
+
+
+def test_aborted_multipart_leaves_nothing(storage, tmp_path):
+
+    upload_id = storage.create_multipart_upload("1/predictions/aborted.csv")
+    storage.upload_part("1/predictions/aborted.csv", upload_id, 1, b"partial")
+    storage.abort_multipart_upload("1/predictions/aborted.csv", upload_id)
+
+    with pytest.raises(FileNotFoundError):
+        storage.get_file("1/predictions/aborted.csv")
+
+    if isinstance(storage, LocalStorage):
+        assert list((tmp_path / "bucket" / "1" / "predictions").iterdir()) == []
+
+
+def test_local_storage_has_no_download_url(tmp_path):
+
+    assert LocalStorage(tmp_path).get_download_url("1/object.bin") is None
+
+
+def test_ranged_stream_reads_in_order():
+
+    def fetch_range(start, end):
+        return DATA[start:end + 1]
+
+    # Chunks smaller than the reads and more of them than the concurrency
+    stream = io.BufferedReader(_RangedStream(fetch_range, len(DATA), 1000, 3), buffer_size=4096)
+
+    assert stream.read() == DATA
+
+    stream.close()
+
+
+class _FakeRangesS3(S3Storage):
+    """S3Storage whose ranged GETs are served from bytes in memory."""
+
+    def _fetch_range(self, path, start, end):
+        return DATA[start:end + 1]
+
+
+def test_download_ranged_maps_every_chunk():
+
+    storage = _FakeRangesS3("bucket", max_concurrency=4, multipart_threshold=1, multipart_chunksize=1000)
+
+    file = storage._download_ranged("1/object.bin", len(DATA))
+
+    assert file[:] == DATA
+
+    file.close()